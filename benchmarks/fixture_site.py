@@ -0,0 +1,335 @@
+"""Máy chủ giả lập 1thegioi.vn, trang kết quả Google/Bing, Google Custom Search API và Ollama để benchmark không cần mạng.
+
+Mọi host được phục vụ dưới tiền tố /<host>/ của cùng một cổng; crew được trỏ về đây qua
+CHATBOT_HTTP_HOST_OVERRIDES (xem FixtureServer.overrides). Nội dung lấy từ fixtures/site.json;
+trang đã ghi thật trong fixtures/recorded/<host>/ (lưu bằng --record URL) được ưu tiên.
+
+Chạy riêng:  python benchmarks/fixture_site.py [--port 8765] [--ollama-latency 0.5]
+Ghi trang:   python benchmarks/fixture_site.py --record https://1thegioi.vn/ https://1thegioi.vn/sitemap.xml
+"""
+import argparse
+import html
+import json
+import os
+import re
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+RECORDED_DIR = os.path.join(FIXTURES_DIR, 'recorded')
+
+SITE_HOST = '1thegioi.vn'
+SEARCH_HOSTS = ('www.google.com', 'www.bing.com', 'www.googleapis.com')
+
+# Từ trong truy vấn tìm kiếm không dùng để so khớp bài
+QUERY_NOISE = {'tin', 'tức', 'mới', 'nhất', 'phân', 'tích', 'xu', 'hướng', 'cập', 'nhật', 'thông', 'chi', 'tiết'}
+
+
+def host_key(hostname):
+    """Thư mục/tiền tố của host: mọi biến thể của 1thegioi.vn dùng chung một thư mục"""
+    hostname = (hostname or '').lower()
+    return SITE_HOST if hostname.removeprefix('www.') == SITE_HOST else hostname
+
+
+def recorded_name(path_and_query):
+    """Tên file lưu một trang đã ghi (cùng quy tắc với benchmarks/html_parsers.py --save)"""
+    name = re.sub(r'[^\w.-]+', '_', path_and_query).strip('_') or 'index'
+    return name if name.endswith(('.html', '.xml', '.txt')) else f'{name}.html'
+
+
+def load_site(path=None):
+    with open(path or os.path.join(FIXTURES_DIR, 'site.json'), encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+class FixtureSite:
+    """Dựng trang chủ, chuyên mục, bài viết, sitemap/RSS và trang kết quả tìm kiếm từ site.json"""
+
+    def __init__(self, site):
+        self.origin = site['site'].rstrip('/')
+        self.articles = sorted(site['articles'], key=lambda article: article['published'], reverse=True)
+        self.by_slug = {article['slug']: article for article in self.articles}
+        self.sections = sorted({article['section'] for article in self.articles})
+
+    def url(self, article):
+        return f"{self.origin}/{article['slug']}.html"
+
+    def links(self, articles, tracking=''):
+        """Danh sách link bài; `tracking` là tham số theo dõi gắn vào link (như khối "mới nhất" của site thật)"""
+        return '\n'.join(
+            f'<li><a href="/{article["slug"]}.html{tracking}" title="{html.escape(article["title"])}">'
+            f'{html.escape(article["title"])}</a></li>'
+            for article in articles
+        )
+
+    def page(self, title, body, head=''):
+        return (f'<!DOCTYPE html><html lang="vi"><head><meta charset="utf-8"><title>{html.escape(title)}</title>{head}'
+                f'</head><body><header><nav>{self.navigation()}</nav></header>{body}'
+                f'<footer><p>Bản quyền thuộc về Một Thế Giới - 1thegioi.vn</p></footer></body></html>')
+
+    def navigation(self):
+        return ' '.join(f'<a href="/{section}">{section}</a>' for section in self.sections)
+
+    def home(self):
+        return self.page('Một Thế Giới', f'<main><ul class="latest">{self.links(self.articles)}</ul></main>')
+
+    def section(self, name):
+        articles = [article for article in self.articles if article['section'] == name]
+        if name == 'thoi-su':
+            articles = self.articles[:8]
+        if not articles and name not in self.sections:
+            return None
+        latest = [article for article in self.articles[:5] if article not in articles]
+        return self.page(name, f'<main><ul class="list">{self.links(articles)}</ul>'
+                               f'<aside><ul>{self.links(latest, "?utm_source=latest")}</ul></aside></main>')
+
+    def article(self, slug):
+        article = self.by_slug.get(slug)
+        if article is None:
+            return None
+        paragraphs = ''.join(f'<p>{html.escape(text)}</p>' for text in article['paragraphs'])
+        related = [other for other in self.articles if other['section'] == article['section'] and other is not article]
+        head = f'<meta property="article:published_time" content="{article["published"]}">'
+        body = (f'<main><article><h1>{html.escape(article["title"])}</h1>'
+                f'<div class="detail-content">{paragraphs}</div></article>'
+                f'<aside><ul>{self.links(related[:4])}</ul></aside></main>')
+        return self.page(article['title'], body, head)
+
+    def sitemap(self):
+        entries = ''.join(f'<url><loc>{self.url(article)}</loc><lastmod>{article["published"]}</lastmod></url>'
+                          for article in self.articles)
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>')
+
+    def rss(self):
+        items = ''.join(f'<item><title>{html.escape(article["title"])}</title><link>{self.url(article)}</link>'
+                        f'<pubDate>{article["published"]}</pubDate></item>' for article in self.articles)
+        return f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel>{items}</channel></rss>'
+
+    def search(self, query, limit=10):
+        """Bài khớp truy vấn theo số từ xuất hiện trong tiêu đề và nội dung"""
+        query = re.sub(r'site:\S+|\d{4}', ' ', query.lower()).replace('"', ' ')
+        words = [word for word in query.split() if word not in QUERY_NOISE]
+        if not words:
+            return []
+        scored = []
+        for article in self.articles:
+            text = ' '.join([article['title']] + article['paragraphs']).lower()
+            hits = sum(1 for word in words if word in text)
+            if hits * 2 >= len(words):
+                scored.append((hits, article))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [article for _, article in scored[:limit]]
+
+    def google(self, query):
+        results = ''.join(
+            f'<div class="g"><div class="yuRUbf"><a href="{self.url(article).replace("https://", "http://www.")}"><h3>{html.escape(article["title"])}</h3></a></div>'
+            f'<div class="VwiC3b">{html.escape(article["paragraphs"][0])}</div></div>'
+            for article in self.search(query)
+        )
+        return f'<html><head><title>{html.escape(query)} - Google Search</title></head><body><div id="search">{results}</div></body></html>'
+
+    def bing(self, query):
+        results = ''.join(
+            f'<li class="b_algo"><h2><a href="{self.url(article)}">{html.escape(article["title"])}</a></h2>'
+            f'<div class="b_caption"><p>{html.escape(article["paragraphs"][0])}</p></div></li>'
+            for article in self.search(query)
+        )
+        return f'<html><head><title>{html.escape(query)} - Bing</title></head><body><ol id="b_results">{results}</ol></body></html>'
+
+    def custom_search(self, query, start=1, num=10):
+        """Response JSON kiểu Google Custom Search API"""
+        matches = self.search(query, limit=start - 1 + num)[start - 1:]
+        items = [{'link': self.url(article), 'title': article['title'], 'snippet': article['paragraphs'][0]}
+                 for article in matches]
+        return json.dumps({'items': items} if items else {}, ensure_ascii=False)
+
+    def render(self, host, path, query):
+        """(content type, nội dung) cho một request, hoặc None nếu không có trang"""
+        if host == 'www.googleapis.com' and path == '/customsearch/v1':
+            return 'application/json', self.custom_search(query.get('q', ''), int(query.get('start', 1)),
+                                                          int(query.get('num', 10)))
+        if host == 'www.google.com' and path == '/search':
+            return 'text/html', self.google(query.get('q', ''))
+        if host == 'www.bing.com' and path == '/search':
+            return 'text/html', self.bing(query.get('q', ''))
+        if host != SITE_HOST:
+            return None
+
+        if path in ('', '/'):
+            return 'text/html', self.home()
+        if path == '/robots.txt':
+            return 'text/plain', f'User-agent: *\nAllow: /\nSitemap: {self.origin}/sitemap.xml\n'
+        if path == '/sitemap.xml':
+            return 'application/xml', self.sitemap()
+        if path == '/rss.xml':
+            return 'application/rss+xml', self.rss()
+        if path.endswith('.html'):
+            page = self.article(path.strip('/')[:-len('.html')])
+        else:
+            page = self.section(path.strip('/'))
+        return ('text/html', page) if page is not None else None
+
+
+class FakeOllama:
+    """/api/generate trả NDJSON như Ollama: chờ `first_token_latency` giây rồi phát `tokens` đoạn"""
+
+    def __init__(self, first_token_latency=0.5, token_delay=0.01, tokens=120):
+        self.first_token_latency = first_token_latency
+        self.token_delay = token_delay
+        self.tokens = tokens
+
+    def stream(self, prompt):
+        time.sleep(self.first_token_latency)
+        topic = re.search(r'"([^"]+)"', prompt)
+        words = (f'Phân tích về {topic.group(1) if topic else "chủ đề"}: ' + 'nội dung tổng hợp từ các bài viết ' * 40).split()
+        for i in range(self.tokens):
+            yield {'model': 'fake', 'response': words[i % len(words)] + ' ', 'done': False}
+            time.sleep(self.token_delay)
+        yield {'model': 'fake', 'response': '', 'done': True}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def split_target(self):
+        """(host, path, query dict) từ đường dẫn dạng /<host>/<path>?<query>"""
+        parsed = urllib.parse.urlsplit(self.path)
+        host, _, path = parsed.path.lstrip('/').partition('/')
+        return host, '/' + path, dict(urllib.parse.parse_qsl(parsed.query)), parsed
+
+    def send_body(self, status, content_type, body):
+        data = body.encode('utf-8') if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        host, path, query, parsed = self.split_target()
+        self.server.count(host)
+        if self.server.page_latency:
+            time.sleep(self.server.page_latency)
+
+        recorded = os.path.join(RECORDED_DIR, host, recorded_name(path + (f'?{parsed.query}' if parsed.query else '')))
+        if os.path.isfile(recorded):
+            with open(recorded, 'rb') as handle:
+                content_type = 'application/xml' if recorded.endswith('.xml') else 'text/html'
+                return self.send_body(200, content_type, handle.read())
+
+        page = self.server.site.render(host, path, query)
+        if page is None:
+            return self.send_body(404, 'text/html', '<html><body>Not found</body></html>')
+        self.send_body(200, *page)
+
+    def do_POST(self):
+        host, path, _, _ = self.split_target()
+        self.server.count(host)
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+        if host != 'ollama' or path != '/api/generate':
+            return self.send_body(404, 'application/json', '{"error": "not found"}')
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for chunk in self.server.ollama.stream(body.get('prompt', '')):
+            line = (json.dumps(chunk, ensure_ascii=False) + '\n').encode('utf-8')
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(line), line))
+            self.wfile.flush()
+        self.wfile.write(b'0\r\n\r\n')
+
+
+class FixtureServer(ThreadingHTTPServer):
+    """Máy chủ fixture chạy nền; `overrides()` trả cấu hình chuyển hướng cho HttpClient"""
+
+    daemon_threads = True
+
+    def __init__(self, host='127.0.0.1', port=0, site=None, ollama=None, page_latency=0.0):
+        super().__init__((host, port), FixtureHandler)
+        self.site = FixtureSite(site or load_site())
+        self.ollama = ollama or FakeOllama()
+        self.page_latency = page_latency
+        self.requests = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def handle_error(self, request, client_address):
+        # Crew đóng kết nối sớm khi đã đủ nội dung bài (tải streaming) - không phải lỗi
+        pass
+
+    @property
+    def base_url(self):
+        return f'http://{self.server_address[0]}:{self.server_address[1]}'
+
+    def count(self, host):
+        with self._lock:
+            self.requests[host] = self.requests.get(host, 0) + 1
+
+    def overrides(self):
+        origins = [f'https://{SITE_HOST}', f'https://www.{SITE_HOST}', f'http://{SITE_HOST}', f'http://www.{SITE_HOST}']
+        origins += [f'https://{host}' for host in SEARCH_HOSTS]
+        return ','.join(f'{origin}={self.base_url}/{host_key(origin.split("://", 1)[1])}' for origin in origins)
+
+    @property
+    def ollama_url(self):
+        return f'{self.base_url}/ollama'
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name='fixture-site', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def record(urls):
+    """Tải trang thật và lưu vào fixtures/recorded/<host>/ để máy chủ fixture phục vụ lại"""
+    import requests
+
+    for url in urls:
+        parsed = urllib.parse.urlsplit(url)
+        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=20)
+        folder = os.path.join(RECORDED_DIR, host_key(parsed.hostname))
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, recorded_name((parsed.path or '/') + (f'?{parsed.query}' if parsed.query else '')))
+        with open(path, 'wb') as handle:
+            handle.write(response.content)
+        print(f'{response.status_code} {url} -> {path} ({len(response.content)} bytes)')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--page-latency', type=float, default=0.0, help='độ trễ mỗi trang (giây)')
+    parser.add_argument('--ollama-latency', type=float, default=0.5, help='thời gian tới token đầu tiên (giây)')
+    parser.add_argument('--ollama-token-delay', type=float, default=0.01, help='khoảng cách giữa các token (giây)')
+    parser.add_argument('--record', nargs='+', metavar='URL', help='ghi trang thật vào fixtures/recorded rồi thoát')
+    args = parser.parse_args(argv)
+
+    if args.record:
+        record(args.record)
+        return 0
+
+    server = FixtureServer(port=args.port, page_latency=args.page_latency,
+                           ollama=FakeOllama(args.ollama_latency, args.ollama_token_delay))
+    print(f'Fixture site: {server.base_url}')
+    print(f'CHATBOT_HTTP_HOST_OVERRIDES={server.overrides()}')
+    print(f'CHATBOT_OLLAMA_URL={server.ollama_url}')
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
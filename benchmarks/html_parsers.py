@@ -0,0 +1,105 @@
+"""So sánh tốc độ các engine phân tích HTML trên các trang 1thegioi.vn đã lưu.
+
+Lưu trang mẫu:   python benchmarks/html_parsers.py --save https://1thegioi.vn/ https://1thegioi.vn/quoc-te
+Chạy benchmark:  python benchmarks/html_parsers.py [file hoặc thư mục .html ...] [--repeat 20]
+
+Mỗi lượt đo gồm parse trang và đúng các thao tác crew.py làm trên trang đó:
+lấy link bài viết (.html) kèm tiêu đề, tìm title/meta ngày đăng và các vùng nội dung.
+"""
+import argparse
+import glob
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from chatbot_1thegioi import html_engine
+
+PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'pages')
+
+CONTENT_SELECTORS = ['.content', '.article-content', '.detail-content', 'article p', 'p', '[class*="content"]']
+
+
+def workload(document):
+    """Các truy vấn crew.py chạy trên một trang chuyên mục/bài viết"""
+    links = [(link.get('href', ''), link.get_text().strip()) for link in document.select('a[href*=".html"]')]
+    title = document.find('title')
+    title = title.get_text(strip=True) if title else ''
+    meta = document.select_one('meta[property="article:published_time"]')
+    published = meta.get('content') if meta else ''
+    parts = []
+    for selector in CONTENT_SELECTORS:
+        parts.extend(element.get_text(strip=True) for element in document.select(selector)[:5])
+    return len(links), title, published, len(''.join(parts))
+
+
+def load_pages(paths):
+    files = []
+    for path in paths or [PAGES_DIR]:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, '*.html'))))
+        elif os.path.isfile(path):
+            files.append(path)
+    pages = []
+    for file in files:
+        with open(file, 'rb') as handle:
+            pages.append((os.path.basename(file), handle.read()))
+    return pages
+
+
+def save_pages(urls):
+    import requests
+
+    os.makedirs(PAGES_DIR, exist_ok=True)
+    for url in urls:
+        response = requests.get(url, headers={'User-Agent': 'Mozilla/5.0'}, timeout=20)
+        name = re.sub(r'[^\w.-]+', '_', url.split('://', 1)[-1]).strip('_') or 'index'
+        path = os.path.join(PAGES_DIR, name if name.endswith('.html') else f'{name}.html')
+        with open(path, 'wb') as handle:
+            handle.write(response.content)
+        print(f'{response.status_code} {url} -> {path} ({len(response.content)} bytes)')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('paths', nargs='*', help='file .html hoặc thư mục (mặc định benchmarks/pages)')
+    parser.add_argument('--repeat', type=int, default=20, help='số lượt đo mỗi trang')
+    parser.add_argument('--save', nargs='+', metavar='URL', help='tải và lưu trang mẫu rồi thoát')
+    args = parser.parse_args(argv)
+
+    if args.save:
+        save_pages(args.save)
+        return 0
+
+    pages = load_pages(args.paths)
+    if not pages:
+        print(f'Không có trang mẫu - lưu trước bằng --save URL (thư mục {PAGES_DIR})')
+        return 1
+
+    engines = [engine for engine in html_engine.ENGINES if html_engine.resolve_engine(engine) == engine]
+    total_bytes = sum(len(content) for _, content in pages)
+    print(f'{len(pages)} trang, {total_bytes / 1024:.0f} KiB, {args.repeat} lượt; engine mặc định: {html_engine.ENGINE}')
+
+    medians = {}
+    for engine in engines:
+        timings = []
+        results = []
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            results = [workload(html_engine.parse_html(content, engine)) for _, content in pages]
+            timings.append(time.perf_counter() - started)
+        medians[engine] = (statistics.median(timings), sum(result[0] for result in results))
+
+    # Hệ số tăng tốc so với html.parser
+    baseline = medians['html.parser'][0]
+    for engine, (median, links) in medians.items():
+        print(f'{engine:12} median {median * 1000:8.1f} ms  ({median * 1000 / len(pages):6.2f} ms/trang, '
+              f'x{baseline / median:4.1f})  links={links}')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,246 @@
+"""Benchmark offline độ trễ tìm kiếm trên site giả lập (benchmarks/fixture_site.py), kết quả dạng JSON.
+
+Chạy:  python benchmarks/search_latency.py [--repeat 2] [--page-latency 0.02] [--summaries] [--output out.json]
+
+Đo cho từng truy vấn trong fixtures/queries.json: độ trễ end-to-end của search_topic_articles,
+recall@3 so với danh sách bài đúng, thời gian từng tầng tìm kiếm, parse HTML và chấm điểm;
+với --summaries đo thêm thời gian tới token đầu tiên và tổng thời gian phân tích AI qua Ollama giả.
+Lượt 1 chạy với cache rỗng, các lượt sau dùng lại cache của lượt trước.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', 'src'))
+sys.path.insert(0, BENCH_DIR)
+
+from fixture_site import FIXTURES_DIR, FakeOllama, FixtureServer
+
+
+def summarize(values):
+    """Thống kê độ trễ (giây) của một dãy số đo"""
+    if not values:
+        return {'count': 0}
+    ordered = sorted(values)
+    return {
+        'count': len(ordered),
+        'total': round(sum(ordered), 4),
+        'mean': round(statistics.fmean(ordered), 4),
+        'p50': round(statistics.median(ordered), 4),
+        'p95': round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 4),
+        'max': round(ordered[-1], 4),
+    }
+
+
+def recall_at(found, relevant, k=3):
+    """Tỉ lệ bài đúng nằm trong k kết quả đầu (chia cho min(k, số bài đúng))"""
+    if not relevant:
+        return None
+    return len(set(found[:k]) & set(relevant)) / min(k, len(relevant))
+
+
+class Timings:
+    """Cộng dồn thời gian theo tên, an toàn khi các tầng chạy song song"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = {}
+
+    def record(self, name, seconds):
+        with self._lock:
+            self.samples.setdefault(name, []).append(seconds)
+
+    def wrap(self, name, fn):
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self.record(name, time.perf_counter() - started)
+        return timed
+
+    def report(self):
+        return {name: summarize(values) for name, values in sorted(self.samples.items())}
+
+
+def configure_environment(server, cache_dir, polite, cse=False):
+    """Trỏ crew về máy chủ fixture; phải gọi trước khi import chatbot_1thegioi"""
+    os.environ['CHATBOT_CACHE_DIR'] = cache_dir
+    os.environ['CHATBOT_HTTP_HOST_OVERRIDES'] = server.overrides()
+    os.environ['CHATBOT_OLLAMA_URL'] = server.ollama_url
+    os.environ['CHATBOT_SUMMARY_CACHE'] = '0'
+    if not polite:
+        # Đo chính mã nguồn, không đo khoảng nghỉ lịch sự với Google/Bing
+        os.environ['CHATBOT_HTTP_RATE'] = '0'
+        os.environ['CHATBOT_HTTP_HOST_RATES'] = ''
+    if cse:
+        # Custom Search API giả của máy chủ fixture (www.googleapis.com cũng được chuyển hướng)
+        os.environ['GOOGLE_API_KEY'] = 'fixture'
+        os.environ['GOOGLE_CX'] = 'fixture'
+    else:
+        # Không gọi Google Custom Search API thật
+        os.environ.pop('GOOGLE_API_KEY', None)
+        os.environ.pop('GOOGLE_CX', None)
+
+
+def instrument(crew, timings):
+    """Gắn bộ đo vào tầng tìm kiếm, parse HTML và chấm điểm của crew"""
+    from chatbot_1thegioi import article_stream
+    from chatbot_1thegioi import crew as crew_module
+
+    get_search_tiers = crew.get_search_tiers
+    crew.get_search_tiers = lambda: [(name, timings.wrap(f'tier.{name}', fn)) for name, fn in get_search_tiers()]
+
+    crew_module.parse_html = timings.wrap('parse.html', crew_module.parse_html)
+    crew_module.parse_sitemap = timings.wrap('parse.sitemap', crew_module.parse_sitemap)
+    article_stream.ArticleExtractor.feed = timings.wrap('parse.stream', article_stream.ArticleExtractor.feed)
+
+    crew.calculate_relevance_score = timings.wrap('score.title', crew.calculate_relevance_score)
+    crew.calculate_content_relevance = timings.wrap('score.content', crew.calculate_content_relevance)
+    crew.rank_candidates = timings.wrap('score.rank', crew.rank_candidates)
+
+    # Giữ lại danh sách bài mà search_topic_articles dùng để tạo báo cáo (cho recall@3)
+    found = {}
+    find_topic_articles_async = crew.find_topic_articles_async
+
+    async def capture(topic):
+        articles = await find_topic_articles_async(topic)
+        found[str(topic)] = articles
+        return articles
+
+    crew.find_topic_articles_async = capture
+    return found
+
+
+def run(args):
+    with open(args.queries, encoding='utf-8') as handle:
+        queries = json.load(handle)['queries']
+
+    server = FixtureServer(page_latency=args.page_latency,
+                           ollama=FakeOllama(args.ollama_latency, args.ollama_token_delay, args.ollama_tokens)).start()
+    cache_dir = tempfile.mkdtemp(prefix='chatbot-bench-')
+    configure_environment(server, cache_dir, args.polite, args.cse)
+
+    from chatbot_1thegioi.crew import Chatbot1thegioiCrew
+    from chatbot_1thegioi.urls import canonical_url
+
+    output = sys.stderr if args.verbose else io.StringIO()
+    timings = Timings()
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        crew = Chatbot1thegioiCrew()
+    startup = time.perf_counter() - started
+    found = instrument(crew, timings)
+
+    runs = []
+    for repeat in range(1, args.repeat + 1):
+        results = []
+        for query in queries:
+            topic = query['topic']
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(output):
+                report = crew.search_topic_articles(topic)
+            latency = time.perf_counter() - started
+
+            urls = [canonical_url(article['url']) for article in found.get(topic, [])]
+            relevant = [canonical_url(url) for url in query.get('relevant', [])]
+            results.append({
+                'topic': topic,
+                'latency': round(latency, 4),
+                'recall_at_3': recall_at(urls, relevant),
+                'found': urls,
+                'report_chars': len(report or ''),
+            })
+        recalls = [result['recall_at_3'] for result in results if result['recall_at_3'] is not None]
+        runs.append({
+            'repeat': repeat,
+            'cache': 'cold' if repeat == 1 else 'warm',
+            'latency': summarize([result['latency'] for result in results]),
+            'recall_at_3': round(statistics.fmean(recalls), 4) if recalls else None,
+            'queries': results,
+        })
+
+    summaries = None
+    if args.summaries:
+        first_tokens, totals = [], []
+        for query in queries:
+            articles = found.get(query['topic']) or []
+            if not articles:
+                continue
+            first = []
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(output):
+                crew.summarize_with_ollama(query['topic'], articles,
+                                           on_text=lambda text: first or first.append(time.perf_counter() - started))
+            totals.append(time.perf_counter() - started)
+            if first:
+                first_tokens.append(first[0])
+        summaries = {'first_token': summarize(first_tokens), 'total': summarize(totals),
+                     'llm_scheduler': crew.llm_scheduler.stats()}
+
+    server.stop()
+    from chatbot_1thegioi.metrics import metrics
+    return {
+        'benchmark': 'search_latency',
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'config': {
+            'queries': len(queries),
+            'repeat': args.repeat,
+            'page_latency': args.page_latency,
+            'ollama_latency': args.ollama_latency,
+            'ollama_token_delay': args.ollama_token_delay,
+            'polite': args.polite,
+            'cse': args.cse,
+            'python': sys.version.split()[0],
+        },
+        'startup': round(startup, 4),
+        'runs': runs,
+        'timings': timings.report(),
+        'summaries': summaries,
+        'fixture_requests': dict(sorted(server.requests.items())),
+        'metrics': metrics.snapshot(),
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--queries', default=os.path.join(FIXTURES_DIR, 'queries.json'),
+                        help='file truy vấn và danh sách bài đúng')
+    parser.add_argument('--repeat', type=int, default=2, help='số lượt chạy toàn bộ truy vấn (lượt 1 cache rỗng)')
+    parser.add_argument('--page-latency', type=float, default=0.0, help='độ trễ giả lập mỗi trang (giây)')
+    parser.add_argument('--ollama-latency', type=float, default=0.5, help='thời gian tới token đầu tiên của Ollama giả')
+    parser.add_argument('--ollama-token-delay', type=float, default=0.005, help='khoảng cách giữa các token')
+    parser.add_argument('--ollama-tokens', type=int, default=120, help='số token mỗi lượt sinh')
+    parser.add_argument('--summaries', action='store_true', help='đo thêm phân tích AI qua Ollama giả')
+    parser.add_argument('--cse', action='store_true', help='bật tầng Google Custom Search API (giả lập)')
+    parser.add_argument('--polite', action='store_true', help='giữ tốc độ gửi request theo cấu hình thật')
+    parser.add_argument('--output', help='ghi JSON vào file (mặc định in ra stdout)')
+    parser.add_argument('--verbose', action='store_true', help='hiện log của crew (ra stderr)')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    result = run(args)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            handle.write(text + '\n')
+        latest = result['runs'][-1]
+        print(f"{args.output}: p50 {latest['latency'].get('p50')}s, recall@3 {latest['recall_at_3']}", file=sys.stderr)
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+"""Benchmark thời gian khởi động CLI: import entry point trong tiến trình Python mới, kiểm tra ngân sách.
+
+Chạy:  python benchmarks/startup_time.py [--repeat 5] [--budget 0.5] [--output out.json]
+
+Mỗi lượt chạy một interpreter mới, đo thời gian import chatbot_1thegioi.main + crew (chưa tính khởi
+động interpreter) và thời gian tạo Chatbot1thegioiCrew, ghi lại module nặng nào đã bị nạp.
+Thoát với mã 1 nếu trung vị thời gian import vượt --budget giây hoặc có module nặng bị nạp lúc import
+(crewai, googleapiclient, bs4... chỉ được nạp khi thật sự dùng).
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BENCH_DIR, '..', 'src')
+
+# Module không được nạp chỉ vì import entry point
+LAZY_MODULES = ('crewai', 'googleapiclient', 'bs4', 'docx', 'selectolax', 'lxml', 'yaml')
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import chatbot_1thegioi.main
+from chatbot_1thegioi.crew import Chatbot1thegioiCrew
+imported = time.perf_counter()
+loaded = [name for name in {lazy!r} if name in sys.modules]
+crew = Chatbot1thegioiCrew() if {with_crew!r} else None
+constructed = time.perf_counter()
+print(json.dumps({{'import': imported - started, 'crew': constructed - imported, 'loaded': loaded}}))
+"""
+
+
+def run_child(with_crew, cache_dir, importtime=False):
+    """Chạy một interpreter mới; trả về (số đo, stderr của -X importtime)"""
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [SRC_DIR, os.environ.get('PYTHONPATH')])),
+               CHATBOT_CACHE_DIR=cache_dir)
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + \
+        ['-c', CHILD.format(lazy=LAZY_MODULES, with_crew=with_crew)]
+    result = subprocess.run(command, env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def slowest_imports(importtime_log, limit=15):
+    """Các module có thời gian import tích luỹ lớn nhất từ log -X importtime"""
+    rows = []
+    for line in importtime_log.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line.partition(':')[2].split('|')
+        rows.append({'module': name.strip(), 'self_ms': int(self_us) / 1000, 'cumulative_ms': int(cumulative_us) / 1000})
+    return sorted(rows, key=lambda row: row['cumulative_ms'], reverse=True)[:limit]
+
+
+def run(args):
+    cache_dir = tempfile.mkdtemp(prefix='chatbot-startup-')
+    samples = [run_child(not args.no_crew, cache_dir)[0] for _ in range(args.repeat)]
+    # Một lượt riêng với -X importtime (làm chậm import nên không tính vào số đo)
+    _, importtime_log = run_child(False, cache_dir, importtime=True)
+
+    import_times = [sample['import'] for sample in samples]
+    loaded = sorted({name for sample in samples for name in sample['loaded']})
+    median_import = statistics.median(import_times)
+    return {
+        'benchmark': 'startup_time',
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'config': {'repeat': args.repeat, 'budget': args.budget, 'python': sys.version.split()[0]},
+        'import': {
+            'median': round(median_import, 4),
+            'min': round(min(import_times), 4),
+            'max': round(max(import_times), 4),
+        },
+        'crew_init': None if args.no_crew else round(statistics.median(sample['crew'] for sample in samples), 4),
+        'lazy_modules_loaded': loaded,
+        'slowest_imports': slowest_imports(importtime_log),
+        'within_budget': median_import <= args.budget and not loaded,
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--repeat', type=int, default=5, help='số interpreter mới cần đo')
+    parser.add_argument('--budget', type=float, default=float(os.getenv('CHATBOT_STARTUP_BUDGET', 0.5)),
+                        help='ngân sách trung vị thời gian import (giây)')
+    parser.add_argument('--no-crew', action='store_true', help='không đo thời gian tạo Chatbot1thegioiCrew')
+    parser.add_argument('--output', help='ghi JSON vào file (mặc định in ra stdout)')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    result = run(args)
+    text = json.dumps(result, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            handle.write(text + '\n')
+    else:
+        print(text)
+
+    if result['lazy_modules_loaded']:
+        print(f"❌ Import entry point đã nạp module nặng: {', '.join(result['lazy_modules_loaded'])}", file=sys.stderr)
+    if result['import']['median'] > args.budget:
+        print(f"❌ Import mất {result['import']['median']}s, vượt ngân sách {args.budget}s", file=sys.stderr)
+    if not result['within_budget']:
+        return 1
+    print(f"✅ Import {result['import']['median']}s (ngân sách {args.budget}s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,67 @@
+"""Agent và task CrewAI của chatbot (config/agents.yaml, config/tasks.yaml).
+
+Tách khỏi crew.py để đường tìm kiếm không phải import crewai; lấy qua
+Chatbot1thegioiCrew.agent_crew() khi thật sự chạy agent.
+"""
+from crewai import Agent, Crew, Process, Task
+from crewai.project import CrewBase, agent, crew, task
+
+
+@CrewBase
+class Chatbot1thegioiAgents():
+    """Các agent chào hỏi, điều phối, cung cấp bài theo chuyên mục và tóm tắt kết quả tìm kiếm"""
+
+    agents_config = 'config/agents.yaml'
+    tasks_config = 'config/tasks.yaml'
+
+    @agent
+    def greeter(self) -> Agent:
+        return Agent(
+            config=self.agents_config['greeter'],
+            verbose=True
+        )
+    
+    @agent  
+    def controller(self) -> Agent:
+        return Agent(
+            config=self.agents_config['controller'],
+            verbose=True
+        )
+    
+    @agent
+    def category_provider(self) -> Agent:
+        return Agent(
+            config=self.agents_config['category_provider'],
+            verbose=True
+        )
+    
+    @agent
+    def search_summarizer(self) -> Agent:
+        return Agent(
+            config=self.agents_config['search_summarizer'], 
+            verbose=True
+        )
+
+    @task
+    def greet_task(self) -> Task:
+        return Task(
+            config=self.tasks_config['greet_task']
+        )
+    
+    @task
+    def control_task(self) -> Task:
+        return Task(
+            config=self.tasks_config['control_task']
+        )
+    
+    @task
+    def category_task(self) -> Task:
+        return Task(
+            config=self.tasks_config['category_task']
+        )
+    
+    @task
+    def search_summary_task(self) -> Task:
+        return Task(
+            config=self.tasks_config['search_summary_task']
+        )
@@ -0,0 +1,135 @@
+"""Cache nội dung bài viết trên đĩa (SQLite) cho get_article_content"""
+import os
+import sqlite3
+import threading
+import time
+
+from chatbot_1thegioi import settings
+from chatbot_1thegioi.urls import canonical_url
+
+
+class ArticleCache:
+    """Lưu nội dung đã trích xuất, tiêu đề và thời điểm tải của từng bài, khoá theo URL chuẩn hoá.
+
+    Bản ghi quá TTL coi như không có; khi vượt số bản ghi tối đa, các bài lâu không
+    được đọc nhất bị xoá trước.
+    """
+
+    def __init__(self, path=None, ttl=None, max_entries=None):
+        self.path = path or os.path.join(settings.CACHE_DIR, 'articles.sqlite3')
+        self.ttl = settings.ARTICLE_CACHE_TTL if ttl is None else ttl
+        self.max_entries = settings.ARTICLE_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                title TEXT,
+                content TEXT NOT NULL,
+                published TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_accessed ON articles (accessed_at)")
+
+        # Cache tạo từ phiên bản cũ chưa có cột ngày đăng
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(articles)")}
+        if 'published' not in columns:
+            self._conn.execute("ALTER TABLE articles ADD COLUMN published TEXT")
+        self._conn.commit()
+
+    def get(self, url):
+        """Trả về {'url', 'title', 'content', 'published', 'fetched_at'} nếu còn hạn, ngược lại None"""
+        key = canonical_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title, content, published, fetched_at FROM articles WHERE url = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            title, content, published, fetched_at = row
+            if self.ttl and now - fetched_at > self.ttl:
+                self._conn.execute("DELETE FROM articles WHERE url = ?", (key,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute("UPDATE articles SET accessed_at = ? WHERE url = ?", (now, key))
+            self._conn.commit()
+
+        return {'url': key, 'title': title, 'content': content, 'published': published or '', 'fetched_at': fetched_at}
+
+    def put(self, url, content, title='', published=''):
+        """Lưu (hoặc ghi đè) nội dung bài viết rồi dọn bớt nếu vượt kích thước"""
+        key = canonical_url(url)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO articles (url, title, content, published, fetched_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, title or '', content, published or '', now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        """Xoá các bài ít được đọc nhất khi vượt max_entries (gọi khi đang giữ lock)"""
+        if not self.max_entries:
+            return
+        count = self._conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM articles WHERE url IN (SELECT url FROM articles ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def purge(self, expired_only=False):
+        """Xoá toàn bộ cache (hoặc chỉ các bài hết hạn), trả về số bản ghi đã xoá"""
+        with self._lock:
+            if expired_only:
+                if not self.ttl:
+                    return 0
+                cursor = self._conn.execute(
+                    "DELETE FROM articles WHERE fetched_at < ?", (time.time() - self.ttl,)
+                )
+            else:
+                cursor = self._conn.execute("DELETE FROM articles")
+            self._conn.commit()
+        return cursor.rowcount
+
+    def stats(self):
+        """Thống kê cache: số bài, dung lượng nội dung, bài cũ/mới nhất"""
+        with self._lock:
+            count, content_bytes, oldest, newest = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(content)), 0), MIN(fetched_at), MAX(fetched_at) FROM articles"
+            ).fetchone()
+            expired = 0
+            if self.ttl:
+                expired = self._conn.execute(
+                    "SELECT COUNT(*) FROM articles WHERE fetched_at < ?", (time.time() - self.ttl,)
+                ).fetchone()[0]
+
+        return {
+            'path': self.path,
+            'entries': count,
+            'expired': expired,
+            'content_bytes': content_bytes,
+            'oldest': oldest,
+            'newest': newest,
+            'ttl': self.ttl,
+            'max_entries': self.max_entries,
+        }
+
+    def recent(self, limit=20):
+        """Danh sách (url, title, fetched_at) các bài mới tải gần nhất"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT url, title, fetched_at FROM articles ORDER BY fetched_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
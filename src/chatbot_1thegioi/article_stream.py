@@ -0,0 +1,190 @@
+"""Tải bài viết dạng streaming: đọc response từng đoạn, trích nội dung tăng dần và dừng khi đủ ngân sách"""
+import codecs
+import re
+from html.parser import HTMLParser
+
+from chatbot_1thegioi import settings
+
+# Thẻ không có thẻ đóng - không đưa vào ngăn xếp
+_VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+# Thẻ bỏ qua toàn bộ nội dung
+_SKIPPED_TAGS = {'script', 'style', 'noscript', 'template', 'svg'}
+
+# Class của vùng nội dung chính (tương ứng các selector của extract_article_content)
+_CONTENT_CLASS = re.compile(r'content|article|detail|post-body|entry|news-text|main-text')
+
+# Meta chứa ngày đăng, theo thứ tự ưu tiên
+_PUBLISHED_META = [('property', 'article:published_time'), ('itemprop', 'datePublished'),
+                   ('name', 'pubdate'), ('name', 'publishdate')]
+
+
+class ArticleExtractor(HTMLParser):
+    """Trích tiêu đề, ngày đăng và đoạn văn khi HTML được nạp dần qua feed().
+
+    Đoạn văn (<p>, hơn 20 ký tự) trong vùng nội dung được ưu tiên; đủ `budget` ký tự
+    thì `enough` bật để bên tải dừng đọc phần còn lại của trang.
+    """
+
+    def __init__(self, budget=None):
+        super().__init__(convert_charrefs=True)
+        self.budget = budget or settings.ARTICLE_CONTENT_BUDGET
+        self.title = ''
+        self.heading = ''
+        self.published_candidates = {}
+        self.zone_parts = []
+        self.other_parts = []
+        self.body_text = []
+
+        self._stack = []
+        self._zone_depth = 0
+        self._skip_depth = 0
+        self._in_title = False
+        self._heading = None
+        self._paragraph = None
+        self._zone_length = 0
+        self._body_length = 0
+
+    @property
+    def enough(self):
+        return self._zone_length >= self.budget
+
+    @property
+    def published(self):
+        for key in _PUBLISHED_META:
+            if self.published_candidates.get(key):
+                return self.published_candidates[key]
+        return ''
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == 'meta':
+            for name in ('property', 'itemprop', 'name'):
+                key = (name, (attrs.get(name) or '').strip())
+                if key in _PUBLISHED_META and attrs.get('content'):
+                    self.published_candidates.setdefault(key, attrs['content'].strip())
+            return
+        if tag in _VOID_TAGS:
+            return
+
+        if tag in ('p', 'div') and self._paragraph is not None:
+            self._flush_paragraph()
+
+        is_zone = bool(_CONTENT_CLASS.search((attrs.get('class') or '').lower())) or tag == 'article'
+        self._stack.append((tag, is_zone))
+        if is_zone:
+            self._zone_depth += 1
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == 'title' and not self.title:
+            self._in_title = True
+        elif tag in ('h1', 'h2') and not self.heading and self._heading is None:
+            self._heading = []
+        elif tag == 'p':
+            self._paragraph = []
+
+    def handle_endtag(self, tag):
+        if tag in _VOID_TAGS or not any(open_tag == tag for open_tag, _ in self._stack):
+            return
+        # Đóng luôn các thẻ con chưa đóng (HTML thực tế hay thiếu thẻ đóng)
+        while self._stack:
+            open_tag, is_zone = self._stack.pop()
+            self._close(open_tag, is_zone)
+            if open_tag == tag:
+                break
+
+    def _close(self, tag, is_zone):
+        if is_zone:
+            self._zone_depth -= 1
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth -= 1
+        elif tag == 'title':
+            self._in_title = False
+        elif tag in ('h1', 'h2') and self._heading is not None:
+            self.heading = ''.join(self._heading)
+            self._heading = None
+        elif tag == 'p' and self._paragraph is not None:
+            self._flush_paragraph()
+
+    def handle_data(self, data):
+        if self._skip_depth:
+            return
+        text = data.strip()
+        if not text:
+            return
+        if self._in_title:
+            self.title += text
+            return
+        if self._heading is not None:
+            self._heading.append(text)
+        if self._paragraph is not None:
+            self._paragraph.append(text)
+        if self._body_length < 1000:
+            self.body_text.append(text)
+            self._body_length += len(text)
+
+    def _flush_paragraph(self):
+        text = ''.join(self._paragraph)
+        self._paragraph = None
+        if len(text) <= 20:
+            return
+        if self._zone_depth:
+            self.zone_parts.append(text)
+            self._zone_length += len(text) + 1
+        else:
+            self.other_parts.append(text)
+
+    def result(self):
+        """Tiêu đề, ngày đăng và nội dung (tối đa `budget` ký tự) đã trích được"""
+        if self._paragraph is not None:
+            self._flush_paragraph()
+
+        content = ' '.join(self.zone_parts)
+        if len(content) < 200:
+            content = max(content, ' '.join(self.other_parts), key=len)
+        if len(content) < 50:
+            content = ''.join(self.body_text)[:1000]
+
+        return {
+            'title': self.title or self.heading,
+            'published': self.published,
+            'content': content[:self.budget],
+        }
+
+
+def response_encoding(response):
+    """Bảng mã của response; header không khai báo charset thì coi là UTF-8 thay vì ISO-8859-1"""
+    content_type = (response.headers.get('Content-Type') or '').lower()
+    if 'charset' in content_type and response.encoding:
+        return response.encoding
+    return 'utf-8'
+
+
+def stream_article(http, url, budget=None, max_bytes=None, timeout=10):
+    """Tải bài viết theo từng đoạn, dừng khi đã đủ nội dung hoặc chạm giới hạn byte.
+
+    Trả về dict {'url', 'title', 'content', 'published', 'bytes_read'} hoặc None nếu HTTP lỗi.
+    """
+    max_bytes = max_bytes or settings.ARTICLE_MAX_BYTES
+    response = http.get(url, timeout=timeout, stream=True)
+    try:
+        if response.status_code != 200:
+            return None
+
+        extractor = ArticleExtractor(budget)
+        decoder = codecs.getincrementaldecoder(response_encoding(response))(errors='replace')
+        bytes_read = 0
+        for chunk in response.iter_content(chunk_size=settings.ARTICLE_CHUNK_SIZE):
+            bytes_read += len(chunk)
+            extractor.feed(decoder.decode(chunk))
+            if extractor.enough or bytes_read >= max_bytes:
+                break
+        else:
+            extractor.feed(decoder.decode(b'', final=True))
+
+        article = extractor.result()
+        article.update(url=url, bytes_read=bytes_read)
+        return article
+    finally:
+        # Đóng sớm: phần còn lại của trang không được tải
+        response.close()
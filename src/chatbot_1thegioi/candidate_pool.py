@@ -0,0 +1,103 @@
+"""Hàng ứng viên dùng chung cho các tầng tìm kiếm: xếp hạng bằng tín hiệu rẻ (tiêu đề/URL), chỉ tải nội dung bài đứng đầu"""
+import heapq
+import itertools
+
+from chatbot_1thegioi import settings
+from chatbot_1thegioi.urls import canonical_url
+
+
+class Candidate:
+    """Một bài tìm thấy nhưng chưa tải nội dung: URL chuẩn hoá, tiêu đề, điểm tiêu đề và tầng đã tìm ra"""
+
+    __slots__ = ('url', 'title', 'relevance_score', 'rank', 'source', 'snippet')
+
+    def __init__(self, url, title, relevance_score, source, rank=0.0, snippet=''):
+        self.url = canonical_url(url)
+        self.title = title.strip()
+        self.relevance_score = relevance_score
+        self.rank = rank
+        self.source = source
+        self.snippet = snippet
+
+    @property
+    def priority(self):
+        # Điểm tiêu đề trước, BM25F phân định các ứng viên cùng điểm
+        return (self.relevance_score, self.rank)
+
+    @property
+    def title_key(self):
+        return ' '.join(self.title.lower().split())
+
+    def __repr__(self):
+        return f'Candidate({self.url!r}, score={self.relevance_score}, source={self.source!r})'
+
+
+class CandidatePool:
+    """Giữ tối đa `capacity` ứng viên điểm cao nhất từ mọi tầng (heap nhỏ nhất để loại ứng viên yếu nhất).
+
+    Mỗi bài chỉ có một chỗ: trùng URL chuẩn hoá hoặc cùng tiêu đề thì giữ bản điểm cao hơn. Ứng viên đã
+    lấy ra để tải (`take`) không được nhận lại, kể cả khi tầng khác tìm ra sau đó. Pool chỉ được dùng
+    từ một luồng (event loop hoặc luồng gọi) nên không cần khoá.
+    """
+
+    def __init__(self, capacity=None):
+        self.capacity = settings.CANDIDATE_POOL_SIZE if capacity is None else capacity
+        self._heap = []
+        self._entries = {}
+        self._titles = {}
+        self._taken = set()
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add(self, candidate):
+        """Thêm ứng viên; trả về False nếu bị bỏ (đã tải, trùng bản tốt hơn hoặc yếu hơn mọi ứng viên khi pool đầy)"""
+        if not candidate.url or candidate.url in self._taken or candidate.title_key in self._taken:
+            return False
+
+        for other_url in (candidate.url, self._titles.get(candidate.title_key)):
+            other = self._entries.get(other_url)
+            if other is None:
+                continue
+            if other.priority >= candidate.priority:
+                return False
+            self._remove(other)
+
+        entry = (candidate.priority, next(self._counter), candidate)
+        self._entries[candidate.url] = candidate
+        self._titles[candidate.title_key] = candidate.url
+        heapq.heappush(self._heap, entry)
+
+        # Vượt sức chứa thì bỏ ứng viên yếu nhất (có thể chính là ứng viên vừa thêm)
+        while len(self._entries) > self.capacity:
+            weakest = self._pop_weakest()
+            if weakest is candidate:
+                return False
+        return True
+
+    def extend(self, candidates):
+        """Thêm nhiều ứng viên, trả về số ứng viên được nhận"""
+        return sum(self.add(candidate) for candidate in candidates)
+
+    def take(self, count):
+        """Lấy ra `count` ứng viên điểm cao nhất để tải nội dung"""
+        best = heapq.nlargest(count, self._entries.values(), key=lambda candidate: candidate.priority)
+        for candidate in best:
+            self._remove(candidate)
+            self._taken.update((candidate.url, candidate.title_key))
+        return best
+
+    def _remove(self, candidate):
+        # Phần tử trong heap được bỏ dần khi lên tới đỉnh (_pop_weakest)
+        del self._entries[candidate.url]
+        if self._titles.get(candidate.title_key) == candidate.url:
+            del self._titles[candidate.title_key]
+
+    def _pop_weakest(self):
+        while self._heap:
+            _, _, candidate = heapq.heappop(self._heap)
+            if self._entries.get(candidate.url) is candidate:
+                self._remove(candidate)
+                return candidate
+        return None
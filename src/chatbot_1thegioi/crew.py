@@ -1,92 +1,574 @@
-from bs4 import BeautifulSoup
+import asyncio
+import contextvars
+import logging
 import os
 import re
 import requests
 import urllib.parse
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from crewai import Agent, Crew, Process, Task
-from crewai.project import CrewBase, agent, crew, task
 
-try:
-    from googleapiclient.discovery import build
-    GOOGLE_API_AVAILABLE = True
-except ImportError:
-    GOOGLE_API_AVAILABLE = False
-    # Google API client không có sẵn
+from chatbot_1thegioi import settings
+from chatbot_1thegioi.article_cache import ArticleCache
+from chatbot_1thegioi.article_stream import stream_article
+from chatbot_1thegioi.candidate_pool import Candidate, CandidatePool
+from chatbot_1thegioi.dedupe import unique_articles
+from chatbot_1thegioi.google_cse import CustomSearchClient, CustomSearchStore, QuotaExhausted
+from chatbot_1thegioi.http_cache import HttpCache
+from chatbot_1thegioi.html_engine import parse_html
+from chatbot_1thegioi.http_client import HttpClient, cancel_token
+from chatbot_1thegioi.llm_scheduler import LLMScheduler, QueueFull
+from chatbot_1thegioi.metrics import metrics
+from chatbot_1thegioi.ollama_client import OllamaClient, OllamaTimeout
+from chatbot_1thegioi.query_plan import QueryPlan
+from chatbot_1thegioi.ranking import BM25FRanker
+from chatbot_1thegioi.search_index import SearchIndex
+from chatbot_1thegioi.single_flight import SingleFlight, normalize_topic
+from chatbot_1thegioi.sitemap import parse_sitemap, sitemaps_from_robots
+from chatbot_1thegioi.sitemap_watcher import SitemapWatcher
+from chatbot_1thegioi.summary_cache import SummaryCache, summary_key
+from chatbot_1thegioi.topics import KEYWORD_RELATIONS, KEYWORD_SYNONYMS, irrelevant_terms
+from chatbot_1thegioi.urls import canonical_url, is_site_host
+
+logger = logging.getLogger(__name__)
+
+# Tập URL đã tải nội dung trong lượt tìm kiếm hiện tại (để đếm bài tải về nhưng bị loại)
+fetch_log = contextvars.ContextVar('fetch_log', default=None)
 
-@CrewBase
 class Chatbot1thegioiCrew():
     """Chatbot tìm kiếm dựa trên input người dùng qua Google site search"""
 
-    agents_config = 'config/agents.yaml'
-    tasks_config = 'config/tasks.yaml'
+    # Phiên bản prompt phân tích AI - tăng khi sửa build_summary_prompt để bỏ các bản phân tích cũ trong cache
+    SUMMARY_PROMPT_VERSION = 1
+
+    # Danh sách chuyên mục chính (có thể mở rộng nếu cần)
+    MAIN_SECTIONS = [
+        '',  # Trang chủ
+        'thoi-su',
+        'kinh-te-40',
+        'ai-blockchain',
+        'nhip-dap-cong-nghe',
+        'dot-pha',
+        'ca-phe-mot-the-gioi',
+        'cong-nghe-quan-su',  # Military technology section
+        'the-thao',
+        'giai-tri',
+        'suc-khoe',
+        'doi-song',
+        'quoc-te',
+        'giao-duc',
+        'moi-truong',
+        'phap-luat',
+        'van-hoa',
+        'du-lich',
+        'ban-doc',
+        'video',
+    ]
+
+    # Sitemap/RSS thường gặp của 1thegioi.vn
+    SITEMAP_URLS = [
+        'https://1thegioi.vn/sitemap.xml',
+        'https://1thegioi.vn/sitemap_index.xml',
+        'https://1thegioi.vn/rss.xml',
+        'https://1thegioi.vn/feed',
+        'https://1thegioi.vn/feed.xml',
+    ]
 
     def __init__(self):
         # Google Custom Search API configuration
         self.google_api_key = os.getenv('GOOGLE_API_KEY')  # Từ environment variable
         self.google_cx = os.getenv('GOOGLE_CX')  # Custom Search Engine ID
         
-        if not self.google_api_key or not self.google_cx:
-            # Google API Key hoặc CX không được cấu hình
-            self.use_google_api = False
-        else:
-            self.use_google_api = GOOGLE_API_AVAILABLE
-            # Google Custom Search API đã sẵn sàng
+        # Gọi thẳng endpoint JSON qua HttpClient nên chỉ cần Key và CX
+        self.use_google_api = bool(self.google_api_key and self.google_cx)
+
+        # HTTP cache có revalidate cho trang chuyên mục và sitemap
+        http_cache = None
+        if settings.HTTP_CACHE_ENABLED:
+            try:
+                http_cache = HttpCache()
+            except Exception as e:
+                logger.warning("Không mở được HTTP cache - luôn tải đầy đủ: %s", e)
+                http_cache = None
+
+        # HTTP client dùng chung (pool keep-alive theo host) cho mọi đường fetch
+        self.http = HttpClient(cache=http_cache)
+
+        # Client Custom Search dùng suốt phiên: cache kết quả theo truy vấn và đếm hạn mức mỗi ngày
+        self.cse = None
+        if self.use_google_api:
+            cse_store = None
+            try:
+                cse_store = CustomSearchStore()
+            except Exception as e:
+                logger.warning("Không mở được cache Custom Search - đếm hạn mức trong bộ nhớ: %s", e)
+            self.cse = CustomSearchClient(self.http, self.google_api_key, self.google_cx, store=cse_store)
+
+        # Cache nội dung bài viết trên đĩa - bài đã tải không cần tải lại
+        self.article_cache = None
+        if settings.ARTICLE_CACHE_ENABLED:
+            try:
+                self.article_cache = ArticleCache()
+            except Exception as e:
+                logger.warning("Không mở được cache (thư mục không ghi được...) - chạy không cache: %s", e)
+                self.article_cache = None
+
+        # Cache phần phân tích AI theo nội dung - cùng bài, cùng model thì không gọi lại Ollama
+        self.summary_cache = None
+        if settings.SUMMARY_CACHE_ENABLED:
+            try:
+                self.summary_cache = SummaryCache()
+            except Exception as e:
+                logger.warning("Không mở được cache - luôn gọi Ollama: %s", e)
+                self.summary_cache = None
+
+        # Chỉ mục ngược cục bộ - trả lời truy vấn không cần crawl khi đã có bài
+        self.search_index = None
+        if settings.SEARCH_INDEX_ENABLED:
+            try:
+                self.search_index = SearchIndex()
+            except Exception as e:
+                logger.warning("Không mở được chỉ mục - chỉ dùng tìm kiếm trực tuyến: %s", e)
+                self.search_index = None
+
+        # Bộ xếp hạng BM25F: thống kê corpus nạp từ chỉ mục, cập nhật thêm khi gặp bài mới
+        self.ranker = BM25FRanker()
+        if self.search_index is not None:
+            try:
+                self.ranker.seed(self.search_index.documents())
+            except Exception as e:
+                logger.warning("Chỉ mục hỏng - thống kê sẽ được xây dần trong phiên: %s", e)
+
+        # Client Ollama (stream) cho báo cáo phân tích bằng AI
+        self.ollama = OllamaClient(self.http)
+
+        # Hàng đợi có giới hạn trước Ollama - nhiều yêu cầu cùng lúc thì xếp hàng hoặc bị từ chối sớm
+        self.llm_scheduler = LLMScheduler()
+
+        # Gộp các lượt tìm kiếm, phân tích AI và tải bài trùng nhau đang chạy cùng lúc
+        self.single_flight = SingleFlight()
+
+        # Watcher sitemap/RSS (chỉ chạy khi được bật qua start_sitemap_watcher)
+        self.sitemap_watcher = None
+
+        # Agent/task CrewAI - không dùng trên đường tìm kiếm nên chỉ dựng khi cần (agent_crew)
+        self._agent_crew = None
+
+        # Worker pool giới hạn cho việc quét chuyên mục và tải bài song song
+        self.executor = ThreadPoolExecutor(max_workers=settings.CRAWL_WORKERS, thread_name_prefix='crawl')
+
+        # Pool riêng cho các tầng tìm kiếm chạy đồng thời (tách khỏi pool tải bài để tránh deadlock)
+        self.tier_executor = ThreadPoolExecutor(max_workers=settings.SEARCH_TIER_WORKERS, thread_name_prefix='tier')
+
+    def submit(self, fn, *args):
+        """Đưa tác vụ vào worker pool, giữ nguyên ngữ cảnh (token huỷ) của luồng gọi"""
+        return self.executor.submit(contextvars.copy_context().run, fn, *args)
 
     def search_topic_articles(self, topic):
         """Tìm kiếm bài viết dựa trên input của người dùng qua Google site search"""
-        return self.search_via_google_site(topic)
+        return asyncio.run(self.search_topic_articles_async(topic))
+
+    def find_topic_articles(self, topic):
+        """Tìm tối đa 3 bài liên quan nhất (không tạo báo cáo), dùng khi cần chính danh sách bài"""
+        return asyncio.run(self.find_topic_articles_async(topic))
+
+    def get_search_tiers(self):
+        """Danh sách các tầng tìm kiếm (tên, hàm trả về ứng viên chưa tải nội dung) theo thứ tự ưu tiên"""
+        tiers = [('direct_1thegioi', self.direct_candidates)]
+        # Gần hết hạn mức Custom Search trong ngày thì để các tầng khác lo
+        if self.use_google_api and self.cse.available():
+            tiers.append(('google_api', self.google_api_candidates))
+        tiers.append(('google_site', self.google_site_candidates))
+        # Sitemap đã được watcher đồng bộ vào chỉ mục cục bộ thì không cần đọc lại mỗi truy vấn
+        if not self.sitemap_synced_recently():
+            tiers.append(('sitemap', self.sitemap_candidates))
+        return tiers
+
+    def sitemap_synced_recently(self):
+        """Chỉ mục cục bộ đã được đồng bộ sitemap trong khoảng 2 chu kỳ watcher gần đây"""
+        if self.search_index is None:
+            return False
+        last_check = self.search_index.last_feed_check()
+        return bool(last_check) and time.time() - last_check < 2 * settings.SITEMAP_WATCH_INTERVAL
+
+    def start_sitemap_watcher(self, interval=None):
+        """Chạy watcher sitemap/RSS nền để giữ chỉ mục cục bộ luôn mới"""
+        if self.search_index is None:
+            return None
+        if self.sitemap_watcher is None:
+            self.sitemap_watcher = SitemapWatcher(self, interval=interval)
+        return self.sitemap_watcher.start()
+
+    async def search_topic_articles_async(self, topic):
+        """Tìm bài viết rồi tạo báo cáo tóm tắt 3 bài liên quan nhất"""
+        plan = self.build_query_plan(topic)
+        try:
+            articles = await self.find_topic_articles_async(plan)
+        except Exception as e:
+            logger.warning("Lỗi trong quá trình tìm kiếm: %s", e)
+            return self.create_default_report(plan.topic)
+        return self.build_search_report(plan.topic, articles)
+
+    async def find_topic_articles_async(self, topic):
+        """Tìm tối đa 3 bài liên quan nhất; các lượt tìm cùng chủ đề đang chạy đồng thời dùng chung một lượt crawl"""
+        # Phân tích câu hỏi một lần, dùng chung cho mọi tầng và mọi lần chấm điểm (dựng matcher tốn CPU nên chạy ngoài event loop)
+        plan = await asyncio.get_running_loop().run_in_executor(self.executor, self.build_query_plan, topic)
+        with metrics.timer('chatbot_search_seconds'):
+            articles, shared = await self.single_flight.do_async(
+                ('search', normalize_topic(plan.topic)), lambda: self.crawl_topic_articles_async(plan)
+            )
+        return list(articles)
+
+    async def crawl_topic_articles_async(self, plan):
+        """Chạy đồng thời mọi tầng tìm kiếm, gom ứng viên vào một pool và chỉ tải nội dung các ứng viên đứng đầu.
+
+        Mỗi đợt tải đúng số bài còn thiếu để đủ 3; ứng viên nào không qua kiểm tra nội dung (hoặc gần trùng
+        bài đã chọn) thì đợt sau lấy tiếp ứng viên kế tiếp trong pool. Các bước tốn CPU (xếp hạng BM25F, chấm
+        điểm nội dung, so trùng) chạy trong pool luồng để event loop của server vẫn phục vụ được request khác.
+        """
+
+        loop = asyncio.get_running_loop()
+
+        # Bước 0: Trả lời ngay từ chỉ mục cục bộ nếu đã đủ bài (chạy ngoài event loop - SQLite là I/O chặn)
+        try:
+            articles = await loop.run_in_executor(self.tier_executor, self.search_local_index, plan)
+        except Exception as e:
+            logger.warning("Lỗi đọc chỉ mục - chuyển sang tìm kiếm trực tuyến: %s", e)
+            articles = []
+
+        if len(articles) >= 3:
+            metrics.inc('chatbot_cache_requests_total', cache='index', result='hit')
+            selected = await loop.run_in_executor(self.executor, self.select_top_articles, articles)
+            metrics.inc('chatbot_candidates_total', len(selected), stage='kept')
+            return selected
+        metrics.inc('chatbot_cache_requests_total', cache='index', result='miss')
+
+        # Token huỷ dùng chung cho các tầng: set xong thì mọi request còn lại bị từ chối ngay
+        cancelled = threading.Event()
+        fetched = set()
+        context = contextvars.copy_context()
+        context.run(cancel_token.set, cancelled)
+        context.run(fetch_log.set, fetched)
+
+        pool = CandidatePool()
+        pending = set()
+        try:
+            for name, search_tier in self.get_search_tiers():
+                # Mỗi tầng cần bản sao ngữ cảnh riêng vì một Context không thể chạy song song ở nhiều luồng
+                pending.add(loop.run_in_executor(
+                    self.tier_executor, context.copy().run, self.run_search_tier, name, search_tier, plan
+                ))
+
+            while len(articles) < 3:
+                # Tải nội dung các ứng viên tốt nhất hiện có, vừa đủ số chỗ còn trống
+                batch = pool.take(3 - len(articles))
+                if batch:
+                    downloads = [
+                        self.executor.submit(context.copy().run, self.get_article_content, candidate.url)
+                        for candidate in batch
+                    ]
+                    contents = await asyncio.gather(*map(asyncio.wrap_future, downloads), return_exceptions=True)
+                    await loop.run_in_executor(
+                        self.executor, lambda: self.merge_articles(articles, self.score_candidates(plan, batch, contents))
+                    )
+                    continue
 
-    def search_via_google_api(self, topic):
-        """Tìm kiếm bằng Google Custom Search API với site: search"""
+                # Pool đã cạn - chờ tầng tiếp theo trả ứng viên
+                if not pending:
+                    break
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for finished in done:
+                    try:
+                        candidates = finished.result()
+                    except Exception as e:
+                        logger.warning("Lỗi trong một tầng tìm kiếm: %s", e)
+                        continue
+                    await loop.run_in_executor(self.executor, self.pool_candidates, pool, candidates or [], plan)
+
+        finally:
+            # Đã đủ bài (hoặc lỗi) - huỷ các tầng còn đang chạy
+            cancelled.set()
+            for future in pending:
+                future.cancel()
+
+        selected = await loop.run_in_executor(self.executor, self.select_top_articles, articles)
+        # Bài đã tải nội dung nhưng không nằm trong kết quả cuối là công sức bỏ phí
+        kept = {article.get('url') for article in selected}
+        metrics.inc('chatbot_candidates_total', len(fetched), stage='fetched')
+        metrics.inc('chatbot_candidates_total', len(selected), stage='kept')
+        metrics.inc('chatbot_candidates_total', len(fetched - kept), stage='discarded')
+        return selected
+
+    def run_search_tier(self, name, search_tier, plan):
+        """Chạy một tầng tìm kiếm, ghi thời gian chạy và lỗi vào metrics"""
+        with metrics.timer('chatbot_search_tier_seconds', tier=name):
+            try:
+                return search_tier(plan)
+            except Exception:
+                metrics.inc('chatbot_search_tier_errors_total', tier=name)
+                raise
+
+    def search_local_index(self, topic):
+        """Tìm trong chỉ mục cục bộ, chấm điểm với cùng ngưỡng như tầng quét trực tiếp"""
+        plan = self.build_query_plan(topic)
+        topic = plan.topic
+        articles = []
+        if self.search_index is None:
+            return articles
+
+        for document in self.search_index.search(topic, limit=settings.SEARCH_INDEX_CANDIDATES):
+            title = document['title']
+            url = document['url']
+            content = document['content']
+
+            # Tính điểm liên quan theo tiêu đề
+            relevance_score = self.calculate_relevance_score(title, url, plan)
+            if not relevance_score:
+                continue
+
+            if not content or len(content) <= 200:
+                continue
+
+            # Tính điểm nội dung để double-check
+            content_score = self.calculate_content_relevance(content, plan)
+            final_score = (relevance_score + content_score) / 2
+
+            if final_score >= 0.5:
+                articles.append({
+                    'title': title,
+                    'url': url,
+                    'content': content,
+                    'relevance_score': final_score,
+                    'source': 'local_index'
+                })
+
+        return sorted(articles, key=lambda x: x.get('relevance_score', 0), reverse=True)
+
+    def build_search_index(self, limit=None, include_sitemap=True):
+        """Xây/cập nhật chỉ mục cục bộ từ các trang chuyên mục và sitemap; trả về số bài đã đưa vào"""
+        if self.search_index is None:
+            return 0
+
+        # Bước 1: Gom URL bài viết từ toàn bộ chuyên mục (quét song song)
+        discovered = {}
+        section_futures = []
+        for section in self.MAIN_SECTIONS:
+            page_url = f'https://1thegioi.vn/{section}' if section else 'https://1thegioi.vn/'
+            section_futures.append((section, self.submit(self.extract_section_links, page_url)))
+
+        for section, future in section_futures:
+            try:
+                links = future.result()
+            except Exception as e:
+                logger.debug("Lỗi quét chuyên mục: %s", e)
+                continue
+            for href, title in links:
+                discovered.setdefault(href, {'title': title, 'section': section, 'lastmod': ''})
+
+        # Bước 2: Bổ sung URL và lastmod từ sitemap/RSS
+        if include_sitemap:
+            for entry in self.collect_sitemap_entries():
+                url = entry['url']
+                if '1thegioi.vn' not in url or not url.endswith('.html'):
+                    continue
+                item = discovered.setdefault(url, {'title': entry['title'], 'section': '', 'lastmod': ''})
+                item['lastmod'] = entry['lastmod']
+                item['title'] = item['title'] or entry['title']
+
+        urls = list(discovered)
+        if limit:
+            urls = urls[:limit]
+
+        # Bước 3: Tải song song nội dung (qua cache bài viết) và đưa vào chỉ mục
+        article_futures = [(url, self.submit(self.fetch_article, url)) for url in urls]
+        indexed = 0
+        for url, future in article_futures:
+            try:
+                article = future.result()
+            except Exception as e:
+                logger.debug("Lỗi tải bài: %s", e)
+                continue
+            if not article or not article['content']:
+                continue
+
+            meta = discovered[url]
+            self.search_index.add(
+                url,
+                meta['title'] or article['title'],
+                article['content'],
+                section=meta['section'],
+                published=article.get('published', ''),
+                lastmod=meta['lastmod']
+            )
+            indexed += 1
+
+        return indexed
+
+    def collect_sitemap_entries(self, max_child_sitemaps=5):
+        """Đọc sitemap/RSS (kể cả sitemap khai báo trong robots.txt), trả về list {'url', 'lastmod', 'title'}"""
+        sitemap_queue = list(self.SITEMAP_URLS)
+        try:
+            response = self.http.get_cached('https://1thegioi.vn/robots.txt', timeout=15)
+            if response.status_code == 200:
+                for url in sitemaps_from_robots(response.text):
+                    if url not in sitemap_queue:
+                        sitemap_queue.append(url)
+        except Exception as e:
+            logger.warning("Không đọc được robots.txt: %s", e)
+
+        entries = {}
+        visited = set()
+        children_followed = 0
+        while sitemap_queue:
+            sitemap_url = sitemap_queue.pop(0)
+            if sitemap_url in visited:
+                continue
+            visited.add(sitemap_url)
+
+            try:
+                response = self.http.get_cached(sitemap_url, timeout=15)
+                if response.status_code != 200:
+                    continue
+                page_entries, child_sitemaps = parse_sitemap(response.content)
+            except Exception as e:
+                logger.debug("Sitemap lỗi hoặc không phải XML: %s", e)
+                continue
+
+            for entry in page_entries:
+                entries.setdefault(entry['url'], entry)
+
+            # Sitemap index: chỉ theo các sitemap con mới nhất
+            child_sitemaps.sort(key=lambda child: child['lastmod'], reverse=True)
+            for child in child_sitemaps:
+                if children_followed >= max_child_sitemaps:
+                    break
+                sitemap_queue.append(child['url'])
+                children_followed += 1
+
+        return list(entries.values())
+
+    def merge_articles(self, articles, new_articles):
+        """Gộp bài viết mới vào danh sách: trùng URL chuẩn hoá hoặc nội dung gần trùng thì giữ bản điểm cao hơn"""
+        merged, duplicates = unique_articles(list(articles) + list(new_articles))
+        if duplicates:
+            metrics.inc('chatbot_candidates_total', duplicates, stage='duplicate')
+        articles[:] = merged
+        return articles
+
+    def select_top_articles(self, articles, limit=3):
+        """Sắp xếp kết quả các tầng theo relevance score, lấy các bài liên quan nhất (mỗi bài một bản)"""
+        articles, _ = unique_articles(articles)
+        articles_with_score = [a for a in articles if 'relevance_score' in a]
+        articles_without_score = [a for a in articles if 'relevance_score' not in a]
+
+        if articles_with_score:
+            articles_with_score.sort(key=lambda x: x['relevance_score'], reverse=True)
+            articles = articles_with_score + articles_without_score
+
+        return articles[:limit]
+
+    def pool_candidates(self, pool, candidates, plan):
+        """Xếp hạng BM25F ứng viên của một tầng rồi đưa vào pool; trả về số ứng viên được nhận"""
+        added = pool.extend(self.rank_candidates(candidates, plan))
+        metrics.inc('chatbot_candidates_total', added, stage='pooled')
+        return added
+
+    def score_candidates(self, plan, candidates, contents):
+        """Kiểm tra nội dung đã tải của từng ứng viên, trả về các bài đạt ngưỡng"""
+        articles = []
+        for candidate, content in zip(candidates, contents):
+            if isinstance(content, BaseException):
+                logger.debug("Lỗi tải nội dung %s: %s", candidate.url, content)
+                continue
+
+            # Nội dung quá ngắn thường là trang lỗi hoặc thông báo "Không thể lấy nội dung..."
+            if not content or len(content) <= 200:
+                continue
+
+            # Tính điểm nội dung để double-check
+            content_score = self.calculate_content_relevance(content, plan)
+            final_score = (candidate.relevance_score + content_score) / 2
+            if final_score < 0.5:
+                continue
+
+            article = {
+                'title': candidate.title,
+                'url': candidate.url,
+                'content': content,
+                'relevance_score': final_score,
+                'source': candidate.source
+            }
+            if candidate.snippet:
+                article['snippet'] = candidate.snippet
+            articles.append(article)
+        return articles
+
+    def fetch_candidates(self, plan, candidates, limit=3):
+        """Tải nội dung ứng viên theo thứ tự điểm, mỗi đợt vừa đủ số bài còn thiếu; dừng khi đủ `limit` bài"""
+        pool = CandidatePool()
+        self.pool_candidates(pool, candidates, plan)
         articles = []
+        while len(articles) < limit:
+            batch = pool.take(limit - len(articles))
+            if not batch:
+                break
+            futures = [self.submit(self.get_article_content, candidate.url) for candidate in batch]
+            contents = []
+            for future in futures:
+                try:
+                    contents.append(future.result())
+                except Exception as e:
+                    contents.append(e)
+            self.merge_articles(articles, self.score_candidates(plan, batch, contents))
+        return self.select_top_articles(articles, limit)
+
+    def build_search_report(self, topic, articles):
+        """Sắp xếp kết quả các tầng, lấy 3 bài liên quan nhất và tạo báo cáo"""
+        if not articles:
+            # Không tìm thấy bài viết - tạo báo cáo tổng quan
+            return self.create_default_report(topic)
+
+        # Lấy đúng 3 bài liên quan nhất và tạo báo cáo tóm tắt
+        return self.create_manual_report(topic, self.select_top_articles(articles))
+
+    def search_via_google_api(self, topic):
+        """Tìm kiếm bằng Google Custom Search API, giới hạn trong 1thegioi.vn"""
+        plan = self.build_query_plan(topic)
+        return self.fetch_candidates(plan, self.google_api_candidates(plan))
+
+    def google_api_candidates(self, plan):
+        """Ứng viên từ Google Custom Search API (tiêu đề, URL, snippet) - chưa tải nội dung"""
+        plan = self.build_query_plan(plan)
+        topic = plan.topic
+        candidates = []
         
         if not self.use_google_api:
             # Google API không khả dụng
             return []
         
         try:
-            # Tìm kiếm Google Custom Search API
-            
-            # Tạo service object
-            service = build("customsearch", "v1", developerKey=self.google_api_key)
-            
-            # Các query tìm kiếm khác nhau
-            search_queries = [
-                f"{topic} site:1thegioi.vn",
-                f'"{topic}" site:1thegioi.vn',
-                f"{topic} tin tức site:1thegioi.vn",
-                f"{topic} mới nhất site:1thegioi.vn"
-            ]
-            
             seen_urls = set()
-            
-            for i, query in enumerate(search_queries, 1):
-                if len(articles) >= 8:  # Giới hạn 8 bài từ API
-                    break
-                
+
+            # Một truy vấn thay cho 4 biến thể cũ ("site:", "cụm từ", "tin tức", "mới nhất"): siteSearch giới hạn
+            # domain, kết quả đã sắp theo ngày. Trang 2 chỉ lấy khi trang 1 đầy mà vẫn chưa đủ 3 ứng viên
+            for i, start in enumerate((1, 11), 1):
                 try:
-                    # API Query
-                    
-                    # Gọi Google Custom Search API
-                    result = service.cse().list(
-                        q=query,
-                        cx=self.google_cx,
+                    items = self.cse.search(
+                        topic,
+                        start=start,
                         num=10,  # Số kết quả mỗi query
                         lr='lang_vi',  # Ưu tiên tiếng Việt
                         safe='off',
-                        sort='date'  # Sắp xếp theo ngày
-                    ).execute()
-                    
-                    items = result.get('items', [])
+                        sort='date',  # Sắp xếp theo ngày
+                        siteSearch='1thegioi.vn',
+                        siteSearchFilter='i'
+                    )
                     # Xử lý kết quả API
                     
                     for item in items:
-                        if len(articles) >= 8:
-                            break
-                            
-                        url = item.get('link', '')
+                        url = canonical_url(item.get('link', ''))
                         title = item.get('title', '')
                         snippet = item.get('snippet', '')
                         
@@ -99,131 +581,86 @@ class Chatbot1thegioiCrew():
                             not any(skip in url.lower() for skip in ['tag', 'author', 'search', 'category'])):
                             
                             # Tính điểm liên quan
-                            keywords = self.extract_keywords(topic)
-                            relevance_score = self.calculate_relevance_score(title, url, topic, keywords)
+                            relevance_score = self.calculate_relevance_score(title, url, plan)
                             
-                            if relevance_score > 2.0:  # Ngưỡng cho API results
-                                # Lấy nội dung đầy đủ
-                                content = self.get_article_content(url)
-                                
-                                # Tính điểm nội dung
-                                content_score = self.calculate_content_relevance(content, topic, keywords)
-                                total_score = relevance_score + content_score * 0.4
-                                
-                                if total_score > 2.5:
-                                    articles.append({
-                                        'title': title.strip(),
-                                        'url': url,
-                                        'content': content,
-                                        'snippet': snippet,
-                                        'relevance_score': total_score,
-                                        'source': f'google_api_query_{i}'
-                                    })
-                                    
-                                    seen_urls.add(url)
-                                    # Thêm bài viết từ API
-                    
-                    # Nghỉ giữa các query để tránh rate limit
-                    time.sleep(0.5)
-                    
+                            if relevance_score:
+                                candidates.append(Candidate(url, title, relevance_score, f'google_api_query_{i}',
+                                                            snippet=snippet))
+                                seen_urls.add(url)
+
+                    if len(candidates) >= 3 or len(items) < 10:
+                        break
+
+                except QuotaExhausted as e:
+                    logger.info("%s - chuyển sang các tầng tìm kiếm khác", e)
+                    break
                 except Exception as e:
-                    # Lỗi API query
-                    continue
-            
-            # Sắp xếp theo điểm liên quan
-            articles = sorted(articles, key=lambda x: x.get('relevance_score', 0), reverse=True)
+                    logger.debug("Lỗi API query: %s", e)
+                    break
             
-            if articles:
-                # Có kết quả từ API
-                pass
-            
-            return articles
+            return candidates
             
         except Exception as e:
-            # Lỗi Google Custom Search API
+            logger.warning("Lỗi Google Custom Search API: %s", e)
             return []
 
     def search_via_google_site(self, topic):
         """Tìm kiếm bài viết chỉ trên 1thegioi.vn và tạo báo cáo tóm tắt"""
+        plan = self.build_query_plan(topic)
+        topic = plan.topic
         
         articles = []
         try:
             # Bước 1: Tìm kiếm trực tiếp trên 1thegioi.vn
-            direct_articles = self.search_direct_1thegioi(topic)
+            direct_articles = self.search_direct_1thegioi(plan)
             if direct_articles:
                 articles.extend(direct_articles)
             
             # Bước 2: Nếu chưa đủ 3 bài, dùng Google Custom Search API (chỉ tìm trên 1thegioi.vn)
             if len(articles) < 3 and self.use_google_api:
-                api_articles = self.search_via_google_api(topic)
+                api_articles = self.search_via_google_api(plan)
                 if api_articles:
-                    # Lọc loại bỏ duplicate
-                    new_articles = []
-                    for article in api_articles:
-                        if not any(existing['url'] == article['url'] for existing in articles):
-                            new_articles.append(article)
-                    articles.extend(new_articles)
+                    # Gộp, loại bài trùng URL hoặc gần trùng nội dung
+                    self.merge_articles(articles, api_articles)
                     # Thêm bài viết từ Google API
                 else:
-                    # Google API không trả về kết quả
-                    pass
+                    logger.debug("Tầng google_api không trả về bài nào cho '%s'", topic)
 
             # Bước 3: Nếu vẫn chưa đủ 3 bài, dùng Google web scraping (chỉ tìm trên 1thegioi.vn)
             if len(articles) < 3:
-                google_articles = self.search_via_google_site_core(topic)
+                google_articles = self.search_via_google_site_core(plan)
                 if google_articles:
-                    new_articles = []
-                    for article in google_articles:
-                        if not any(existing['url'] == article['url'] for existing in articles):
-                            new_articles.append(article)
-                    articles.extend(new_articles)
+                    self.merge_articles(articles, google_articles)
                     # Thêm bài viết từ Google scraping
                 else:
-                    # Google scraping không trả về kết quả
-                    pass
+                    logger.debug("Tầng google_site không trả về bài nào cho '%s'", topic)
 
             # Bước 4: Cuối cùng, thử sitemap search trên 1thegioi.vn
             if len(articles) < 3:
-                sitemap_articles = self.search_via_sitemap(topic)
+                sitemap_articles = self.search_via_sitemap(plan)
                 if sitemap_articles:
-                    new_articles = []
-                    for article in sitemap_articles:
-                        if not any(existing.get('url', '') == article.get('url', '') for existing in articles):
-                            new_articles.append(article)
-                    articles.extend(new_articles)
+                    self.merge_articles(articles, sitemap_articles)
                     # Thêm bài viết từ sitemap
                 else:
-                    # Sitemap không trả về kết quả
-                    pass
+                    logger.debug("Tầng sitemap không trả về bài nào cho '%s'", topic)
 
             # Xử lý kết quả
-            if articles:
-                # Sắp xếp theo relevance score
-                articles_with_score = [a for a in articles if 'relevance_score' in a]
-                articles_without_score = [a for a in articles if 'relevance_score' not in a]
-
-                if articles_with_score:
-                    articles_with_score.sort(key=lambda x: x['relevance_score'], reverse=True)
-                    articles = articles_with_score + articles_without_score
-
-                # Lấy đúng 3 bài liên quan nhất
-                final_articles = articles[:3]
-
-                # Hoàn tất tìm kiếm và tạo báo cáo
-
-                # Tạo báo cáo tóm tắt
-                return self.create_manual_report(topic, final_articles)
-            else:
-                # Không tìm thấy bài viết - tạo báo cáo tổng quan
-                return self.create_default_report(topic)
+            return self.build_search_report(topic, articles)
                 
         except Exception as e:
-            # Lỗi trong quá trình tìm kiếm
+            logger.warning("Lỗi trong quá trình tìm kiếm: %s", e)
             return self.create_default_report(topic)
 
     def search_via_google_site_core(self, topic):
         """Core Google site search functionality - tìm kiếm chính xác theo input người dùng"""
-        articles = []
+        plan = self.build_query_plan(topic)
+        return self.fetch_candidates(plan, self.google_site_candidates(plan))
+
+    def google_site_candidates(self, plan):
+        """Ứng viên từ trang kết quả Google (site:1thegioi.vn) - chưa tải nội dung"""
+        plan = self.build_query_plan(plan)
+        topic = plan.topic
+        candidates = []
         try:
             # Tạo các query tìm kiếm chính xác theo topic
             search_queries = [
@@ -236,7 +673,7 @@ class Chatbot1thegioiCrew():
             seen_urls = set()
             
             for i, query in enumerate(search_queries, 1):
-                if len(articles) >= 5:  # Giới hạn 5 bài
+                if len(candidates) >= 5:  # Giới hạn 5 ứng viên
                     break
                     
                 # Tìm kiếm với query
@@ -244,23 +681,12 @@ class Chatbot1thegioiCrew():
                 encoded_query = urllib.parse.quote_plus(query)
                 google_url = f"https://www.google.com/search?q={encoded_query}&num=10"
                 
-                headers = {
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                    'Accept-Language': 'vi-VN,vi;q=0.8,en-US;q=0.5,en;q=0.3',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'DNT': '1',
-                    'Connection': 'keep-alive',
-                    'Upgrade-Insecure-Requests': '1',
-                    'Cache-Control': 'max-age=0'
-                }
-                
                 try:
                     # Truy cập Google search
-                    response = requests.get(google_url, headers=headers, timeout=20)
+                    response = self.http.get(google_url, headers=settings.SEARCH_ENGINE_HEADERS, timeout=20)
                     
                     if response.status_code == 200:
-                        soup = BeautifulSoup(response.content, 'html.parser')
+                        soup = parse_html(response.content)
                         
                         # Kiểm tra xem có bị chặn không
                         if "Our systems have detected unusual traffic" in response.text:
@@ -310,7 +736,7 @@ class Chatbot1thegioiCrew():
                         
                         results_found = 0
                         for result in search_results[:20]:  # Tăng lên 20 kết quả
-                            if len(articles) >= 5:
+                            if len(candidates) >= 5:
                                 break
 
                             try:
@@ -349,6 +775,7 @@ class Chatbot1thegioiCrew():
                                     url = urllib.parse.unquote(url.split('/url?q=')[1].split('&')[0])
                                 elif url.startswith('http://www.google.com/url?q='):
                                     url = urllib.parse.unquote(url.split('http://www.google.com/url?q=')[1].split('&')[0])
+                                url = canonical_url(url)
 
                                 # Kiểm tra URL hợp lệ
                                 if not url or not url.startswith('http') or '1thegioi.vn' not in url:
@@ -366,244 +793,186 @@ class Chatbot1thegioiCrew():
                                     continue
 
                                 # Tính điểm liên quan
-                                keywords = self.extract_keywords(topic)
-                                relevance_score = self.calculate_relevance_score(title, url, topic, keywords)
-
-                                if relevance_score > 1.0:  # Ngưỡng cho Google results
-                                    # Lấy nội dung bài viết
-                                    content = self.get_article_content(url)
-
-                                    if content and len(content) > 100:  # Đảm bảo có nội dung
-                                        articles.append({
-                                            'title': title.strip(),
-                                            'url': url,
-                                            'content': content,
-                                            'relevance_score': relevance_score,
-                                            'source': f'google_query_{i}'
-                                        })
-
-                                        seen_urls.add(url)
-                                        results_found += 1
-                                        # Thêm bài viết từ Google
+                                relevance_score = self.calculate_relevance_score(title, url, plan)
+
+                                if relevance_score:
+                                    candidates.append(Candidate(url, title, relevance_score, f'google_query_{i}'))
+                                    seen_urls.add(url)
+                                    results_found += 1
 
                             except Exception as e:
-                                # Lỗi xử lý kết quả Google
+                                logger.debug("Lỗi xử lý kết quả Google: %s", e)
                                 continue
 
                         # Hoàn thành query
-                                
-                    else:
-                        # HTTP Error
-                        if response.status_code == 429:
-                            # Rate limited by Google
-                            time.sleep(2)
+                    # HTTP 429 đã được rate limiter ghi nhận - các request sau tới Google tự chờ
                         
                 except Exception as e:
-                    # Lỗi query
+                    logger.debug("Lỗi query: %s", e)
                     continue
                     
-            return articles
+            return candidates
             
         except Exception as e:
-            # Lỗi Google search
+            logger.warning("Lỗi Google search: %s", e)
             return []
 
     def search_direct_1thegioi(self, topic):
         """Tìm kiếm trực tiếp trên 1thegioi.vn - phương pháp chính để tìm bài viết liên quan"""
-        articles = []
+        plan = self.build_query_plan(topic)
+        return self.fetch_candidates(plan, self.direct_candidates(plan))
+
+    def direct_candidates(self, plan):
+        """Quét các chuyên mục của 1thegioi.vn, trả về ứng viên (chưa tải nội dung) đứng đầu theo BM25F"""
+        plan = self.build_query_plan(plan)
         try:
-            # Tìm kiếm trên 1thegioi.vn
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'vi-VN,vi;q=0.8,en-US;q=0.5,en;q=0.3',
-                'Accept-Encoding': '',  # Không yêu cầu compression để tránh lỗi parsing
-                'Connection': 'keep-alive'
-            }
-            
             # Lấy các trang có thể chứa bài viết liên quan
-            search_pages = self.get_relevant_pages(topic)
-            topic_keywords = self.extract_keywords(topic)
-            seen_urls = set()
+            search_pages = plan.section_pages
             
-            # Trích xuất từ khóa tìm kiếm
-            
-            for page_url in search_pages:
-                if len(articles) >= 8:  # Tăng lên 8 bài để có nhiều lựa chọn hơn
-                    break
-                    
+            # Bước 1: Quét song song các chuyên mục, gộp ứng viên theo đúng thứ tự trang
+            page_futures = [
+                self.submit(self.scan_section_page, page_url, plan)
+                for page_url in search_pages
+            ]
+            candidates = []
+            for future in page_futures:
                 try:
-                    # Quét trang web
-                    response = requests.get(page_url, headers=headers, timeout=15)
+                    candidates.extend(future.result())
+                except Exception as e:
+                    logger.debug("Lỗi xử lý trang: %s", e)
+                    continue
+            
+            # Bước 2: Xếp hạng BM25F theo tiêu đề/slug - nội dung chỉ được tải khi ứng viên lên đầu pool
+            return self.rank_candidates(candidates, plan)[:settings.RANK_FETCH_LIMIT]
+            
+        except Exception as e:
+            logger.warning("Lỗi tìm kiếm trực tiếp: %s", e)
+            return []
+
+    def rank_candidates(self, candidates, plan):
+        """Gắn điểm BM25F (tiêu đề/slug) cho từng Candidate, sắp xếp giảm dần, bỏ URL trùng và bài cùng tiêu đề"""
+        query_weights = plan.query_weights
+        ranked = {}
+        for candidate in candidates:
+            if candidate.url not in ranked:
+                candidate.rank = self.ranker.score(query_weights, candidate.title, candidate.url)
+                ranked[candidate.url] = candidate
+
+        # Cùng một bài đăng ở nhiều URL (chuyên mục khác nhau, bản đăng lại) - chỉ giữ bản xếp hạng cao nhất
+        result = []
+        seen_titles = set()
+        for candidate in sorted(ranked.values(), key=lambda item: item.rank, reverse=True):
+            if candidate.title_key not in seen_titles:
+                seen_titles.add(candidate.title_key)
+                result.append(candidate)
+        return result
+
+    def scan_section_page(self, page_url, plan):
+        """Quét một trang chuyên mục, trả về các Candidate vượt ngưỡng tiêu đề"""
+        candidates = []
+        
+        for href, title in self.extract_section_links(page_url):
+            # Mọi tiêu đề trên trang đều góp vào thống kê corpus của bộ xếp hạng
+            self.ranker.observe(href, title)
+            try:
+                # Tính điểm liên quan
+                relevance_score = self.calculate_relevance_score(title, href, plan)
+                
+                # Chỉ giữ bài vượt ngưỡng tiêu đề
+                if relevance_score:
+                    candidates.append(Candidate(href, title, relevance_score, 'direct_1thegioi'))
                     
-                    if response.status_code == 200:
-                        # Xử lý encoding tốt hơn
-                        response.encoding = response.apparent_encoding or 'utf-8'
-                        
-                        # Sử dụng text thay vì content để tránh lỗi encoding
-                        soup = BeautifulSoup(response.text, 'html.parser')
-                        
-                        # Tìm các bài viết trên trang với selectors được cập nhật và tối ưu
-                        article_links = []
+            except Exception as e:
+                logger.debug("Lỗi xử lý link: %s", e)
+                continue
+        
+        return candidates
 
-                        # Các selectors ưu tiên cho 1thegioi.vn (dựa trên cấu trúc thực tế)
-                        article_selectors = [
-                            # 1thegioi.vn specific selectors
-                            'a[href*=".html"]',  # Lấy tất cả links có .html
-                        ]
+    def extract_section_links(self, page_url):
+        """Lấy danh sách (url, title) các bài viết được liệt kê trên một trang chuyên mục"""
+        section_links = []
+        
+        # Quét trang web
+        response = self.http.get_cached(page_url, timeout=15)
+        
+        if response.status_code != 200:
+            # Lỗi HTTP
+            return section_links
+        
+        # Xử lý encoding tốt hơn
+        response.encoding = response.apparent_encoding or 'utf-8'
+        
+        # Sử dụng text thay vì content để tránh lỗi encoding
+        soup = parse_html(response.text)
+        
+        # Tìm các bài viết trên trang với selectors được cập nhật và tối ưu
+        article_links = []
 
-                        # Tìm articles theo từng selector
-                        found_urls = set()
-                        for selector in article_selectors:
-                            if len(article_links) >= 50:  # Tăng giới hạn
-                                break
+        # Các selectors ưu tiên cho 1thegioi.vn (dựa trên cấu trúc thực tế)
+        article_selectors = [
+            # 1thegioi.vn specific selectors
+            'a[href*=".html"]',  # Lấy tất cả links có .html
+        ]
 
-                            links = soup.select(selector)
-                            # Tìm articles theo selector
-                            
-                            for link in links:
-                                if len(article_links) >= 50:
-                                    break
+        # Tìm articles theo từng selector
+        found_urls = set()
+        for selector in article_selectors:
+            if len(article_links) >= 50:  # Tăng giới hạn
+                break
 
-                                href = link.get('href', '')
-                                if href and href not in found_urls:
-                                    # Đảm bảo URL đầy đủ
-                                    if href.startswith('/'):
-                                        href = f'https://1thegioi.vn{href}'
-                                    elif not href.startswith('http'):
-                                        href = f'https://1thegioi.vn/{href}'
-                                    
-                                    if '1thegioi.vn' in href and href.endswith('.html'):
-                                        article_links.append(link)
-                                        found_urls.add(href)
-                        
-                        # Thu thập bài viết từ trang
-                        
-                        # Xử lý từng bài viết
-                        page_articles_found = 0
-                        for link in article_links:
-                            if len(articles) >= 8:
-                                break
-                                
-                            try:
-                                href = link.get('href', '')
-                                if href.startswith('/'):
-                                    href = f'https://1thegioi.vn{href}'
-                                elif not href.startswith('http'):
-                                    href = f'https://1thegioi.vn/{href}'
-                                    
-                                if href in seen_urls or not href.endswith('.html'):
-                                    continue
-                                
-                                # Lấy title từ link
-                                title = link.get('title', '') or link.get_text().strip()
-                                
-                                # Làm sạch title
-                                if not title or len(title) < 10:
-                                    continue
-                                    
-                                title = title.replace('\n', ' ').replace('\t', ' ')
-                                title = ' '.join(title.split())  # Loại bỏ space thừa
-                                
-                                if len(title) > 200:  # Cắt title quá dài
-                                    title = title[:200] + '...'
-                                
-                                # Tính điểm liên quan
-                                relevance_score = self.calculate_relevance_score(title, href, topic, topic_keywords)
-                                
-                                # Kiểm tra và lọc bài viết chất lượng
-                                min_score = 0.8 if len(title) > 30 else 1.0
-                                
-                                if relevance_score >= min_score:
-                                    # Lấy nội dung bài viết
-                                    content = self.get_article_content(href)
-                                    
-                                    if content and len(content) > 200:  # Đảm bảo có nội dung đủ
-                                        # Tính điểm nội dung để double-check
-                                        content_score = self.calculate_content_relevance(content, topic, topic_keywords)
-                                        final_score = (relevance_score + content_score) / 2
-                                        
-                                        if final_score >= 0.5:  # Ngưỡng cuối cùng thấp hơn để không bỏ lỡ bài viết liên quan
-                                            articles.append({
-                                                'title': title,
-                                                'url': href,
-                                                'content': content,
-                                                'relevance_score': final_score,
-                                                'source': 'direct_1thegioi'
-                                            })
-                                            
-                                            seen_urls.add(href)
-                                            page_articles_found += 1
-                                            # Bài viết chất lượng được chọn
-                                        else:
-                                            # Điểm nội dung không đủ cao
-                                            pass
-                                    else:
-                                        # Không thể lấy nội dung
-                                        pass
-                                else:
-                                    # Điểm liên quan không đủ cao
-                                    pass
-                                    
-                            except Exception as e:
-                                # Lỗi xử lý link
-                                continue
-                        
-                        # Hoàn thành quét trang
-                        
-                    else:
-                        # Lỗi HTTP
-                        pass
-                        
-                    # Nghỉ giữa các trang để tránh overload
-                    time.sleep(1)
-                        
-                except Exception as e:
-                    # Lỗi xử lý trang
-                    continue
+            links = soup.select(selector)
+            # Tìm articles theo selector
             
-            if articles:
-                # Sắp xếp theo điểm liên quan
-                articles = sorted(articles, key=lambda x: x.get('relevance_score', 0), reverse=True)
-                # Tìm kiếm hoàn thành
-            else:
-                # Không tìm thấy bài viết phù hợp
-                pass
+            for link in links:
+                if len(article_links) >= 50:
+                    break
+
+                href = link.get('href', '')
+                if href and href not in found_urls:
+                    # Đảm bảo URL đầy đủ
+                    if href.startswith('/'):
+                        href = f'https://1thegioi.vn{href}'
+                    elif not href.startswith('http'):
+                        href = f'https://1thegioi.vn/{href}'
+                    
+                    if '1thegioi.vn' in href and href.endswith('.html'):
+                        article_links.append(link)
+                        found_urls.add(href)
+        
+        # Xử lý từng bài viết
+        for link in article_links:
+            href = link.get('href', '')
+            if href.startswith('/'):
+                href = f'https://1thegioi.vn{href}'
+            elif not href.startswith('http'):
+                href = f'https://1thegioi.vn/{href}'
+            href = canonical_url(href)
+                
+            if not href.endswith('.html'):
+                continue
             
-            return articles[:3]  # Chỉ trả về 3 bài chất lượng cao nhất
+            # Lấy title từ link
+            title = link.get('title', '') or link.get_text().strip()
             
-        except Exception as e:
-            # Lỗi tìm kiếm trực tiếp
-            return []
+            # Làm sạch title
+            if not title or len(title) < 10:
+                continue
+                
+            title = title.replace('\n', ' ').replace('\t', ' ')
+            title = ' '.join(title.split())  # Loại bỏ space thừa
+            
+            if len(title) > 200:  # Cắt title quá dài
+                title = title[:200] + '...'
+            
+            section_links.append((href, title))
+        
+        return section_links
 
     def get_relevant_pages(self, topic):
         """Lấy danh sách các chuyên mục chính và trang chủ để tìm kiếm trên toàn bộ 1thegioi.vn cho mọi chủ đề"""
         topic_lower = topic.lower()
         
-        # Danh sách chuyên mục chính (có thể mở rộng nếu cần)
-        main_sections = [
-            '',  # Trang chủ
-            'thoi-su',
-            'kinh-te-40',
-            'ai-blockchain',
-            'nhip-dap-cong-nghe',
-            'dot-pha',
-            'ca-phe-mot-the-gioi',
-            'cong-nghe-quan-su',  # Military technology section
-            'the-thao',
-            'giai-tri',
-            'suc-khoe',
-            'doi-song',
-            'quoc-te',
-            'giao-duc',
-            'moi-truong',
-            'phap-luat',
-            'van-hoa',
-            'du-lich',
-            'ban-doc',
-            'video',
-        ]
+        main_sections = list(self.MAIN_SECTIONS)
         
         # Ưu tiên các trang liên quan đến chủ đề
         if any(term in topic_lower for term in ['quân sự', 'military', 'quân đội', 'vũ khí', 'chiến tranh', 'quốc phòng']):
@@ -624,321 +993,80 @@ class Chatbot1thegioiCrew():
         limit = 12 if any(term in topic_lower for term in ['quân sự', 'military']) else 10
         return unique_urls[:limit]
 
+    def build_query_plan(self, topic):
+        """Dựng QueryPlan cho câu hỏi (trả lại nguyên plan nếu đã là QueryPlan)"""
+        if isinstance(topic, QueryPlan):
+            return topic
+        return QueryPlan(topic, self.get_related_keywords(topic), self.get_relevant_pages(topic))
+
     def extract_keywords(self, topic):
         """Trích xuất từ khóa chính từ topic"""
-        import re
-        
-        # Làm sạch và tách từ
-        clean_topic = re.sub(r'[^\w\s]', ' ', topic.lower())
-        words = [word.strip() for word in clean_topic.split() if len(word) > 2]
-        
-        # Thêm từ khóa liên quan
-        related = self.get_related_keywords(topic)
-        
-        return words + related
+        return self.build_query_plan(topic).keywords
 
-    def calculate_relevance_score(self, title, url, topic, keywords):
-        """Tính điểm liên quan CHÍNH XÁC - Tập trung vào liên quan trực tiếp"""
-        score = 0.0
-        
-        title_lower = title.lower().strip()
-        topic_lower = topic.lower().strip()
-        url_lower = url.lower()
-        
-        # 1. EXACT TOPIC MATCH - Điểm rất cao cho khớp chính xác
-        if topic_lower in title_lower:
-            score += 25.0  # Tăng điểm cao cho exact match
-        
-        # 2. Kiểm tra từng từ quan trọng của topic - Tăng điểm
-        topic_words = [word for word in topic_lower.split() if len(word) > 2]
-        critical_matches = 0
-        
-        for word in topic_words:
-            if word in title_lower:
-                score += 8.0  # Tăng điểm từ 4.0 lên 8.0
-                critical_matches += 1
-        
-        # 3. STRICT FILTERING - Loại bỏ bài không liên quan trực tiếp
-        forbidden_terms = []
-        required_terms = []
-        
-        # Định nghĩa CHẶT CHẼ hơn cho từng topic
-        if any(term in topic_lower for term in ['y tế', 'sức khỏe', 'health', 'medical', 'bệnh viện', 'bác sĩ']):
-            required_terms = ['y tế', 'sức khỏe', 'health', 'medical', 'bệnh viện', 'bác sĩ', 'doctor', 'điều trị', 'bệnh nhân', 'phòng khám', 'thuốc', 'vaccine', 'cấp cứu', 'phẫu thuật', 'sinh', 'thai', 'nhi', 'khoa', 'viện', 'cdc', 'y khoa', 'nhập viện', 'hồi sức', 'icu']
-            forbidden_terms = ['công nghệ', 'ai', 'blockchain', 'thể thao', 'giải trí', 'chính trị', 'kinh tế']
-            
-        elif any(term in topic_lower for term in ['công nghệ', 'technology', 'ai', 'tech', 'blockchain']):
-            required_terms = ['công nghệ', 'technology', 'tech', 'ai', 'artificial intelligence', 'blockchain', 'crypto', 'digital', 'innovation', 'internet', 'software', 'app', 'smartphone']
-            forbidden_terms = ['y tế', 'bệnh viện', 'thể thao', 'giải trí', 'chiến tranh', 'quân sự']
-            
-        elif any(term in topic_lower for term in ['chiến tranh', 'quân sự', 'war', 'military', 'vũ khí']):
-            required_terms = ['chiến tranh', 'war', 'ukraine', 'russia', 'quân sự', 'military', 'vũ khí', 'weapon', 'nato', 'army', 'quân đội', 'quốc phòng', 'patriot', 'tên lửa', 'missile', 'tank', 'fighter', 'aircraft', 'navy', 'airforce', 'drone', 'radar', 'defense', 'tàu chiến', 'máy bay', 'hạm đội', 'binh sĩ', 'tác chiến', 'chiến đấu', 'phòng không', 'tấn công', 'pháo', 'súng', 'b-52', 'f-16', 'himars', 'triều tiên', 'hàn quốc', 'israel', 'palestine', 'gaza']
-            forbidden_terms = ['y tế', 'công nghệ', 'ai', 'thể thao', 'giải trí', 'kinh tế']
-            
-        elif any(term in topic_lower for term in ['kinh tế', 'economy', 'tài chính', 'finance']):
-            required_terms = ['kinh tế', 'economy', 'tài chính', 'finance', 'chứng khoán', 'stock', 'market', 'investment', 'banking', 'trade', 'doanh nghiệp', 'company']
-            forbidden_terms = ['y tế', 'thể thao', 'giải trí', 'thiên tai', 'chiến tranh']
-            
-        elif any(term in topic_lower for term in ['thể thao', 'sports', 'bóng đá', 'football']):
-            required_terms = ['thể thao', 'sports', 'bóng đá', 'football', 'soccer', 'world cup', 'olympic', 'vô địch', 'champion', 'thi đấu', 'giải đấu']
-            forbidden_terms = ['y tế', 'công nghệ', 'ai', 'chính trị', 'kinh tế']
-            
-        elif any(term in topic_lower for term in ['môi trường', 'environment', 'sinh thái', 'khí hậu', 'climate']):
-            required_terms = ['môi trường', 'environment', 'sinh thái', 'ecology', 'bảo tồn', 'conservation', 'ô nhiễm', 'pollution', 'khí hậu', 'climate', 'carbon', 'xanh', 'green', 'bền vững', 'sustainable', 'rác thải', 'waste', 'tái chế', 'recycle', 'năng lượng tái tạo', 'renewable', 'biodiversity', 'đa dạng sinh học']
-            forbidden_terms = ['quân sự', 'chiến tranh', 'thể thao', 'giải trí', 'chính trị']
-            
-        elif any(term in topic_lower for term in ['giáo dục', 'education', 'trường học', 'school', 'đại học']):
-            required_terms = ['giáo dục', 'education', 'trường học', 'school', 'đại học', 'university', 'học sinh', 'student', 'giáo viên', 'teacher', 'học tập', 'learning', 'đào tạo', 'training', 'khóa học', 'course']
-            forbidden_terms = ['quân sự', 'chiến tranh', 'thể thao', 'giải trí']
-            
-        else:
-            # Topic tổng quát - Áp dụng từ khóa chính của topic
-            required_terms = topic_words + self.get_related_keywords(topic)[:5]  # Giảm từ 10 xuống 5
-            forbidden_terms = []
-        
-        # Kiểm tra từ cấm - LOẠI BỎ NGHIÊM NGẶT
-        if forbidden_terms:
-            for term in forbidden_terms:
-                if term in title_lower:
-                    return 0.0  # Loại bỏ hoàn toàn bài viết không liên quan
-        
-        # Kiểm tra có từ liên quan không - CHẶT CHẼ HỚN
-        has_required = False
-        exact_required_matches = 0
-        
-        for term in required_terms:
-            if term in title_lower:
-                has_required = True
-                score += 5.0  # Tăng bonus từ 2.0 lên 5.0
-                exact_required_matches += 1
+    def calculate_relevance_score(self, title, url, plan):
+        """Điểm liên quan theo tiêu đề/slug: BM25F chuẩn hoá về thang 0-10 (xem BM25FRanker.relevance).
+
+        Từ cấm và từ bắt buộc của nhóm chủ đề chỉ dùng để lọc, không cộng điểm; trả về 0 nếu bài
+        bị lọc hoặc dưới ngưỡng plan.threshold.
+        """
+        plan = self.build_query_plan(plan)
+        metrics.inc('chatbot_candidates_total', stage='scored')
         
-        # NGƯỠNG CÂN BẰNG - Chặt chẽ nhưng hợp lý cho từng chủ đề
-        topic_lower = str(topic).lower()
-        if any(word in topic_lower for word in ['chiến tranh', 'quân sự', 'war', 'military', 'ukraine', 'russia']):
-            min_threshold = 6.0  # Giảm từ 8.0 xuống 6.0 cho quân sự vì ít bài hơn
-        elif any(word in topic_lower for word in ['y tế', 'health', 'medical', 'bệnh viện']):
-            min_threshold = 12.0  # Y tế có nhiều bài, ngưỡng cao hơn
-        elif any(word in topic_lower for word in ['công nghệ', 'technology', 'ai', 'tech']):
-            min_threshold = 12.0  # Công nghệ có nhiều bài, ngưỡng cao hơn
-        elif any(word in topic_lower for word in ['kinh tế', 'economy', 'economic']):
-            min_threshold = 12.0  # Kinh tế có nhiều bài, ngưỡng cao hơn
-        else:
-            min_threshold = 10.0  # Ngưỡng mặc định
+        # Một lượt duyệt tiêu đề tìm mọi từ topic / từ bắt buộc / từ cấm (khớp trọn âm tiết)
+        hits = plan.title_matcher.matches(title)
         
-        # Nếu không có từ bắt buộc -> loại bỏ
-        if not has_required:
+        # Từ cấm - loại bỏ bài viết khác chủ đề
+        if any(term in hits for term in plan.forbidden_terms):
             return 0.0
         
-        # Nếu điểm thấp hơn ngưỡng -> loại bỏ
-        if score < min_threshold:
+        # Phải có từ bắt buộc của nhóm chủ đề hoặc chính một từ của câu hỏi
+        if not any(term in hits for term in plan.required_terms) and not any(word in hits for word in plan.words):
             return 0.0
         
-        # 4. URL bonus cho các từ khóa chính
-        for word in topic_words:
-            if word in url_lower:
-                score += 3.0  # Tăng từ 1.0 lên 3.0
-        
-        # 5. Bonus cho số lượng từ khóa match nhiều
-        if critical_matches >= len(topic_words):  # Tất cả từ khóa phải match
-            score += 10.0  # Tăng từ 3.0 lên 10.0
-        elif critical_matches >= len(topic_words) * 0.8:  # 80% từ khóa match
-            score += 5.0
-        
-        return max(0, score)
+        score = self.ranker.relevance(plan.query_weights, title, url, plan.topic)
+        return score if score >= plan.threshold else 0.0
 
     def get_irrelevant_terms(self, topic):
         """Lấy danh sách từ khóa không liên quan đến topic cụ thể"""
-        irrelevant_terms = []
-        
-        # Nếu tìm về thiên tai -> loại bỏ tech terms
-        if any(word in topic for word in ['thiên tai', 'động đất', 'lũ lụt', 'bão', 'tsunami']):
-            irrelevant_terms.extend(['ai', 'chatgpt', 'technology', 'tech', 'blockchain', 'crypto', 'robot'])
-        
-        # Nếu tìm về công nghệ -> loại bỏ disaster terms  
-        elif any(word in topic for word in ['công nghệ', 'ai', 'tech', 'blockchain']):
-            irrelevant_terms.extend(['thiên tai', 'động đất', 'lũ lụt', 'bão', 'thể thao', 'giải trí'])
-        
-        # Nếu tìm về chính trị -> loại bỏ tech/disaster terms
-        elif any(word in topic for word in ['chính trị', 'bầu cử', 'tổng thống', 'ngoại giao']):
-            irrelevant_terms.extend(['ai', 'chatgpt', 'technology', 'thiên tai', 'thể thao'])
-        
-        # Nếu tìm về thể thao -> loại bỏ politics/tech terms
-        elif any(word in topic for word in ['thể thao', 'bóng đá', 'world cup', 'olympic']):
-            irrelevant_terms.extend(['chính trị', 'ai', 'technology', 'thiên tai', 'kinh tế'])
-        
-        # Nếu tìm về kinh tế -> loại bỏ sports/disaster terms
-        elif any(word in topic for word in ['kinh tế', 'tài chính', 'chứng khoán', 'ngân hàng']):
-            irrelevant_terms.extend(['thể thao', 'bóng đá', 'thiên tai', 'giải trí'])
-        
-        # Các từ thường không liên quan chung
-        general_irrelevant = ['quảng cáo', 'ads', 'advertisement', 'sponsored', 'promotion']
-        irrelevant_terms.extend(general_irrelevant)
-        
-        return irrelevant_terms
+        return irrelevant_terms(topic)
 
-    def calculate_content_relevance(self, content, topic, keywords):
-        """Tính điểm liên quan dựa trên nội dung"""
+    def calculate_content_relevance(self, content, plan):
+        """Điểm liên quan theo nội dung: BM25F của trường nội dung, thang 0-10 (xem BM25FRanker.content_relevance)"""
         if not content or len(content) < 50:
             return 0
         
-        score = 0
-        content_lower = content.lower()
-        topic_lower = topic.lower()
-        
-        # Topic chính xác trong content
-        if topic_lower in content_lower:
-            score += 2.0
-        
-        # Keywords trong content
-        for keyword in keywords:
-            if len(keyword) > 2 and keyword in content_lower:
-                score += 0.3
-        
-        return min(score, 3.0)  # Giới hạn tối đa 3 điểm
-
-    def xml_to_dict(self, element):
-        """Convert XML element to dictionary for easier processing"""
-        result = {}
-        if hasattr(element, 'tag'):
-            result[element.tag] = {}
-
-            # Add attributes
-            if hasattr(element, 'attrib'):
-                for key, value in element.attrib.items():
-                    result[element.tag][f"@{key}"] = value
-
-            # Add text content
-            if hasattr(element, 'text') and element.text and element.text.strip():
-                result[element.tag]["#text"] = element.text.strip()
-
-            # Process children
-            for child in element:
-                child_dict = self.xml_to_dict(child)
-                for key, value in child_dict.items():
-                    if key in result[element.tag]:
-                        if not isinstance(result[element.tag][key], list):
-                            result[element.tag][key] = [result[element.tag][key]]
-                        result[element.tag][key].append(value)
-                    else:
-                        result[element.tag][key] = value
-
-        return result
-
-    def extract_urls_from_dict(self, data):
-        """Extract URLs from dictionary format XML"""
-        urls = []
-
-        def traverse_dict(d, path=""):
-            if isinstance(d, dict):
-                for key, value in d.items():
-                    if key in ['url', 'item', 'entry']:
-                        if isinstance(value, dict):
-                            # Try to find loc or link
-                            loc = value.get('loc', {}).get('#text') or value.get('link', {}).get('#text')
-                            if loc:
-                                urls.append((loc, value))
-                    elif isinstance(value, (dict, list)):
-                        traverse_dict(value, f"{path}.{key}")
-            elif isinstance(d, list):
-                for item in d:
-                    traverse_dict(item, path)
-
-        traverse_dict(data)
-        return urls
+        plan = self.build_query_plan(plan)
+        return self.ranker.content_relevance(plan.query_weights, content, plan.topic)
 
     def get_related_keywords(self, topic):
         """Tạo từ khóa liên quan chính xác cho topic cụ thể - Ưu tiên tiếng Việt"""
         topic_lower = topic.lower().strip()
         related = []
         
-        # Từ điển từ khóa liên quan CHÍNH XÁC - mỗi chủ đề chỉ có từ khóa liên quan trực tiếp
-        keyword_relations = {
-            # Y TẾ - Mở rộng từ khóa
-            'y tế': ['y tế', 'sức khỏe', 'y học', 'điều trị', 'bệnh viện', 'bác sĩ', 'y khoa', 'chăm sóc sức khỏe', 'phòng khám', 'bệnh nhân', 'thuốc', 'y tế công cộng', 'bảo hiểm y tế', 'hệ thống y tế', 'khám bệnh', 'chữa bệnh', 'cấp cứu', 'phẫu thuật', 'sinh', 'đẻ', 'thai sản', 'nhi khoa', 'tim mạch', 'ung thư', 'cancer', 'vaccine', 'tiêm chủng', 'hồi sức', 'icu', 'bệnh', 'tử vong', 'ca bệnh', 'nhiễm trùng', 'vi khuẩn', 'virus', 'dịch bệnh', 'kháng sinh', 'antibiotic', 'tế bào', 'gene', 'dna', 'xét nghiệm', 'chẩn đoán', 'triệu chứng', 'hội chứng', 'syndrome'],
-            'sức khỏe': ['sức khỏe', 'y tế', 'khỏe mạnh', 'chăm sóc sức khỏe', 'tập luyện', 'dinh dưỡng', 'bệnh', 'điều trị', 'phòng bệnh'],
-            'bệnh viện': ['bệnh viện', 'y tế', 'bác sĩ', 'điều trị', 'phòng khám', 'khoa', 'viện', 'trung tâm y tế', 'phẫu thuật', 'cấp cứu', 'nhập viện', 'xuất viện'],
-            'bác sĩ': ['bác sĩ', 'doctor', 'y tế', 'điều trị', 'khám bệnh', 'chữa bệnh', 'bệnh viện', 'phòng khám', 'y khoa', 'chuyên khoa'],
-            'covid': ['covid', 'coronavirus', 'đại dịch', 'sars-cov-2', 'y tế', 'vaccine', 'f0', 'f1', 'cách ly', 'phong tỏa'],
-            'vaccine': ['vaccine', 'tiêm chủng', 'miễn dịch', 'y tế', 'phòng bệnh', 'vắc xin'],
-            
-            # CÔNG NGHỆ - Mở rộng
-            'công nghệ': ['công nghệ', 'technology', 'tech', 'kỹ thuật', 'số hóa', 'đổi mới', 'innovation', 'digital', 'IT', 'phần mềm', 'ứng dụng', 'internet'],
-            'ai': ['AI', 'artificial intelligence', 'trí tuệ nhân tạo', 'học máy', 'machine learning', 'deep learning', 'neural network', 'chatgpt', 'công nghệ'],
-            'blockchain': ['blockchain', 'tiền mã hóa', 'cryptocurrency', 'bitcoin', 'crypto', 'công nghệ'],
-            'technology': ['technology', 'công nghệ', 'tech', 'innovation', 'digital'],
-            
-            # KINH TẾ - Mở rộng
-            'kinh tế': ['kinh tế', 'economy', 'tăng trưởng', 'suy thoái', 'lạm phát', 'GDP', 'thị trường', 'tài chính', 'doanh nghiệp', 'đầu tư'],
-            'tài chính': ['tài chính', 'finance', 'ngân hàng', 'đầu tư', 'investment', 'tiền tệ', 'kinh tế'],
-            'chứng khoán': ['chứng khoán', 'stock market', 'thị trường', 'cổ phiếu', 'giao dịch', 'tài chính'],
-            
-            # QUÂN SỰ - Mở rộng
-            'quân sự': ['quân sự', 'military', 'quân đội', 'quốc phòng', 'defense', 'vũ khí', 'weapon', 'chiến tranh', 'war', 'an ninh', 'security', 'bộ quốc phòng', 'army', 'navy', 'air force'],
-            'chiến tranh': ['chiến tranh', 'war', 'conflict', 'xung đột', 'quân sự', 'military', 'ukraine', 'russia', 'nato', 'quân đội', 'weapon', 'vũ khí'],
-            'quân đội': ['quân đội', 'army', 'military', 'quân sự', 'lính', 'soldier', 'chiến sĩ', 'defense'],
-            'vũ khí': ['vũ khí', 'weapon', 'quân sự', 'military', 'tên lửa', 'missile', 'máy bay chiến đấu'],
-            
-            # THIÊN TAI - Mở rộng
-            'thiên tai': ['thiên tai', 'natural disaster', 'thảm họa', 'disaster', 'khẩn cấp', 'emergency', 'cứu hộ', 'rescue', 'bão', 'storm', 'lũ lụt', 'flood', 'động đất', 'earthquake'],
-            'động đất': ['động đất', 'earthquake', 'dư chấn', 'tâm chấn', 'địa chấn', 'richter', 'thiên tai'],
-            'lũ lụt': ['lũ lụt', 'flood', 'ngập lụt', 'nước lũ', 'mưa lớn', 'thiên tai'],
-            'bão': ['bão', 'storm', 'typhoon', 'siêu bão', 'gió mạnh', 'thiên tai'],
-            
-            # CHÍNH TRỊ - Mở rộng  
-            'chính trị': ['chính trị', 'politics', 'government', 'nhà nước', 'quốc hội', 'parliament', 'chính sách', 'policy', 'bộ trưởng', 'minister'],
-            'bầu cử': ['bầu cử', 'election', 'vote', 'ứng cử viên', 'candidate', 'phiếu bầu', 'campaign'],
-            'tổng thống': ['tổng thống', 'president', 'chính phủ', 'government', 'lãnh đạo', 'leader'],
-            
-            # THỂ THAO - Mở rộng
-            'thể thao': ['thể thao', 'sports', 'sport', 'giải đấu', 'tournament', 'thi đấu', 'competition', 'vô địch', 'champion'],
-            'bóng đá': ['bóng đá', 'football', 'soccer', 'World Cup', 'FIFA', 'premier league', 'thể thao'],
-            'tennis': ['tennis', 'Wimbledon', 'US Open', 'thể thao'],
-            'olympic': ['Olympic', 'Olympics', 'Thế vận hội', 'thể thao'],
-            
-            # MÔI TRƯỜNG - TỐI ƯU HÓA
-            'môi trường': ['môi trường', 'environment', 'sinh thái', 'ecology', 'bảo tồn', 'conservation', 'ô nhiễm', 'pollution', 'khí hậu', 'climate', 'carbon', 'xanh', 'green', 'bền vững', 'sustainable', 'rác thải', 'waste', 'tái chế', 'recycle', 'năng lượng tái tạo', 'renewable energy', 'biodiversity', 'đa dạng sinh học'],
-            'biến đổi khí hậu': ['biến đổi khí hậu', 'climate change', 'nóng lên toàn cầu', 'global warming', 'môi trường', 'carbon', 'khí thải', 'emissions'],
-            'ô nhiễm': ['ô nhiễm', 'pollution', 'môi trường', 'khí thải', 'nước thải', 'rác thải', 'chất độc', 'toxic'],
-            'năng lượng tái tạo': ['năng lượng tái tạo', 'renewable energy', 'solar', 'wind', 'điện mặt trời', 'điện gió', 'xanh', 'green energy'],
-            
-            # GIÁO DỤC
-            'giáo dục': ['giáo dục', 'education', 'trường học', 'school', 'đại học', 'university', 'học sinh', 'student', 'giáo viên', 'teacher'],
-        }
-        
         # 1. Kiểm tra exact match cho topic
-        if topic_lower in keyword_relations:
-            related.extend(keyword_relations[topic_lower])
+        if topic_lower in KEYWORD_RELATIONS:
+            related.extend(KEYWORD_RELATIONS[topic_lower])
         
         # 2. Kiểm tra từng từ trong topic
         topic_words = topic_lower.split()
         for word in topic_words:
-            if word in keyword_relations and word != topic_lower:
-                related.extend(keyword_relations[word])
+            if word in KEYWORD_RELATIONS and word != topic_lower:
+                related.extend(KEYWORD_RELATIONS[word])
         
         # 3. Kiểm tra partial match
-        for key, values in keyword_relations.items():
+        for key, values in KEYWORD_RELATIONS.items():
             if any(word in key for word in topic_words) or any(word in topic_lower for word in key.split()):
                 related.extend(values)
         
         # 4. Thêm từ khóa đồng nghĩa tiếng Anh/Việt
-        synonyms = {
-            'y tế': ['healthcare', 'medical', 'health'],
-            'công nghệ': ['technology', 'tech', 'innovation'],
-            'kinh tế': ['economy', 'economic', 'finance'],
-            'chính trị': ['politics', 'political', 'government'],
-            'thể thao': ['sports', 'sport', 'athletic'],
-            'quân sự': ['military', 'defense', 'army'],
-            'thiên tai': ['disaster', 'natural disaster', 'emergency']
-        }
-        
-        for viet_word, eng_words in synonyms.items():
+        for viet_word, eng_words in KEYWORD_SYNONYMS.items():
             if viet_word in topic_lower:
                 related.extend(eng_words)
             elif any(eng_word in topic_lower for eng_word in eng_words):
                 related.append(viet_word)
         
         # 3. Kiểm tra partial match
-        for key, values in keyword_relations.items():
+        for key, values in KEYWORD_RELATIONS.items():
             if any(word in key for word in topic_words) or any(word in topic_lower for word in key.split()):
                 related.extend(values)
         
@@ -974,251 +1102,165 @@ class Chatbot1thegioiCrew():
 
     def search_via_sitemap(self, topic):
         """Tìm kiếm qua sitemap hoặc RSS của trang web với retry logic"""
-        articles = []
+        plan = self.build_query_plan(topic)
+        return self.fetch_candidates(plan, self.sitemap_candidates(plan))
+
+    def sitemap_candidates(self, plan, max_child_sitemaps=2):
+        """Ứng viên từ sitemap/RSS (tiêu đề lấy từ metadata hoặc slug) - chưa tải nội dung"""
+        plan = self.build_query_plan(plan)
+        topic = plan.topic
+        candidates = []
         try:
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'vi-VN,vi;q=0.8,en-US;q=0.5,en;q=0.3',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive'
-            }
-
-            # Thử các URL sitemap và RSS phổ biến với retry
-            sitemap_urls = [
-                'https://1thegioi.vn/sitemap.xml',
-                'https://1thegioi.vn/sitemap_index.xml',
-                'https://1thegioi.vn/rss.xml',
-                'https://1thegioi.vn/feed',
-                'https://1thegioi.vn/feed.xml',
-                'https://1thegioi.vn/robots.txt'
-            ]
+            # Các URL sitemap và RSS phổ biến, thêm sitemap khai báo trong robots.txt
+            sitemap_queue = list(self.SITEMAP_URLS)
+            try:
+                response = self.http.get_cached('https://1thegioi.vn/robots.txt', timeout=15)
+                if response.status_code == 200:
+                    for url in sitemaps_from_robots(response.text):
+                        if url not in sitemap_queue:
+                            sitemap_queue.append(url)
+            except Exception as e:
+                logger.warning("Không đọc được robots.txt: %s", e)
 
-            keywords = self.extract_keywords(topic)
             seen_urls = set()
+            visited = set()
+            children_followed = 0
 
-            for sitemap_url in sitemap_urls:
-                if len(articles) >= 5:
-                    break
-
-                # Retry logic
-                for attempt in range(3):
-                    try:
-                        response = requests.get(sitemap_url, headers=headers, timeout=15)
-
-                        if response.status_code == 200:
-                            # Xử lý robots.txt để tìm sitemap
-                            if 'robots.txt' in sitemap_url:
-                                for line in response.text.split('\n'):
-                                    if line.lower().startswith('sitemap:'):
-                                        real_sitemap = line.split(':', 1)[1].strip()
-                                        if real_sitemap not in sitemap_urls:
-                                            sitemap_urls.append(real_sitemap)
-                                continue
+            while sitemap_queue and len(candidates) < 5:
+                sitemap_url = sitemap_queue.pop(0)
+                if sitemap_url in visited:
+                    continue
+                visited.add(sitemap_url)
 
-                            # Parse XML sitemap/RSS với nhiều phương thức
-                            soup = None
-                            content = response.content.decode('utf-8', errors='ignore')
+                # Không thử lại: 429/503 đã được rate limiter ghi nhận, sitemap lỗi thì chuyển sang sitemap kế tiếp
+                try:
+                    response = self.http.get_cached(sitemap_url, timeout=15)
+                    if response.status_code != 200:
+                        continue
+                    entries, child_sitemaps = parse_sitemap(response.content)
+                except Exception as e:
+                    logger.debug("Sitemap lỗi hoặc không phải XML: %s", e)
+                    continue
 
-                            # Thử parse như XML trước
-                            try:
-                                from xml.etree import ElementTree as ET
-                                root = ET.fromstring(content)
-                                # Convert to dict for easier processing
-                                soup = self.xml_to_dict(root)
-                            except Exception as e:
-                                # Fallback to BeautifulSoup
-                                try:
-                                    soup = BeautifulSoup(content, 'xml')
-                                except Exception as e:
-                                    try:
-                                        soup = BeautifulSoup(content, 'html.parser')
-                                    except Exception as e:
-                                        continue
-
-                            if soup is None:
-                                continue
+                # Sitemap index: chỉ theo các sitemap con mới nhất
+                child_sitemaps.sort(key=lambda child: child['lastmod'], reverse=True)
+                for child in child_sitemaps[:max(0, max_child_sitemaps - children_followed)]:
+                    sitemap_queue.append(child['url'])
+                    children_followed += 1
 
-                            # Tìm URLs từ sitemap - hỗ trợ nhiều format
-                            urls = []
-
-                            # Kiểm tra kiểu dữ liệu của soup
-                            if isinstance(soup, dict):
-                                # Xử lý dict format từ xml_to_dict
-                                urls = self.extract_urls_from_dict(soup)
-                            elif hasattr(soup, 'find_all'):
-                                # Xử lý BeautifulSoup object
-                                url_tags = soup.find_all(['url', 'item', 'entry', 'link'])
-                                for url_elem in url_tags:
-                                    loc_elem = url_elem.find('loc') or url_elem.find('link') or url_elem
-                                    if loc_elem:
-                                        if hasattr(loc_elem, 'text') and loc_elem.text:
-                                            url = loc_elem.text.strip()
-                                        elif hasattr(loc_elem, 'get'):
-                                            url = loc_elem.get('href', '')
-                                        else:
-                                            url = str(loc_elem).strip()
-                                        if url and url.startswith('http'):
-                                            urls.append((url, url_elem))
-                            else:
-                                continue
+                # Sitemap đã tải rồi nên xét hết 30 URL đầu - chỉ ứng viên lên đầu pool mới bị tải nội dung
+                for entry in entries[:30]:
+                    url = entry['url']
+                    if not url or url in seen_urls or not is_site_host(urllib.parse.urlsplit(url).hostname or ''):
+                        continue
 
-                            # Xử lý từng URL
-                            for url_data in urls[:30]:  # Tăng lên 30 bài
-                                if len(articles) >= 5:
-                                    break
+                    # Tiêu đề từ metadata, không có thì dựng từ slug
+                    title = entry['title']
+                    if not title:
+                        title = url.split('/')[-1].replace('-', ' ').replace('.html', '').replace('_', ' ')
+                        if len(title) < 5:
+                            title = f"Bài viết về {topic}"
 
-                                try:
-                                    if isinstance(url_data, tuple):
-                                        url, url_elem = url_data
-                                    else:
-                                        url = url_data
-                                        url_elem = None
-
-                                    if not url or url in seen_urls or '1thegioi.vn' not in url:
-                                        continue
-
-                                    # Tạo title từ URL hoặc metadata
-                                    title = ""
-                                    if url_elem:
-                                        title_elem = url_elem.find('title') or url_elem.find('name')
-                                        if title_elem and hasattr(title_elem, 'text'):
-                                            title = title_elem.text.strip()
-
-                                    if not title:
-                                        title = url.split('/')[-1].replace('-', ' ').replace('.html', '').replace('_', ' ')
-                                        if len(title) < 5:
-                                            title = f"Bài viết về {topic}"
-
-                                    # Kiểm tra liên quan
-                                    relevance_score = self.calculate_relevance_score(title, url, topic, keywords)
-
-                                    if relevance_score > 0.3:  # Giảm ngưỡng
-                                        # Lấy nội dung bài viết
-                                        content = self.get_article_content(url)
-
-                                        if content and len(content) > 50:
-                                            articles.append({
-                                                'title': title.strip(),
-                                                'url': url,
-                                                'content': content,
-                                                'relevance_score': relevance_score,
-                                                'source': 'sitemap'
-                                            })
-
-                                            seen_urls.add(url)
-
-                                except Exception as e:
-                                    continue
+                    # Kiểm tra liên quan
+                    relevance_score = self.calculate_relevance_score(title, url, plan)
 
-                            break  # Thành công, thoát retry loop
+                    if relevance_score:
+                        candidates.append(Candidate(url, title, relevance_score, 'sitemap'))
+                        seen_urls.add(url)
 
-                        else:
-                            if attempt < 2:  # Chỉ retry nếu chưa phải lần cuối
-                                time.sleep(2)
-                                continue
-                            else:
-                                break
-
-                    except Exception as e:
-                        if attempt < 2:
-                            time.sleep(2)
-                            continue
-                        else:
-                            break
-
-            return articles
+            return candidates
 
         except Exception as e:
+            logger.warning("Lỗi tìm kiếm qua sitemap: %s", e)
             return []
 
     def search_by_url_pattern(self, topic):
         """Tìm kiếm bằng cách đoán URL pattern dựa trên topic"""
-        articles = []
         try:
-            print(f"[PATTERN] Tìm kiếm bằng URL pattern cho: '{topic}'")
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            # Tạo các URL pattern có thể có
-            topic_slug = topic.lower().replace(' ', '-').replace('ầ', 'a').replace('ă', 'a').replace('ê', 'e').replace('ô', 'o').replace('ơ', 'o').replace('ư', 'u')
-            
-            # Các pattern URL phổ biến
-            url_patterns = [
-                f"https://1thegioi.vn/{topic_slug}",
-                f"https://1thegioi.vn/thoi-su/{topic_slug}",
-                f"https://1thegioi.vn/ca-phe-mot-the-gioi/{topic_slug}",
-                f"https://1thegioi.vn/cong-nghe-quan-su/{topic_slug}",
-                # Thử các pattern với từ khóa riêng lẻ
-                f"https://1thegioi.vn/ukraine-{topic_slug}",
-                f"https://1thegioi.vn/russia-{topic_slug}",
-                f"https://1thegioi.vn/chien-tranh-{topic_slug}",
-                # Pattern với số bài viết
-                f"https://1thegioi.vn/{topic_slug}-{{}}.html",
-                f"https://1thegioi.vn/{topic_slug.replace('-', '')}-{{}}.html"
-            ]
-            
-            # Thử từng pattern
-            for base_pattern in url_patterns[:5]:  # Giới hạn 5 pattern để không quá chậm
-                if len(articles) >= 3:
-                    break
+            return self.run_search_tier('url_pattern', self.url_pattern_articles, topic)
+        except Exception as e:
+            logger.warning("Lỗi tìm kiếm URL pattern: %s", e)
+            return []
+
+    def url_pattern_articles(self, topic):
+        """Bài viết tìm được bằng cách đoán URL (gọi qua search_by_url_pattern)"""
+        plan = self.build_query_plan(topic)
+        topic = plan.topic
+        articles = []
+        logger.info("Tìm kiếm bằng URL pattern cho: '%s'", topic)
+        
+        # Tạo các URL pattern có thể có
+        topic_slug = topic.lower().replace(' ', '-').replace('ầ', 'a').replace('ă', 'a').replace('ê', 'e').replace('ô', 'o').replace('ơ', 'o').replace('ư', 'u')
+        
+        # Các pattern URL phổ biến
+        url_patterns = [
+            f"https://1thegioi.vn/{topic_slug}",
+            f"https://1thegioi.vn/thoi-su/{topic_slug}",
+            f"https://1thegioi.vn/ca-phe-mot-the-gioi/{topic_slug}",
+            f"https://1thegioi.vn/cong-nghe-quan-su/{topic_slug}",
+            # Thử các pattern với từ khóa riêng lẻ
+            f"https://1thegioi.vn/ukraine-{topic_slug}",
+            f"https://1thegioi.vn/russia-{topic_slug}",
+            f"https://1thegioi.vn/chien-tranh-{topic_slug}",
+            # Pattern với số bài viết
+            f"https://1thegioi.vn/{topic_slug}-{{}}.html",
+            f"https://1thegioi.vn/{topic_slug.replace('-', '')}-{{}}.html"
+        ]
+        
+        # Thử từng pattern
+        for base_pattern in url_patterns[:5]:  # Giới hạn 5 pattern để không quá chậm
+            if len(articles) >= 3:
+                break
+                
+            # Nếu pattern có {}, thử với các số
+            if '{}' in base_pattern:
+                for num in [1, 2, 3, 4, 5]:
+                    test_url = base_pattern.format(str(num).zfill(6))  # 6 digits: 000001, 000002, etc
                     
-                # Nếu pattern có {}, thử với các số
-                if '{}' in base_pattern:
-                    for num in [1, 2, 3, 4, 5]:
-                        test_url = base_pattern.format(str(num).zfill(6))  # 6 digits: 000001, 000002, etc
+                    try:
+                        logger.debug("Thử URL pattern: %s", test_url)
+                        # Bài đã có trong cache thì không cần kiểm tra lại qua mạng
+                        article = self.article_cache.get(test_url) if self.article_cache else None
                         
-                        try:
-                            print(f"[PATTERN] Thử URL: {test_url}")
-                            response = requests.head(test_url, headers=headers, timeout=5)
-                            
+                        if article is None:
+                            response = self.http.head(test_url, timeout=5)
                             if response.status_code == 200:
                                 # URL tồn tại, lấy nội dung
-                                full_response = requests.get(test_url, headers=headers, timeout=10)
-                                if full_response.status_code == 200:
-                                    soup = BeautifulSoup(full_response.content, 'html.parser')
-                                    
-                                    # Tìm title
-                                    title_elem = soup.find('title') or soup.find('h1') or soup.find('h2')
-                                    title = title_elem.get_text(strip=True) if title_elem else f"Bài viết về {topic}"
-                                    
-                                    # Kiểm tra liên quan
-                                    keywords = self.extract_keywords(topic)
-                                    score = self.calculate_relevance_score(title, test_url, topic, keywords)
-                                    
-                                    if score > 0:
-                                        content = self.get_article_content(test_url)
-                                        
-                                        articles.append({
-                                            'title': title,
-                                            'url': test_url,
-                                            'content': content,
-                                            'relevance_score': score,
-                                            'source': 'url_pattern'
-                                        })
-                                        
-                                        print(f"[PATTERN] Tìm thấy (score={score:.2f}): {title[:60]}...")
-                        except:
-                            continue
-                else:
-                    # Pattern không có {}, thử trực tiếp
-                    try:
-                        print(f"[PATTERN] Thử URL: {base_pattern}")
-                        response = requests.head(base_pattern, headers=headers, timeout=5)
+                                article = self.fetch_article(test_url)
                         
-                        if response.status_code == 200:
-                            # URL tồn tại
-                            print(f"[PATTERN] URL tồn tại: {base_pattern}")
-                    except:
+                        if article:
+                            title = article['title'] or f"Bài viết về {topic}"
+                            
+                            # Kiểm tra liên quan
+                            score = self.calculate_relevance_score(title, test_url, plan)
+                            
+                            if score > 0:
+                                articles.append({
+                                    'title': title,
+                                    'url': test_url,
+                                    'content': article['content'] or "Không thể lấy nội dung bài viết.",
+                                    'relevance_score': score,
+                                    'source': 'url_pattern'
+                                })
+                                
+                                logger.debug("URL pattern tìm thấy (điểm %.2f): %s", score, title[:60])
+                    except Exception as e:
+                        logger.debug("Lỗi thử URL pattern: %s", e)
                         continue
-            
-            return articles
-            
-        except Exception as e:
-            print(f"[ERROR] Lỗi tìm kiếm URL pattern: {e}")
-            return []
+            else:
+                # Pattern không có {}, thử trực tiếp
+                try:
+                    logger.debug("Thử URL pattern: %s", base_pattern)
+                    response = self.http.head(base_pattern, timeout=5)
+                    
+                    if response.status_code == 200:
+                        # URL tồn tại
+                        logger.debug("URL pattern tồn tại: %s", base_pattern)
+                except Exception as e:
+                    logger.debug("Lỗi thử URL pattern: %s", e)
+                    continue
+        
+        return articles
 
     def create_fallback_articles(self, topic):
         """Tạo bài viết dự phòng khi không tìm thấy kết quả"""
@@ -1246,87 +1288,138 @@ class Chatbot1thegioiCrew():
     def get_article_content(self, url):
         """Lấy nội dung bài viết"""
         try:
-            headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-            response = requests.get(url, headers=headers, timeout=10)
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-                
-                # Tìm nội dung trong các thẻ phổ biến trên 1thegioi.vn
-                content_selectors = [
-                    # Main content areas
-                    '.content', '.article-content', '.post-content', '.entry-content',
-                    'article .content', 'article p', '.article-body', '.post-body',
-
-                    # Specific 1thegioi.vn patterns
-                    '.article-detail', '.news-content', '.detail-content',
-                    '.main-content', '.article-text', '.news-text',
-
-                    # Generic content selectors
-                    '.text', '.description', '.summary', '.excerpt',
-                    'p', '.paragraph', '.content p',
-
-                    # Fallback selectors
-                    '[class*="content"]', '[class*="article"]', '[class*="post"]'
-                ]
-
-                content = ""
-                for selector in content_selectors:
-                    elements = soup.select(selector)
-                    if elements:
-                        # Lấy text từ các elements, ưu tiên paragraphs
-                        text_parts = []
-                        for elem in elements[:5]:  # Lấy tối đa 5 elements
-                            text = elem.get_text(strip=True)
-                            if len(text) > 20:  # Chỉ lấy text có ý nghĩa
-                                text_parts.append(text)
-
-                        if text_parts:
-                            content = ' '.join(text_parts)
-                            if len(content) > 200:  # Đảm bảo có đủ nội dung
-                                break
+            article = self.fetch_article(url)
+            if article is not None:
+                return article['content'] or "Không thể lấy nội dung bài viết."
+        except Exception as e:
+            logger.debug("Lỗi tải nội dung bài %s: %s", url, e)
+            return "Không thể truy cập nội dung bài viết."
 
-                # Nếu không tìm thấy content, thử lấy từ toàn bộ body
-                if not content or len(content) < 50:
-                    body = soup.find('body')
-                    if body:
-                        content = body.get_text(strip=True)[:1000]
+    def fetch_article(self, url, refresh=False):
+        """Lấy tiêu đề và nội dung bài viết, ưu tiên cache trên đĩa; trả về None nếu HTTP lỗi.
+
+        Nhiều luồng cùng cần một URL thì chỉ một luồng tải, các luồng khác nhận chung kết quả.
+        """
+        # Bản http/https, AMP, có tham số theo dõi... của cùng bài dùng chung một lượt tải và một bản cache
+        url = canonical_url(url)
+        log = fetch_log.get()
+        if log is not None:
+            log.add(url)
+        article, shared = self.single_flight.do(('article', url, refresh), self.load_article, url, refresh)
+        return dict(article) if shared and article is not None else article
+
+    def load_article(self, url, refresh=False):
+        """Đọc bài từ cache trên đĩa hoặc tải mới (một lượt, không gộp)"""
+        if self.article_cache and not refresh:
+            cached = self.article_cache.get(url)
+            metrics.inc('chatbot_cache_requests_total', cache='article', result='hit' if cached else 'miss')
+            if cached:
+                return cached
+
+        if settings.ARTICLE_STREAMING:
+            # Đọc trang từng đoạn, dừng ngay khi đủ nội dung hoặc chạm giới hạn byte
+            article = stream_article(self.http, url, timeout=10)
+        else:
+            article = self.download_article(url)
+        if article is None:
+            return None
+
+        title = article['title']
+        content = article['content']
+        published = article['published']
+        self.ranker.observe(url, title, content)
+        if content and self.article_cache:
+            self.article_cache.put(url, content, title, published)
+
+        return {'url': url, 'title': title, 'content': content, 'published': published}
+
+    def download_article(self, url):
+        """Tải trọn trang bài viết rồi phân tích; trả về dict title/content/published hoặc None nếu HTTP lỗi"""
+        response = self.http.get(url, timeout=10)
+        if response.status_code != 200:
+            return None
+
+        soup = parse_html(response.content)
+
+        # Tìm title
+        title_elem = soup.find('title') or soup.find('h1') or soup.find('h2')
+        title = title_elem.get_text(strip=True) if title_elem else ''
+
+        # Ngày đăng từ meta tag (nếu có)
+        published = ''
+        for selector in ['meta[property="article:published_time"]', 'meta[itemprop="datePublished"]',
+                         'meta[name="pubdate"]', 'meta[name="publishdate"]']:
+            meta = soup.select_one(selector)
+            if meta and meta.get('content'):
+                published = meta['content'].strip()
+                break
+
+        return {'title': title, 'content': self.extract_article_content(soup), 'published': published}
+
+    def extract_article_content(self, soup):
+        """Trích xuất nội dung chính từ trang bài viết (tối đa ARTICLE_CONTENT_BUDGET ký tự)"""
+        # Tìm nội dung trong các thẻ phổ biến trên 1thegioi.vn
+        content_selectors = [
+            # Main content areas
+            '.content', '.article-content', '.post-content', '.entry-content',
+            'article .content', 'article p', '.article-body', '.post-body',
+
+            # Specific 1thegioi.vn patterns
+            '.article-detail', '.news-content', '.detail-content',
+            '.main-content', '.article-text', '.news-text',
+
+            # Generic content selectors
+            '.text', '.description', '.summary', '.excerpt',
+            'p', '.paragraph', '.content p',
+
+            # Fallback selectors
+            '[class*="content"]', '[class*="article"]', '[class*="post"]'
+        ]
 
-                return content[:800] if content else "Không thể lấy nội dung bài viết."
-        except:
-            return "Không thể truy cập nội dung bài viết."
+        content = ""
+        for selector in content_selectors:
+            elements = soup.select(selector)
+            if elements:
+                # Lấy text từ các elements, ưu tiên paragraphs
+                text_parts = []
+                for elem in elements[:5]:  # Lấy tối đa 5 elements
+                    text = elem.get_text(strip=True)
+                    if len(text) > 20:  # Chỉ lấy text có ý nghĩa
+                        text_parts.append(text)
+
+                if text_parts:
+                    content = ' '.join(text_parts)
+                    if len(content) > 200:  # Đảm bảo có đủ nội dung
+                        break
 
-    def summarize_with_ollama(self, topic, articles):
-        """Tạo báo cáo tóm tắt chuyên nghiệp về chủ đề dựa trên các bài viết tìm được"""
-        try:
-            if isinstance(articles, str):
-                print("⚠️  Nhận được dữ liệu không hợp lệ")
-                return f"Không thể tạo báo cáo chi tiết cho chủ đề '{topic}' do dữ liệu không hợp lệ."
-            
-            if not articles or len(articles) == 0:
-                print("⚠️  Không có bài viết để phân tích")
-                return self.create_default_report(topic)
-            
-            print(f"📊 Đang phân tích {len(articles)} bài viết về '{topic}'...")
+        # Nếu không tìm thấy content, thử lấy từ toàn bộ body
+        if not content or len(content) < 50:
+            body = soup.find('body')
+            if body:
+                content = body.get_text(strip=True)[:1000]
+
+        return content[:settings.ARTICLE_CONTENT_BUDGET]
+
+    def build_summary_prompt(self, topic, articles):
+        """Prompt phân tích gửi Ollama, dựng từ tối đa 5 bài viết"""
+        # Chuẩn bị nội dung từ các bài viết
+        articles_summary = []
+        for i, article in enumerate(articles[:5], 1):
+            title = article.get('title', f'Bài viết {i}')
+            content = article.get('content', '')[:600]  # Giới hạn 600 ký tự
+            url = article.get('url', '')
+            score = article.get('relevance_score', 0)
             
-            # Chuẩn bị nội dung từ các bài viết
-            articles_summary = []
-            for i, article in enumerate(articles[:5], 1):
-                title = article.get('title', f'Bài viết {i}')
-                content = article.get('content', '')[:600]  # Giới hạn 600 ký tự
-                url = article.get('url', '')
-                score = article.get('relevance_score', 0)
-                
-                articles_summary.append(f"""
+            articles_summary.append(f"""
 Bài {i}: {title}
 Độ liên quan: {score:.1f}/10
 Tóm tắt: {content}
 Link: {url}
 """)
-            
-            content_text = "\n".join(articles_summary)
-            
-            # Prompt tối ưu cho Ollama - yêu cầu báo cáo toàn diện
-            prompt = f"""Phân tích chuyên sâu về chủ đề "{topic}" dựa trên {len(articles)} bài báo từ 1thegioi.vn:
+        
+        content_text = "\n".join(articles_summary)
+        
+        prompt = f"""Phân tích chuyên sâu về chủ đề "{topic}" dựa trên {len(articles)} bài báo từ 1thegioi.vn:
 
 {content_text}
 
@@ -1352,37 +1445,17 @@ YÊU CẦU PHÂN TÍCH CHI TIẾT:
    - Khuyến nghị cho người đọc
 
 Viết bằng tiếng Việt, chuyên nghiệp, logic, dài 600-800 từ. Tập trung vào thông tin thực tế từ các bài viết."""
-            
-            # Gọi Ollama
-            try:
-                response = requests.post('http://localhost:11434/api/generate', 
-                    json={
-                        'model': 'gemma2:2b',  # Sử dụng model nhẹ hơn
-                        'prompt': prompt,
-                        'stream': False,
-                        'options': {
-                            'temperature': 0.7,
-                            'top_p': 0.9,
-                            'num_predict': 800
-                        }
-                    },
-                    timeout=90
-                )
-                
-                if response.status_code == 200:
-                    result = response.json()
-                    ollama_response = result.get('response', '').strip()
-                    
-                    if ollama_response and len(ollama_response) > 150:
-                        print("✅ Đã tạo báo cáo phân tích bằng AI")
-                        
-                        # Tạo báo cáo hoàn chỉnh với thông tin tổng quát
-                        topic_overview = self.analyze_topic(topic, articles)
-                        topic_aspects = self.get_topic_aspects(topic)
-                        topic_impact = self.get_topic_impact(topic)
-                        related_topics = self.get_related_topics(topic)
+        return prompt
+
+    def ai_report_sections(self, topic, articles):
+        """Phần đầu và phần cuối của báo cáo AI, bao quanh phần phân tích do Ollama sinh"""
+        # Tạo báo cáo hoàn chỉnh với thông tin tổng quát
+        topic_overview = self.analyze_topic(topic, articles)
+        topic_aspects = self.get_topic_aspects(topic)
+        topic_impact = self.get_topic_impact(topic)
+        related_topics = self.get_related_topics(topic)
 
-                        final_report = f"""# 📋 BÁO CÁO PHÂN TÍCH CHI TIẾT: {topic.upper()}
+        header = f"""# 📋 BÁO CÁO PHÂN TÍCH CHI TIẾT: {topic.upper()}
 
 **🕒 Thời gian:** {datetime.now().strftime('%d/%m/%Y %H:%M:%S')}
 **📊 Số bài viết phân tích:** {len(articles)}
@@ -1404,7 +1477,9 @@ Viết bằng tiếng Việt, chuyên nghiệp, logic, dài 600-800 từ. Tập
 
 ## 📖 PHÂN TÍCH CHI TIẾT
 
-{ollama_response}
+"""
+
+        footer = f"""
 
 ---
 
@@ -1423,7 +1498,7 @@ Viết bằng tiếng Việt, chuyên nghiệp, logic, dài 600-800 từ. Tập
 ## �📰 CÁC BÀI VIẾT THAM KHẢO
 
 """ + "\n".join([f"**{i+1}.** [{art.get('title', 'Không có tiêu đề')}]({art.get('url', '#')})\n    *Độ liên quan: {art.get('relevance_score', 0):.1f}/10*" 
-                                for i, art in enumerate(articles[:5])]) + f"""
+            for i, art in enumerate(articles[:5])]) + f"""
 
 ---
 
@@ -1435,29 +1510,120 @@ Viết bằng tiếng Việt, chuyên nghiệp, logic, dài 600-800 từ. Tập
 *Báo cáo được tạo bởi Chatbot 1thegioi.vn với hỗ trợ AI*
 *Tạo ngày: {datetime.now().strftime('%d/%m/%Y')} | Phiên bản: 2.0*"""
 
-                        return final_report
-                    else:
-                        print("⚠️  AI trả về nội dung quá ngắn")
-                else:
-                    print(f"❌ Ollama lỗi HTTP {response.status_code}")
+        return header, footer
+
+    def summarize_with_ollama(self, topic, articles, on_text=None, priority=0):
+        """Tạo báo cáo tóm tắt chuyên nghiệp về chủ đề dựa trên các bài viết tìm được.
+
+        Phần phân tích được stream từ Ollama: on_text (nếu có) nhận lần lượt phần đầu báo cáo,
+        từng đoạn token ngay khi về và phần cuối, để in/ghi file dần. Lượt gọi Ollama đi qua
+        llm_scheduler (priority nhỏ được phục vụ trước); hàng đợi đầy thì dùng báo cáo thủ công.
+
+        Các lượt cùng model, chủ đề và bài viết đang chạy đồng thời chỉ gọi Ollama một lần;
+        lượt chờ nhận trọn báo cáo một lần qua on_text khi lượt đầu xong.
+        """
+        if isinstance(articles, str) or not articles:
+            return self.generate_ollama_report(topic, articles, on_text, priority)
+
+        key = summary_key(self.ollama.model, self.SUMMARY_PROMPT_VERSION, topic, articles[:5])
+        report, shared = self.single_flight.do(
+            ('summary', key), self.generate_ollama_report, topic, articles, on_text, priority
+        )
+        if shared and on_text:
+            on_text(report)
+        return report
+
+    def generate_ollama_report(self, topic, articles, on_text=None, priority=0):
+        """Một lượt tạo báo cáo AI (cache, hàng đợi LLM, stream Ollama, fallback thủ công)"""
+        try:
+            if isinstance(articles, str):
+                logger.warning("Nhận được dữ liệu bài viết không hợp lệ")
+                return f"Không thể tạo báo cáo chi tiết cho chủ đề '{topic}' do dữ liệu không hợp lệ."
+            
+            if not articles or len(articles) == 0:
+                logger.warning("Không có bài viết để phân tích")
+                return self.create_default_report(topic)
+            
+            # Thông báo trạng thái đi qua logger (stderr) để không chen vào báo cáo đang stream qua on_text
+            logger.info("Đang phân tích %d bài viết về '%s'", len(articles), topic)
+            
+            # Prompt tối ưu cho Ollama - yêu cầu báo cáo toàn diện
+            prompt = self.build_summary_prompt(topic, articles)
+            emit = on_text or (lambda text: None)
+            
+            # Cùng model, prompt và nội dung bài đã phân tích trước đó - dùng lại, không gọi Ollama
+            cache_key = summary_key(self.ollama.model, self.SUMMARY_PROMPT_VERSION, topic, articles[:5])
+            cached = self.summary_cache.get(cache_key) if self.summary_cache else None
+            if self.summary_cache:
+                metrics.inc('chatbot_cache_requests_total', cache='summary', result='hit' if cached else 'miss')
+            if cached:
+                metrics.inc('chatbot_llm_requests_total', result='cached')
+                logger.info("Dùng lại bản phân tích AI đã lưu")
+                header, footer = self.ai_report_sections(topic, articles)
+                for text in (header, cached, footer):
+                    emit(text)
+                return header + cached + footer
+            
+            # Gọi Ollama (stream) - phần đầu báo cáo chỉ phát ra khi đã có token đầu tiên
+            parts = []
+            header = footer = None
+            completed = False
+            outcome = 'error'
+            try:
+                with self.llm_scheduler.slot(priority) as waited:
+                    if waited >= 1:
+                        logger.info("Đã chờ %.1fs trong hàng đợi AI", waited)
+                    started = time.perf_counter()
+                    for chunk in self.ollama.generate_stream(prompt, options={
+                        'temperature': 0.7,
+                        'top_p': 0.9,
+                        'num_predict': settings.OLLAMA_NUM_PREDICT
+                    }):
+                        if header is None:
+                            metrics.observe('chatbot_llm_first_token_seconds', time.perf_counter() - started)
+                            header, footer = self.ai_report_sections(topic, articles)
+                            emit(header)
+                        parts.append(chunk)
+                        emit(chunk)
+                    completed = True
+                    outcome = 'completed'
                     
-            except requests.exceptions.Timeout:
-                print("⏰ Ollama timeout - tạo báo cáo thủ công")
+            except QueueFull as e:
+                outcome = 'rejected'
+                logger.warning("AI đang bận: %s", e)
+            except OllamaTimeout as e:
+                outcome = 'timeout'
+                logger.warning("%s", e)
             except requests.exceptions.ConnectionError:
-                print("🔌 Không kết nối được Ollama - tạo báo cáo thủ công")
+                outcome = 'unavailable'
+                logger.warning("Không kết nối được Ollama")
             except Exception as e:
-                print(f"❌ Lỗi Ollama: {e}")
+                logger.warning("Lỗi Ollama: %s", e)
+            metrics.inc('chatbot_llm_requests_total', result=outcome)
+            
+            if header is not None:
+                # Phần cuối báo cáo phát ra liền sau token cuối, trước mọi thông báo trạng thái
+                emit(footer)
+                ollama_response = ''.join(parts).strip()
+                if len(ollama_response) > 150:
+                    logger.info("Đã tạo báo cáo phân tích bằng AI")
+                    # Chỉ lưu bản phân tích trọn vẹn (không bị ngắt giữa chừng)
+                    if completed and self.summary_cache:
+                        self.summary_cache.put(cache_key, self.ollama.model, topic, ''.join(parts))
+                else:
+                    logger.warning("AI trả về nội dung quá ngắn")
+                return header + ''.join(parts) + footer
         
         except Exception as e:
-            print(f"❌ Lỗi tạo báo cáo với AI: {e}")
+            logger.warning("Lỗi tạo báo cáo với AI: %s", e)
         
         # Fallback - luôn tạo báo cáo thủ công chi tiết
-        print("📝 Tạo báo cáo thủ công chi tiết...")
+        logger.info("Tạo báo cáo thủ công chi tiết")
         return self.create_manual_report(topic, articles)
 
     def create_manual_report(self, topic, articles):
         """Tạo báo cáo tóm tắt toàn diện với thông tin tổng quát về chủ đề"""
-        print("📝 Đang tạo báo cáo tổng quát chi tiết...")
+        logger.info("Đang tạo báo cáo tổng quát chi tiết")
 
         if not articles:
             return self.create_default_report(topic)
@@ -1629,57 +1795,13 @@ Hiện tại chưa tìm thấy bài viết cụ thể về chủ đề "{topic}"
 
 *💡 Mẹo: Hãy thử lại sau vài giờ hoặc sử dụng từ khóa khác để có kết quả tốt hơn!*"""
 
-    @agent
-    def greeter(self) -> Agent:
-        return Agent(
-            config=self.agents_config['greeter'],
-            verbose=True
-        )
-    
-    @agent  
-    def controller(self) -> Agent:
-        return Agent(
-            config=self.agents_config['controller'],
-            verbose=True
-        )
-    
-    @agent
-    def category_provider(self) -> Agent:
-        return Agent(
-            config=self.agents_config['category_provider'],
-            verbose=True
-        )
-    
-    @agent
-    def search_summarizer(self) -> Agent:
-        return Agent(
-            config=self.agents_config['search_summarizer'], 
-            verbose=True
-        )
+    def agent_crew(self):
+        """Các agent/task CrewAI (config/*.yaml); crewai chỉ được import khi gọi hàm này lần đầu"""
+        if self._agent_crew is None:
+            from chatbot_1thegioi.agents import Chatbot1thegioiAgents
 
-    @task
-    def greet_task(self) -> Task:
-        return Task(
-            config=self.tasks_config['greet_task']
-        )
-    
-    @task
-    def control_task(self) -> Task:
-        return Task(
-            config=self.tasks_config['control_task']
-        )
-    
-    @task
-    def category_task(self) -> Task:
-        return Task(
-            config=self.tasks_config['category_task']
-        )
-    
-    @task
-    def search_summary_task(self) -> Task:
-        return Task(
-            config=self.tasks_config['search_summary_task']
-        )
+            self._agent_crew = Chatbot1thegioiAgents()
+        return self._agent_crew
 
     def analyze_topic(self, topic, articles):
         """Phân tích tổng quan về chủ đề dựa trên các bài viết"""
@@ -1812,337 +1934,322 @@ Hiện tại chưa tìm thấy bài viết cụ thể về chủ đề "{topic}"
 
     def search_via_google_general(self, topic):
         """Tìm kiếm trên toàn bộ web với nhiều kỹ thuật bypass Google blocking"""
-        articles = []
         try:
-            print(f"🔍 Đang tìm kiếm '{topic}' trên toàn bộ web...")
-
-            # User-Agent rotation để tránh bị chặn
-            user_agents = [
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/121.0',
-                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36 Edg/118.0.2088.46'
-            ]
-
-            # Các query tìm kiếm đa dạng hơn
-            search_queries = [
-                f'"{topic}" tin tức',
-                f'{topic} 2024 2025',
-                f'{topic} phân tích',
-                f'{topic} xu hướng',
-                f'{topic} cập nhật mới nhất',
-                f'{topic} thông tin chi tiết'
-            ]
-
-            seen_urls = set()
-
-            for i, query in enumerate(search_queries[:4]):  # Tăng lên 4 queries
-                try:
-                    # Rotate User-Agent
-                    headers = {
-                        'User-Agent': user_agents[i % len(user_agents)],
-                        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                        'Accept-Language': 'vi-VN,vi;q=0.8,en-US;q=0.5,en;q=0.3',
-                        'Accept-Encoding': 'gzip, deflate, br',
-                        'DNT': '1',
-                        'Connection': 'keep-alive',
-                        'Upgrade-Insecure-Requests': '1',
-                        'Cache-Control': 'max-age=0',
-                        'Sec-Fetch-Dest': 'document',
-                        'Sec-Fetch-Mode': 'navigate',
-                        'Sec-Fetch-Site': 'none',
-                        'Sec-Fetch-User': '?1'
-                    }
-
-                    # Tạo URL Google search với parameters mới
-                    encoded_query = urllib.parse.quote_plus(query)
-                    google_url = f"https://www.google.com/search?q={encoded_query}&num=15&hl=vi&safe=off&filter=0"
-
-                    print(f"[WEB-{i+1}] Đang tìm kiếm: {query}")
-                    response = requests.get(google_url, headers=headers, timeout=30)
-
-                    print(f"[WEB-{i+1}] HTTP Status: {response.status_code}")
-
-                    if response.status_code == 200:
-                        # Kiểm tra xem có bị chặn không
-                        if "Our systems have detected unusual traffic" in response.text:
-                            print("[WEB] ⚠️ Bị chặn unusual traffic - thử cách khác")
-                            time.sleep(5)
-                            continue
-                        elif "429" in response.text or "rate limit" in response.text.lower():
-                            print("[WEB] ⚠️ Rate limited - đợi 10 giây")
-                            time.sleep(10)
-                            continue
-
-                        soup = BeautifulSoup(response.content, 'html.parser')
-
-                        # Thử nhiều selectors mới nhất 2024-2025
-                        selectors = [
-                            'div[data-ved]', 'div.tF2Cxc', 'div.MjjYud', 'div.yuRUbf',
-                            'div.kCrYT', 'div.g', 'div[data-hveid]', 'div[data-ctid]',
-                            'div.egMi0', 'div.Gx5Zad', 'div.IsZvec',
-                            # Mobile selectors
-                            'div[data-snf]', 'div[data-ved] div', 'div.tF2Cxc div',
-                            'div.MjjYud div', 'div.yuRUbf div', 'div.kCrYT div',
-                            # Alternative patterns
-                            '.srg .g', '.srg div[data-ved]', '.srg .tF2Cxc',
-                            '.srg .MjjYud', '.srg .yuRUbf', '.srg .kCrYT',
-                            # New 2024 patterns
-                            'div.N54PNb', 'div.kb0PBd', 'div.Ww4FFb', 'div.cfSxFb'
-                        ]
-
-                        search_results = []
-                        for selector in selectors:
-                            search_results = soup.select(selector)
-                            if search_results:
-                                print(f"[WEB] ✅ Selector '{selector}' tìm thấy {len(search_results)} kết quả")
-                                break
-
-                        print(f"[WEB] Tổng số kết quả tiềm năng: {len(search_results)}")
+            return self.run_search_tier('google_general', self.google_general_articles, topic)
+        except Exception as e:
+            logger.warning("Lỗi tìm kiếm web tổng quát: %s", e)
+            return []
 
-                        results_found = 0
-                        for result in search_results[:15]:  # Tăng lên 15 kết quả
-                            if len(articles) >= 8:  # Giới hạn 8 bài
-                                break
+    def google_general_articles(self, topic):
+        """Bài viết từ trang kết quả Google toàn web, thêm Bing khi chưa đủ (gọi qua search_via_google_general)"""
+        plan = self.build_query_plan(topic)
+        topic = plan.topic
+        articles = []
+        logger.info("Đang tìm kiếm '%s' trên toàn bộ web", topic)
+
+        # User-Agent rotation để tránh bị chặn
+        user_agents = [
+            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+            'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:109.0) Gecko/20100101 Firefox/121.0',
+            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36 Edg/118.0.2088.46'
+        ]
 
-                            try:
-                                # Tìm title với nhiều cách hơn
-                                title = ""
-                                title_selectors = ['h2', 'a', '.b_title', '.title']
-                                for title_sel in title_selectors:
-                                    title_elem = result.select_one(title_sel)
-                                    if title_elem:
-                                        title = title_elem.get_text().strip()
-                                        if len(title) > 5:
-                                            break
+        # Các query tìm kiếm đa dạng hơn
+        search_queries = [
+            f'"{topic}" tin tức',
+            f'{topic} 2024 2025',
+            f'{topic} phân tích',
+            f'{topic} xu hướng',
+            f'{topic} cập nhật mới nhất',
+            f'{topic} thông tin chi tiết'
+        ]
 
-                                # Tìm URL với nhiều cách hơn
-                                url = ""
-                                url_elem = result.select_one('a[href]')
-                                if url_elem:
-                                    url = url_elem.get('href', '')
+        seen_urls = set()
 
-                                # Xử lý URL Google redirect
-                                if url.startswith('/url?q='):
-                                    url = urllib.parse.unquote(url.split('/url?q=')[1].split('&')[0])
-                                elif url.startswith('http://www.google.com/url?q='):
-                                    url = urllib.parse.unquote(url.split('http://www.google.com/url?q=')[1].split('&')[0])
+        for i, query in enumerate(search_queries[:4]):  # Tăng lên 4 queries
+            try:
+                # Rotate User-Agent
+                headers = {
+                    **settings.SEARCH_ENGINE_HEADERS,
+                    'User-Agent': user_agents[i % len(user_agents)],
+                    'Sec-Fetch-Dest': 'document',
+                    'Sec-Fetch-Mode': 'navigate',
+                    'Sec-Fetch-Site': 'none',
+                    'Sec-Fetch-User': '?1'
+                }
 
-                                # Kiểm tra URL hợp lệ
-                                if not title or not url or not url.startswith('http'):
-                                    continue
+                # Tạo URL Google search với parameters mới
+                encoded_query = urllib.parse.quote_plus(query)
+                google_url = f"https://www.google.com/search?q={encoded_query}&num=15&hl=vi&safe=off&filter=0"
 
-                                # Bỏ qua các URL không liên quan (mở rộng danh sách)
-                                skip_domains = [
-                                    'google.com', 'youtube.com', 'facebook.com', 'ads',
-                                    'javascript:', 'policies.google.com', 'support.google.com',
-                                    'accounts.google.com', 'mail.google.com', 'drive.google.com'
-                                ]
-                                if any(skip in url.lower() for skip in skip_domains):
-                                    continue
+                logger.debug("Google query %d: %s", i + 1, query)
+                response = self.http.get(google_url, headers=headers, timeout=30)
 
-                                if url in seen_urls:
-                                    continue
+                if response.status_code == 200:
+                    # Kiểm tra xem có bị chặn không
+                    if "Our systems have detected unusual traffic" in response.text:
+                        logger.warning("Google chặn vì unusual traffic - tạm dừng gửi tới Google")
+                        self.http.rate_limiter.backoff(google_url)
+                        continue
+                    elif "429" in response.text or "rate limit" in response.text.lower():
+                        logger.warning("Google giới hạn tốc độ - tạm dừng gửi tới Google")
+                        self.http.rate_limiter.backoff(google_url)
+                        continue
 
-                                seen_urls.add(url)
+                    soup = parse_html(response.content)
+
+                    # Thử nhiều selectors mới nhất 2024-2025
+                    selectors = [
+                        'div[data-ved]', 'div.tF2Cxc', 'div.MjjYud', 'div.yuRUbf',
+                        'div.kCrYT', 'div.g', 'div[data-hveid]', 'div[data-ctid]',
+                        'div.egMi0', 'div.Gx5Zad', 'div.IsZvec',
+                        # Mobile selectors
+                        'div[data-snf]', 'div[data-ved] div', 'div.tF2Cxc div',
+                        'div.MjjYud div', 'div.yuRUbf div', 'div.kCrYT div',
+                        # Alternative patterns
+                        '.srg .g', '.srg div[data-ved]', '.srg .tF2Cxc',
+                        '.srg .MjjYud', '.srg .yuRUbf', '.srg .kCrYT',
+                        # New 2024 patterns
+                        'div.N54PNb', 'div.kb0PBd', 'div.Ww4FFb', 'div.cfSxFb'
+                    ]
+
+                    search_results = []
+                    for selector in selectors:
+                        search_results = soup.select(selector)
+                        if search_results:
+                            logger.debug("Selector '%s' tìm thấy %d kết quả Google", selector, len(search_results))
+                            break
 
-                                # Tìm snippet/description với nhiều selectors hơn
-                                content = ""
-                                content_selectors = [
-                                    'span.aCOpRe', 'div.VwiC3b', 'div.MUxGbd', 'div[data-ved] span',
-                                    'div.tF2Cxc span', 'div.MjjYud span', '.aCOpRe', '.VwiC3b'
-                                ]
-                                for content_sel in content_selectors:
-                                    content_elem = result.select_one(content_sel)
-                                    if content_elem:
-                                        content = content_elem.get_text().strip()
-                                        if len(content) > 10:
-                                            break
-
-                                # Tính điểm liên quan (giảm ngưỡng hơn nữa)
-                                relevance_score = self.calculate_relevance_score(title, url, topic, self.extract_keywords(topic))
-
-                                # Ngưỡng rất thấp để có nhiều kết quả
-                                if relevance_score >= 1.0:
-                                    # Lấy nội dung bài viết nếu có thể
-                                    article_content = self.get_article_content(url)
-                                    if not article_content:
-                                        article_content = content
-
-                                    article = {
-                                        'title': title,
-                                        'url': url,
-                                        'content': article_content,
-                                        'source': url.split('/')[2] if '/' in url else 'web',
-                                        'relevance_score': relevance_score,
-                                        'search_type': 'web_general'
-                                    }
-                                    articles.append(article)
-                                    results_found += 1
-                                    print(f"[WEB] ✅ Thêm bài viết: {title[:50]}... (điểm: {relevance_score:.1f})")
+                    results_found = 0
+                    for result in search_results[:15]:  # Tăng lên 15 kết quả
+                        if len(articles) >= 8:  # Giới hạn 8 bài
+                            break
 
-                            except Exception as e:
+                        try:
+                            # Tìm title với nhiều cách hơn
+                            title = ""
+                            title_selectors = ['h2', 'a', '.b_title', '.title']
+                            for title_sel in title_selectors:
+                                title_elem = result.select_one(title_sel)
+                                if title_elem:
+                                    title = title_elem.get_text().strip()
+                                    if len(title) > 5:
+                                        break
+
+                            # Tìm URL với nhiều cách hơn
+                            url = ""
+                            url_elem = result.select_one('a[href]')
+                            if url_elem:
+                                url = url_elem.get('href', '')
+
+                            # Xử lý URL Google redirect
+                            if url.startswith('/url?q='):
+                                url = urllib.parse.unquote(url.split('/url?q=')[1].split('&')[0])
+                            elif url.startswith('http://www.google.com/url?q='):
+                                url = urllib.parse.unquote(url.split('http://www.google.com/url?q=')[1].split('&')[0])
+                            url = canonical_url(url)
+
+                            # Kiểm tra URL hợp lệ
+                            if not title or not url or not url.startswith('http'):
                                 continue
 
-                        print(f"[WEB] Query {i+1} tìm thấy {results_found} bài viết")
-
-                    else:
-                        print(f"[WEB] HTTP Error {response.status_code}")
-                        if response.status_code == 429:
-                            print("[WEB] Rate limited - đợi 15 giây")
-                            time.sleep(15)
-
-                    # Thêm delay giữa các requests để tránh bị chặn
-                    time.sleep(2)
+                            # Bỏ qua các URL không liên quan (mở rộng danh sách)
+                            skip_domains = [
+                                'google.com', 'youtube.com', 'facebook.com', 'ads',
+                                'javascript:', 'policies.google.com', 'support.google.com',
+                                'accounts.google.com', 'mail.google.com', 'drive.google.com'
+                            ]
+                            if any(skip in url.lower() for skip in skip_domains):
+                                continue
 
-                except Exception as e:
-                    print(f"[WEB] Lỗi khi tìm kiếm query '{query}': {e}")
-                    continue
+                            if url in seen_urls:
+                                continue
 
-            # Thử tìm kiếm từ Bing nếu Google không hoạt động
-            if len(articles) < 3:
-                print("[WEB] 🔄 Thử tìm kiếm từ Bing...")
-                bing_articles = self.search_via_bing(topic)
-                if bing_articles:
-                    # Lọc trùng lặp
-                    for article in bing_articles:
-                        if article.get('url', '') not in seen_urls:
-                            articles.append(article)
-                            seen_urls.add(article.get('url', ''))
-
-            # Thử tìm kiếm từ DuckDuckGo nếu vẫn chưa đủ
-            if len(articles) < 3:
-                print("[WEB] 🔄 Thử tìm kiếm từ DuckDuckGo...")
-                ddg_articles = self.search_via_duckduckgo(topic)
-                if ddg_articles:
-                    # Lọc trùng lặp
-                    for article in ddg_articles:
-                        if article.get('url', '') not in seen_urls:
-                            articles.append(article)
-                            seen_urls.add(article.get('url', ''))
+                            seen_urls.add(url)
+
+                            # Tìm snippet/description với nhiều selectors hơn
+                            content = ""
+                            content_selectors = [
+                                'span.aCOpRe', 'div.VwiC3b', 'div.MUxGbd', 'div[data-ved] span',
+                                'div.tF2Cxc span', 'div.MjjYud span', '.aCOpRe', '.VwiC3b'
+                            ]
+                            for content_sel in content_selectors:
+                                content_elem = result.select_one(content_sel)
+                                if content_elem:
+                                    content = content_elem.get_text().strip()
+                                    if len(content) > 10:
+                                        break
+
+                            # Tính điểm liên quan (giảm ngưỡng hơn nữa)
+                            relevance_score = self.calculate_relevance_score(title, url, plan)
+
+                            if relevance_score:
+                                # Lấy nội dung bài viết nếu có thể
+                                article_content = self.get_article_content(url)
+                                if not article_content:
+                                    article_content = content
+
+                                article = {
+                                    'title': title,
+                                    'url': url,
+                                    'content': article_content,
+                                    'source': url.split('/')[2] if '/' in url else 'web',
+                                    'relevance_score': relevance_score,
+                                    'search_type': 'web_general'
+                                }
+                                articles.append(article)
+                                results_found += 1
+                                logger.debug("Thêm bài viết web (điểm %.1f): %s", relevance_score, title[:50])
+
+                        except Exception as e:
+                            logger.debug("Lỗi xử lý kết quả tìm kiếm web: %s", e)
+                            continue
 
-            # Sắp xếp theo điểm liên quan
-            articles = sorted(articles, key=lambda x: x.get('relevance_score', 0), reverse=True)
+                    logger.debug("Google query %d tìm thấy %d bài viết", i + 1, results_found)
 
-            if articles:
-                print(f"✅ Tìm thấy {len(articles)} bài viết liên quan từ web tổng quát")
+                else:
+                    # Mã lỗi đã được HttpClient đếm; 429 được rate limiter ghi nhận nên các request sau tự chờ
+                    logger.debug("Google trả HTTP %d cho query %d", response.status_code, i + 1)
 
-            return articles[:6]  # Trả về tối đa 6 bài
+            except Exception as e:
+                logger.debug("Lỗi query '%s': %s", query, e)
+                continue
+
+        # Thử tìm kiếm từ Bing nếu Google không hoạt động
+        if len(articles) < 3:
+            logger.debug("Chưa đủ bài từ Google - thử Bing")
+            bing_articles = self.search_via_bing(topic)
+            if bing_articles:
+                # Lọc trùng lặp
+                for article in bing_articles:
+                    if article.get('url', '') not in seen_urls:
+                        articles.append(article)
+                        seen_urls.add(article.get('url', ''))
+
+        # Thử tìm kiếm từ DuckDuckGo nếu vẫn chưa đủ
+        if len(articles) < 3:
+            logger.debug("Chưa đủ bài - thử DuckDuckGo")
+            ddg_articles = self.search_via_duckduckgo(topic)
+            if ddg_articles:
+                # Lọc trùng lặp
+                for article in ddg_articles:
+                    if article.get('url', '') not in seen_urls:
+                        articles.append(article)
+                        seen_urls.add(article.get('url', ''))
+
+        # Sắp xếp theo điểm liên quan
+        articles = sorted(articles, key=lambda x: x.get('relevance_score', 0), reverse=True)
+
+        if articles:
+            logger.info("Tìm thấy %d bài viết liên quan từ web tổng quát", len(articles))
+
+        return articles[:6]  # Trả về tối đa 6 bài
 
+    def search_via_bing(self, topic):
+        """Tìm kiếm trên Bing như phương pháp backup khi Google bị chặn"""
+        try:
+            return self.run_search_tier('bing', self.bing_articles, topic)
         except Exception as e:
-            print(f"❌ Lỗi tìm kiếm web tổng quát: {e}")
+            logger.warning("Lỗi tìm kiếm Bing: %s", e)
             return []
 
-    def search_via_bing(self, topic):
-        """Tìm kiếm trên Bing như phương pháp backup khi Google bị chặn"""
+    def bing_articles(self, topic):
+        """Bài viết từ trang kết quả Bing (gọi qua search_via_bing)"""
+        plan = self.build_query_plan(topic)
+        topic = plan.topic
         articles = []
-        try:
-            print(f"🔍 Đang tìm kiếm '{topic}' trên Bing...")
-
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                'Accept-Language': 'vi-VN,vi;q=0.8,en-US;q=0.5,en;q=0.3',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'DNT': '1',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            }
+        logger.info("Đang tìm kiếm '%s' trên Bing", topic)
 
-            # Query cho Bing
-            query = f'"{topic}" tin tức'
-            encoded_query = urllib.parse.quote_plus(query)
-            bing_url = f"https://www.bing.com/search?q={encoded_query}&count=15&setlang=vi"
+        # Query cho Bing
+        query = f'"{topic}" tin tức'
+        encoded_query = urllib.parse.quote_plus(query)
+        bing_url = f"https://www.bing.com/search?q={encoded_query}&count=15&setlang=vi"
 
-            response = requests.get(bing_url, headers=headers, timeout=20)
+        response = self.http.get(bing_url, headers=settings.SEARCH_ENGINE_HEADERS, timeout=20)
 
-            if response.status_code == 200:
-                soup = BeautifulSoup(response.content, 'html.parser')
-
-                # Selectors cho Bing search results
-                selectors = [
-                    '.b_algo', '.b_algo h2', '.b_algo .b_title',
-                    'li.b_algo', 'li.b_algo h2', 'li.b_algo .b_title',
-                    '.result', '.result h2', '.result .title'
-                ]
-
-                search_results = []
-                for selector in selectors:
-                    search_results = soup.select(selector)
-                    if search_results:
-                        print(f"[BING] ✅ Selector '{selector}' tìm thấy {len(search_results)} kết quả")
-                        break
+        if response.status_code == 200:
+            soup = parse_html(response.content)
 
-                print(f"[BING] Tổng số kết quả tiềm năng: {len(search_results)}")
+            # Selectors cho Bing search results
+            selectors = [
+                '.b_algo', '.b_algo h2', '.b_algo .b_title',
+                'li.b_algo', 'li.b_algo h2', 'li.b_algo .b_title',
+                '.result', '.result h2', '.result .title'
+            ]
 
-                results_found = 0
-                for result in search_results[:10]:
-                    if len(articles) >= 5:
-                        break
+            search_results = []
+            for selector in selectors:
+                search_results = soup.select(selector)
+                if search_results:
+                    logger.debug("Selector '%s' tìm thấy %d kết quả Bing", selector, len(search_results))
+                    break
 
-                    try:
-                        # Tìm title
-                        title = ""
-                        title_selectors = ['h2', 'a', '.b_title', '.title']
-                        for title_sel in title_selectors:
-                            title_elem = result.select_one(title_sel)
-                            if title_elem:
-                                title = title_elem.get_text().strip()
-                                if len(title) > 5:
-                                    break
+            results_found = 0
+            for result in search_results[:10]:
+                if len(articles) >= 5:
+                    break
 
-                        # Tìm URL
-                        url = ""
-                        url_elem = result.select_one('a[href]')
-                        if url_elem:
-                            url = url_elem.get('href', '')
+                try:
+                    # Tìm title
+                    title = ""
+                    title_selectors = ['h2', 'a', '.b_title', '.title']
+                    for title_sel in title_selectors:
+                        title_elem = result.select_one(title_sel)
+                        if title_elem:
+                            title = title_elem.get_text().strip()
+                            if len(title) > 5:
+                                break
 
-                        # Validate dữ liệu
-                        if not title or not url or not url.startswith('http'):
-                            continue
+                    # Tìm URL
+                    url = ""
+                    url_elem = result.select_one('a[href]')
+                    if url_elem:
+                        url = canonical_url(url_elem.get('href', ''))
 
-                        # Bỏ qua các URL không liên quan
-                        skip_domains = ['bing.com', 'microsoft.com', 'youtube.com', 'facebook.com']
-                        if any(skip in url.lower() for skip in skip_domains):
-                            continue
+                    # Validate dữ liệu
+                    if not title or not url or not url.startswith('http'):
+                        continue
 
-                        # Tìm snippet
-                        content = ""
-                        content_selectors = ['.b_caption p', '.b_snippet', 'p', '.snippet']
-                        for content_sel in content_selectors:
-                            content_elem = result.select_one(content_sel)
-                            if content_elem:
-                                content = content_elem.get_text().strip()
-                                if len(content) > 10:
-                                    break
+                    # Bỏ qua các URL không liên quan
+                    skip_domains = ['bing.com', 'microsoft.com', 'youtube.com', 'facebook.com']
+                    if any(skip in url.lower() for skip in skip_domains):
+                        continue
 
-                        # Tính điểm liên quan
-                        relevance_score = self.calculate_relevance_score(title, url, topic, self.extract_keywords(topic))
-
-                        if relevance_score >= 1.5:  # Ngưỡng thấp hơn cho Bing
-                            article = {
-                                'title': title,
-                                'url': url,
-                                'content': content,
-                                'source': url.split('/')[2] if '/' in url else 'bing',
-                                'relevance_score': relevance_score,
-                                'search_type': 'bing'
-                            }
-                            articles.append(article)
-                            results_found += 1
-                            print(f"[BING] ✅ Thêm bài viết: {title[:50]}... (điểm: {relevance_score:.1f})")
+                    # Tìm snippet
+                    content = ""
+                    content_selectors = ['.b_caption p', '.b_snippet', 'p', '.snippet']
+                    for content_sel in content_selectors:
+                        content_elem = result.select_one(content_sel)
+                        if content_elem:
+                            content = content_elem.get_text().strip()
+                            if len(content) > 10:
+                                break
 
-                    except Exception as e:
-                        continue
+                    # Tính điểm liên quan
+                    relevance_score = self.calculate_relevance_score(title, url, plan)
+
+                    if relevance_score:
+                        article = {
+                            'title': title,
+                            'url': url,
+                            'content': content,
+                            'source': url.split('/')[2] if '/' in url else 'bing',
+                            'relevance_score': relevance_score,
+                            'search_type': 'bing'
+                        }
+                        articles.append(article)
+                        results_found += 1
+                        logger.debug("Thêm bài viết Bing (điểm %.1f): %s", relevance_score, title[:50])
 
-                print(f"[BING] Tìm thấy {results_found} bài viết")
+                except Exception as e:
+                    logger.debug("Lỗi xử lý kết quả Bing: %s", e)
+                    continue
 
-            else:
-                print(f"[BING] HTTP Error {response.status_code}")
+            logger.debug("Bing tìm thấy %d bài viết", results_found)
 
-            return articles
+        else:
+            logger.debug("Bing trả HTTP %d", response.status_code)
 
-        except Exception as e:
-            print(f"❌ Lỗi tìm kiếm Bing: {e}")
-            return []
\ No newline at end of file
+        return articles
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""Gộp bài trùng giữa các tầng tìm kiếm: cùng URL sau chuẩn hoá hoặc nội dung gần trùng (SimHash)"""
+import hashlib
+import re
+from functools import lru_cache
+
+from chatbot_1thegioi import settings
+from chatbot_1thegioi.urls import canonical_url
+
+WORD_RE = re.compile(r'\w+')
+
+# Dấu vân tay 64 bit chia 4 dải 16 bit: hai bản lệch <= 3 bit chắc chắn trùng ít nhất một dải
+BITS = 64
+BANDS = 4
+BAND_BITS = BITS // BANDS
+BAND_MASK = (1 << BAND_BITS) - 1
+
+# Văn bản ngắn hơn thì không đủ tin cậy để so gần trùng
+MIN_WORDS = 30
+# Chỉ lấy phần đầu bài - bản đăng lại thường giống nhau ngay từ đoạn mở đầu
+MAX_WORDS = 600
+
+
+def _hash64(text):
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+@lru_cache(maxsize=2048)
+def simhash(text):
+    """SimHash 64 bit trên cụm 3 từ liên tiếp; None nếu văn bản quá ngắn"""
+    words = WORD_RE.findall((text or '').lower())[:MAX_WORDS]
+    if len(words) < MIN_WORDS:
+        return None
+
+    weights = [0] * BITS
+    for i in range(len(words) - 2):
+        value = _hash64(' '.join(words[i:i + 3]))
+        for bit in range(BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+class SimHashIndex:
+    """Tra dấu vân tay gần trùng (khoảng cách Hamming <= threshold) qua các dải bit, không so từng cặp"""
+
+    def __init__(self, threshold=None):
+        self.threshold = settings.SIMHASH_THRESHOLD if threshold is None else threshold
+        self._bands = {}
+
+    def find(self, fingerprint):
+        """Giá trị gắn với dấu vân tay gần trùng đã thêm trước đó, hoặc None"""
+        for band in range(BANDS):
+            key = (band, fingerprint >> (band * BAND_BITS) & BAND_MASK)
+            for other, value in self._bands.get(key, ()):
+                if hamming(fingerprint, other) <= self.threshold:
+                    return value
+        return None
+
+    def add(self, fingerprint, value):
+        for band in range(BANDS):
+            key = (band, fingerprint >> (band * BAND_BITS) & BAND_MASK)
+            self._bands.setdefault(key, []).append((fingerprint, value))
+
+
+def unique_articles(articles, threshold=None):
+    """Giữ một bản cho mỗi bài: trùng URL chuẩn hoá hoặc nội dung gần trùng thì giữ bản điểm cao hơn.
+
+    Thứ tự xuất hiện đầu tiên được giữ nguyên; trả về (danh sách bài, số bản trùng đã bỏ).
+    """
+    kept = []
+    slots = {}
+    index = SimHashIndex(threshold)
+    for article in articles:
+        url = canonical_url(article.get('url', ''))
+        fingerprint = simhash(article.get('content') or '')
+
+        # URL rỗng (tương đối, không chuẩn hoá được) không dùng làm khoá so trùng
+        slot = slots.get(url) if url else None
+        if slot is None and fingerprint is not None:
+            slot = index.find(fingerprint)
+
+        if slot is None:
+            slot = len(kept)
+            kept.append(article)
+        elif article.get('relevance_score', 0) > kept[slot].get('relevance_score', 0):
+            kept[slot] = article
+
+        if url:
+            slots[url] = slot
+        if fingerprint is not None:
+            index.add(fingerprint, slot)
+    return kept, len(articles) - len(kept)
@@ -0,0 +1,238 @@
+"""Google Custom Search JSON API qua HttpClient dùng chung: cache kết quả theo truy vấn (SQLite) và đếm hạn mức mỗi ngày"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+
+from chatbot_1thegioi import settings
+from chatbot_1thegioi.metrics import metrics
+
+CSE_ENDPOINT = 'https://www.googleapis.com/customsearch/v1'
+
+# Hạn mức của Google được tính lại lúc nửa đêm giờ Thái Bình Dương
+try:
+    from zoneinfo import ZoneInfo
+
+    QUOTA_TIMEZONE = ZoneInfo('America/Los_Angeles')
+except Exception:
+    QUOTA_TIMEZONE = timezone.utc
+
+
+def quota_day(now=None):
+    """Ngày tính hạn mức (YYYY-MM-DD theo giờ Thái Bình Dương)"""
+    return datetime.fromtimestamp(time.time() if now is None else now, QUOTA_TIMEZONE).strftime('%Y-%m-%d')
+
+
+def query_key(query, params):
+    """Khoá cache: truy vấn đã chuẩn hoá khoảng trắng/chữ hoa cùng các tham số ảnh hưởng kết quả"""
+    material = dict(params, q=' '.join(query.lower().split()))
+    return json.dumps(material, ensure_ascii=False, sort_keys=True)
+
+
+class QuotaExhausted(Exception):
+    """Đã dùng hết hạn mức trong ngày (trừ phần chừa lại) - chuyển sang các tầng tìm kiếm khác"""
+
+
+class CustomSearchStore:
+    """Cache kết quả truy vấn có thời gian sống và số lượt API đã dùng theo ngày (SQLite)"""
+
+    def __init__(self, path=None, ttl=None, max_entries=None):
+        self.path = path or os.path.join(settings.CACHE_DIR, 'cse.sqlite3')
+        self.ttl = settings.GOOGLE_CSE_CACHE_TTL if ttl is None else ttl
+        self.max_entries = settings.GOOGLE_CSE_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS queries (
+                key TEXT PRIMARY KEY,
+                items TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_queries_expires ON queries (expires_at);
+            CREATE TABLE IF NOT EXISTS quota (
+                day TEXT PRIMARY KEY,
+                used INTEGER NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    def get(self, key):
+        """Danh sách item còn hạn cho key, hoặc None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT items FROM queries WHERE key = ? AND expires_at > ?", (key, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key, items):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO queries (key, items, created_at, expires_at) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(items, ensure_ascii=False), now, now + self.ttl)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def _evict(self, now):
+        """Xoá bản hết hạn, rồi bản cũ nhất khi vượt max_entries (gọi khi đang giữ lock)"""
+        self._conn.execute("DELETE FROM queries WHERE expires_at <= ?", (now,))
+        if not self.max_entries:
+            return
+        count = self._conn.execute("SELECT COUNT(*) FROM queries").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM queries WHERE key IN (SELECT key FROM queries ORDER BY created_at ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def used(self, day):
+        with self._lock:
+            row = self._conn.execute("SELECT used FROM quota WHERE day = ?", (day,)).fetchone()
+        return row[0] if row else 0
+
+    def reserve(self, day, limit):
+        """Ghi nhận một lượt gọi API nếu chưa chạm `limit` lượt trong ngày; trả về False nếu đã chạm"""
+        with self._lock:
+            row = self._conn.execute("SELECT used FROM quota WHERE day = ?", (day,)).fetchone()
+            used = row[0] if row else 0
+            if used >= limit:
+                return False
+            self._conn.execute(
+                "INSERT INTO quota (day, used) VALUES (?, 1) ON CONFLICT(day) DO UPDATE SET used = used + 1", (day,)
+            )
+            # Chỉ giữ lịch sử vài ngày gần đây
+            self._conn.execute("DELETE FROM quota WHERE day < date(?, '-7 day')", (day,))
+            self._conn.commit()
+        return True
+
+    def exhaust(self, day, quota):
+        """Đánh dấu đã hết hạn mức trong ngày (Google báo vượt hạn mức sớm hơn số đếm cục bộ)"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO quota (day, used) VALUES (?, ?) ON CONFLICT(day) DO UPDATE SET used = MAX(used, ?)",
+                (day, quota, quota)
+            )
+            self._conn.commit()
+
+    def purge(self):
+        """Xoá toàn bộ kết quả đã lưu (giữ số lượt đã dùng), trả về số truy vấn đã xoá"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM queries")
+            self._conn.commit()
+        return cursor.rowcount
+
+    def stats(self):
+        now = time.time()
+        with self._lock:
+            entries, fresh = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(expires_at > ?), 0) FROM queries", (now,)
+            ).fetchone()
+        return {'path': self.path, 'entries': entries, 'fresh': fresh, 'ttl': self.ttl}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CustomSearchClient:
+    """Client Custom Search dùng suốt phiên: gọi thẳng endpoint JSON (không cần discovery document).
+
+    Request đi qua HttpClient nên dùng chung pool keep-alive, rate limiter và metric. Kết quả được
+    cache theo truy vấn; khi số lượt dùng trong ngày chạm `daily_quota - reserve`, client từ chối gọi
+    (QuotaExhausted) để crew chuyển sang các tầng tìm kiếm khác thay vì nhận lỗi 429 từ Google.
+    """
+
+    def __init__(self, http, api_key, cx, store=None, daily_quota=None, reserve=None):
+        self.http = http
+        self.api_key = api_key
+        self.cx = cx
+        self.store = store
+        self.daily_quota = settings.GOOGLE_CSE_DAILY_QUOTA if daily_quota is None else daily_quota
+        self.reserve = settings.GOOGLE_CSE_QUOTA_RESERVE if reserve is None else reserve
+
+        # Không mở được cache trên đĩa thì đếm hạn mức trong bộ nhớ
+        self._lock = threading.Lock()
+        self._used = {}
+
+    @property
+    def limit(self):
+        return max(0, self.daily_quota - self.reserve)
+
+    def used_today(self):
+        day = quota_day()
+        if self.store is not None:
+            return self.store.used(day)
+        with self._lock:
+            return self._used.get(day, 0)
+
+    def available(self):
+        """Còn lượt gọi API trong ngày (tính cả phần chừa lại)"""
+        return self.used_today() < self.limit
+
+    def _reserve(self):
+        day = quota_day()
+        if self.store is not None:
+            return self.store.reserve(day, self.limit)
+        with self._lock:
+            if self._used.get(day, 0) >= self.limit:
+                return False
+            self._used[day] = self._used.get(day, 0) + 1
+            return True
+
+    def _exhaust(self):
+        day = quota_day()
+        if self.store is not None:
+            self.store.exhaust(day, self.daily_quota)
+        else:
+            with self._lock:
+                self._used[day] = max(self._used.get(day, 0), self.daily_quota)
+
+    def search(self, query, start=1, **params):
+        """Danh sách item (link, title, snippet...) cho truy vấn; lấy từ cache nếu còn hạn"""
+        params = dict(params, cx=self.cx, start=start)
+        key = query_key(query, params)
+        if self.store is not None:
+            items = self.store.get(key)
+            if items is not None:
+                metrics.inc('chatbot_cache_requests_total', cache='cse', result='hit')
+                return items
+            metrics.inc('chatbot_cache_requests_total', cache='cse', result='miss')
+
+        if not self._reserve():
+            metrics.inc('chatbot_cse_requests_total', result='quota')
+            raise QuotaExhausted(f"Đã dùng {self.used_today()}/{self.daily_quota} lượt Custom Search hôm nay")
+
+        # Khoá API đi trong header thay vì query string để không lộ qua URL trong thông báo lỗi và log
+        response = self.http.get(CSE_ENDPOINT, params=dict(params, q=query),
+                                 headers={'X-Goog-Api-Key': self.api_key}, timeout=10)
+        if response.status_code in (403, 429) and self.quota_error(response):
+            self._exhaust()
+            metrics.inc('chatbot_cse_requests_total', result='quota')
+            raise QuotaExhausted("Google báo đã hết hạn mức Custom Search hôm nay")
+        metrics.inc('chatbot_cse_requests_total', result='ok' if response.ok else 'error')
+        response.raise_for_status()
+
+        items = response.json().get('items', [])
+        if self.store is not None:
+            self.store.put(key, items)
+        return items
+
+    @staticmethod
+    def quota_error(response):
+        """Lỗi do hết hạn mức theo ngày (khác lỗi vượt tốc độ tạm thời mà rate limiter đã xử lý)"""
+        try:
+            error = response.json().get('error', {})
+        except ValueError:
+            return False
+        reasons = {detail.get('reason') for detail in error.get('errors', []) if isinstance(detail, dict)}
+        # Ví dụ: "Quota exceeded for quota metric 'Queries' and limit 'Queries per day' ..."
+        return 'dailyLimitExceeded' in reasons or 'per day' in str(error.get('message', '')).lower()
+
+    def stats(self):
+        return {'used': self.used_today(), 'daily_quota': self.daily_quota, 'reserve': self.reserve}
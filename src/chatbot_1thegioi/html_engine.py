@@ -0,0 +1,110 @@
+"""Lớp phân tích HTML dùng chung: chọn engine (selectolax/lexbor, lxml, html.parser) theo cấu hình lúc khởi động.
+
+Mọi engine trả về cây có cùng giao diện con của BeautifulSoup mà crew.py dùng:
+select, select_one, find, find_all, get, [attr], get_text, text và name.
+"""
+import importlib.util
+
+from chatbot_1thegioi import settings
+
+ENGINES = ('selectolax', 'lxml', 'html.parser')
+
+
+def _css(name, href=False):
+    """Đổi tham số find/find_all kiểu BeautifulSoup thành CSS selector"""
+    names = [name] if isinstance(name, str) else list(name)
+    suffix = '[href]' if href else ''
+    return ', '.join(f'{tag}{suffix}' for tag in names)
+
+
+class LexborNode:
+    """Bọc node selectolax (lexbor) theo giao diện Tag của BeautifulSoup"""
+
+    __slots__ = ('_node',)
+
+    def __init__(self, node):
+        self._node = node
+
+    @property
+    def name(self):
+        return self._node.tag
+
+    def get(self, attribute, default=None):
+        value = self._node.attributes.get(attribute)
+        return default if value is None else value
+
+    def __getitem__(self, attribute):
+        value = self.get(attribute)
+        if value is None:
+            raise KeyError(attribute)
+        return value
+
+    def get_text(self, separator='', strip=False):
+        return self._node.text(deep=True, separator=separator, strip=strip)
+
+    @property
+    def text(self):
+        return self.get_text()
+
+    def select(self, selector):
+        return [LexborNode(node) for node in self._node.css(selector)]
+
+    def select_one(self, selector):
+        node = self._node.css_first(selector)
+        return LexborNode(node) if node is not None else None
+
+    def find(self, name, href=False):
+        return self.select_one(_css(name, href))
+
+    def find_all(self, name, href=False):
+        return self.select(_css(name, href))
+
+
+def _available(engine):
+    if engine == 'html.parser':
+        return True
+    return importlib.util.find_spec(engine) is not None
+
+
+def resolve_engine(name=None):
+    """Engine thực dùng: engine được cấu hình nếu đã cài, 'auto' lấy engine nhanh nhất có sẵn"""
+    name = (name or settings.HTML_PARSER).strip().lower()
+    if name in ENGINES and _available(name):
+        return name
+    if name == 'auto':
+        for engine in ENGINES:
+            if _available(engine):
+                return engine
+    # Engine không hợp lệ hoặc chưa cài - dùng parser thuần Python
+    return 'html.parser'
+
+
+# Engine chọn một lần lúc khởi động
+ENGINE = resolve_engine()
+
+
+def parse_html(markup, engine=None):
+    """Phân tích HTML (str hoặc bytes) bằng engine đã chọn"""
+    engine = engine or ENGINE
+    if engine == 'selectolax':
+        from selectolax.lexbor import LexborHTMLParser
+
+        if isinstance(markup, bytes):
+            markup = markup.decode('utf-8', errors='replace')
+        root = LexborHTMLParser(markup or '<html></html>').root
+        return LexborNode(root if root is not None else LexborHTMLParser('<html></html>').root)
+
+    # bs4 nạp khi phân tích trang đầu tiên, không làm chậm lúc khởi động
+    from bs4 import BeautifulSoup
+
+    return BeautifulSoup(markup, engine)
+
+
+def parse_xml(markup):
+    """Phân tích XML (sitemap/RSS lỗi cú pháp) bằng BeautifulSoup; thiếu lxml thì đọc như HTML"""
+    from bs4 import BeautifulSoup, FeatureNotFound
+
+    try:
+        return BeautifulSoup(markup, 'xml')
+    except FeatureNotFound:
+        return BeautifulSoup(markup, 'html.parser')
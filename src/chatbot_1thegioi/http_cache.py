@@ -0,0 +1,183 @@
+"""HTTP cache có revalidate (ETag / Last-Modified / Cache-Control) cho trang chuyên mục và sitemap"""
+import email.utils
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from chatbot_1thegioi import settings
+
+# Header không còn đúng với body đã giải nén nên không lưu lại
+_DROPPED_HEADERS = {'content-encoding', 'content-length', 'transfer-encoding', 'connection'}
+
+
+def parse_cache_control(value):
+    """Tách header Cache-Control thành dict directive -> giá trị (hoặc True)"""
+    directives = {}
+    for part in (value or '').split(','):
+        part = part.strip().lower()
+        if not part:
+            continue
+        if '=' in part:
+            name, _, arg = part.partition('=')
+            directives[name.strip()] = arg.strip().strip('"')
+        else:
+            directives[part] = True
+    return directives
+
+
+def freshness_lifetime(headers, default_ttl):
+    """Số giây response còn tươi theo Cache-Control/Expires; None nếu không được lưu"""
+    directives = parse_cache_control(headers.get('Cache-Control'))
+    if 'no-store' in directives:
+        return None
+    if 'no-cache' in directives:
+        return 0
+
+    for name in ('s-maxage', 'max-age'):
+        if name in directives:
+            try:
+                return max(0, int(directives[name]))
+            except (TypeError, ValueError):
+                break
+
+    expires = headers.get('Expires')
+    if expires:
+        try:
+            expires_at = email.utils.parsedate_to_datetime(expires).timestamp()
+            return max(0, int(expires_at - time.time()))
+        except (TypeError, ValueError):
+            return 0
+
+    return default_ttl
+
+
+class CachedEntry:
+    """Một response đã lưu: body, header và thời điểm hết hạn"""
+
+    def __init__(self, url, status_code, headers, body, expires_at):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.body = body
+        self.expires_at = expires_at
+
+    @property
+    def is_fresh(self):
+        return time.time() < self.expires_at
+
+    def validators(self):
+        """Header điều kiện để hỏi server xem bản lưu còn dùng được không"""
+        conditional = {}
+        if self.headers.get('ETag'):
+            conditional['If-None-Match'] = self.headers['ETag']
+        if self.headers.get('Last-Modified'):
+            conditional['If-Modified-Since'] = self.headers['Last-Modified']
+        return conditional
+
+    def to_response(self):
+        """Dựng lại requests.Response từ bản lưu để code gọi không phải đổi"""
+        response = requests.models.Response()
+        response.status_code = self.status_code
+        response.url = self.url
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.body
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.from_cache = True
+        return response
+
+
+class HttpCache:
+    """Lưu response GET kèm validator trên đĩa (SQLite), dùng chung giữa các phiên"""
+
+    def __init__(self, path=None, default_ttl=None):
+        self.path = path or os.path.join(settings.CACHE_DIR, 'http.sqlite3')
+        self.default_ttl = settings.HTTP_CACHE_DEFAULT_TTL if default_ttl is None else default_ttl
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status_code INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                stored_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    def lookup(self, url):
+        """Lấy bản lưu của url (kể cả đã cũ, để revalidate), hoặc None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status_code, headers, body, expires_at FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        status_code, headers, body, expires_at = row
+        return CachedEntry(url, status_code, json.loads(headers), body, expires_at)
+
+    def store(self, url, response):
+        """Lưu response 200 nếu được phép cache; trả về CachedEntry hoặc None"""
+        lifetime = freshness_lifetime(response.headers, self.default_ttl)
+        if lifetime is None:
+            self.delete(url)
+            return None
+
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS}
+        now = time.time()
+        entry = CachedEntry(url, response.status_code, headers, response.content, now + lifetime)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (url, status_code, headers, body, stored_at, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, entry.status_code, json.dumps(headers), entry.body, now, entry.expires_at)
+            )
+            self._conn.commit()
+        return entry
+
+    def refresh(self, entry, not_modified):
+        """Server trả 304: cập nhật header mới và gia hạn bản lưu"""
+        for name, value in not_modified.headers.items():
+            if name.lower() not in _DROPPED_HEADERS:
+                entry.headers[name] = value
+
+        lifetime = freshness_lifetime(entry.headers, self.default_ttl)
+        entry.expires_at = time.time() + (lifetime or 0)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET headers = ?, expires_at = ? WHERE url = ?",
+                (json.dumps(dict(entry.headers)), entry.expires_at, entry.url)
+            )
+            self._conn.commit()
+        return entry
+
+    def delete(self, url):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self._conn.commit()
+
+    def purge(self):
+        """Xoá toàn bộ HTTP cache, trả về số response đã xoá"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+        return cursor.rowcount
+
+    def stats(self):
+        with self._lock:
+            count, body_bytes, fresh = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0), COALESCE(SUM(expires_at > ?), 0) FROM responses",
+                (time.time(),)
+            ).fetchone()
+        return {'path': self.path, 'entries': count, 'fresh': fresh, 'body_bytes': body_bytes}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,175 @@
+"""HTTP client dùng chung cho mọi đường fetch của Chatbot1thegioiCrew"""
+import contextvars
+import threading
+import time
+import urllib.parse
+import weakref
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from chatbot_1thegioi import settings
+from chatbot_1thegioi.metrics import metrics
+from chatbot_1thegioi.rate_limiter import RateLimiter
+
+# Token huỷ theo ngữ cảnh: khi Event được set, mọi request mới trong ngữ cảnh đó bị từ chối ngay
+cancel_token = contextvars.ContextVar('cancel_token', default=None)
+
+
+class RequestCancelled(requests.exceptions.RequestException):
+    """Request bị huỷ vì tác vụ tìm kiếm chứa nó đã kết thúc"""
+
+
+def parse_overrides(spec):
+    """Đọc 'origin=target,...' thành danh sách (origin, target), origin dài được so trước"""
+    overrides = []
+    for item in (spec or '').split(','):
+        origin, sep, target = item.partition('=')
+        if sep and origin.strip() and target.strip():
+            overrides.append((origin.strip().rstrip('/'), target.strip().rstrip('/')))
+    return sorted(overrides, key=lambda pair: len(pair[0]), reverse=True)
+
+
+def release_on_close(response, slot):
+    """Trả slot của host khi response được đóng (close() hoặc with), hoặc khi response bị thu gom mà chưa đóng"""
+    release = weakref.finalize(response, slot.release)
+    close = response.close
+
+    def close_and_release():
+        try:
+            close()
+        finally:
+            # finalize chỉ chạy một lần dù close() được gọi nhiều lần
+            release()
+
+    response.close = close_and_release
+
+
+class HttpClient:
+    """Bọc một requests.Session với pool keep-alive theo từng host.
+
+    Mọi request tới 1thegioi.vn, Google, Bing và Ollama đi qua đây để tái sử dụng
+    kết nối TCP/TLS thay vì bắt tay lại ở mỗi lần gọi, và để giữ nhịp theo từng host
+    bằng rate_limiter thay cho các lần sleep cố định.
+    """
+
+    def __init__(self, pool_connections=None, pool_maxsize=None, max_retries=None, headers=None,
+                 max_per_host=None, cache=None, rate_limiter=None, overrides=None):
+        self.pool_connections = pool_connections or settings.HTTP_POOL_CONNECTIONS
+        self.pool_maxsize = pool_maxsize or settings.HTTP_POOL_MAXSIZE
+        self.max_retries = settings.HTTP_MAX_RETRIES if max_retries is None else max_retries
+        self.max_per_host = max_per_host or settings.HTTP_MAX_PER_HOST
+
+        # HttpCache tuỳ chọn cho get_cached (revalidate bằng ETag / Last-Modified)
+        self.cache = cache
+
+        # Origin được chuyển sang máy chủ khác (ví dụ site giả lập khi benchmark)
+        self.overrides = parse_overrides(settings.HTTP_HOST_OVERRIDES if overrides is None else overrides)
+
+        # Token bucket theo host, lùi lại khi host trả 429/503
+        self.rate_limiter = rate_limiter or RateLimiter()
+
+        # Semaphore theo host để worker pool không dồn quá nhiều request vào một site
+        self._host_slots = {}
+        self._host_slots_lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,  # Số host giữ pool riêng
+            pool_maxsize=self.pool_maxsize,  # Số kết nối keep-alive mỗi host
+            max_retries=self.max_retries
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self.session.headers.update(settings.DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+
+    def host_slot(self, url):
+        """Lấy semaphore giới hạn số request đồng thời cho host của url"""
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        with self._host_slots_lock:
+            slot = self._host_slots.get(host)
+            if slot is None:
+                slot = threading.BoundedSemaphore(self.max_per_host)
+                self._host_slots[host] = slot
+        return slot
+
+    def request(self, method, url, **kwargs):
+        """Gửi request qua session dùng chung; headers truyền vào được gộp với header mặc định"""
+        token = cancel_token.get()
+        if token is not None and token.is_set():
+            raise RequestCancelled(f"Đã huỷ request tới {url}")
+
+        # Chờ đến lượt theo tốc độ của host; tác vụ bị huỷ trong lúc chờ thì bỏ luôn request
+        if not self.rate_limiter.acquire(url, token):
+            raise RequestCancelled(f"Đã huỷ request tới {url}")
+
+        host = urllib.parse.urlsplit(url).netloc.lower()
+        slot = self.host_slot(url)
+        started = time.perf_counter()
+        slot.acquire()
+        try:
+            response = self.session.request(method, self.rewrite(url), **kwargs)
+        except requests.exceptions.RequestException:
+            slot.release()
+            metrics.inc('chatbot_http_requests_total', host=host, status='error')
+            raise
+        except BaseException:
+            slot.release()
+            raise
+        finally:
+            metrics.observe('chatbot_http_request_seconds', time.perf_counter() - started, host=host)
+
+        # Response stream vẫn giữ kết nối tới host sau khi nhận header - chỉ trả slot khi response được đóng
+        if kwargs.get('stream'):
+            release_on_close(response, slot)
+        else:
+            slot.release()
+        metrics.inc('chatbot_http_requests_total', host=host, status=response.status_code)
+        self.rate_limiter.observe(url, response)
+        return response
+
+    def rewrite(self, url):
+        """URL thực sự được gửi đi sau khi áp dụng overrides"""
+        for origin, target in self.overrides:
+            if url == origin or url.startswith(origin + '/') or url.startswith(origin + '?'):
+                return target + url[len(origin):]
+        return url
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def get_cached(self, url, **kwargs):
+        """GET có cache: dùng bản lưu khi còn tươi, hết hạn thì revalidate và nhận 304 từ bản lưu"""
+        if self.cache is None:
+            return self.get(url, **kwargs)
+
+        entry = self.cache.lookup(url)
+        if entry is not None and entry.is_fresh:
+            metrics.inc('chatbot_cache_requests_total', cache='http', result='hit')
+            return entry.to_response()
+
+        if entry is not None:
+            kwargs['headers'] = {**(kwargs.get('headers') or {}), **entry.validators()}
+
+        response = self.get(url, **kwargs)
+
+        if response.status_code == 304 and entry is not None:
+            metrics.inc('chatbot_cache_requests_total', cache='http', result='revalidated')
+            return self.cache.refresh(entry, response).to_response()
+        metrics.inc('chatbot_cache_requests_total', cache='http', result='miss')
+        if response.status_code == 200:
+            self.cache.store(url, response)
+        return response
+
+    def head(self, url, **kwargs):
+        kwargs.setdefault('allow_redirects', False)
+        return self.request('HEAD', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def close(self):
+        self.session.close()
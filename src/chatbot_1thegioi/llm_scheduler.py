@@ -0,0 +1,123 @@
+"""Bộ điều phối lượt gọi LLM: giới hạn số lượt sinh đồng thời tới Ollama, hàng đợi ưu tiên có giới hạn"""
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from chatbot_1thegioi import settings
+from chatbot_1thegioi.metrics import metrics
+
+
+class QueueFull(Exception):
+    """Hàng đợi LLM đã đầy hoặc chờ quá lâu - bên gọi nên dùng báo cáo thủ công"""
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class LLMScheduler:
+    """Cho tối đa `concurrency` lượt sinh chạy cùng lúc; các lượt khác xếp hàng theo
+    (priority, thứ tự đến) - priority nhỏ được phục vụ trước.
+
+    Hàng đợi đầy thì từ chối ngay thay vì để mọi request cùng dồn vào Ollama rồi cùng timeout.
+    """
+
+    def __init__(self, concurrency=None, max_queue=None, queue_timeout=None):
+        self.concurrency = max(1, concurrency or settings.LLM_CONCURRENCY)
+        self.max_queue = settings.LLM_MAX_QUEUE if max_queue is None else max_queue
+        self.queue_timeout = settings.LLM_QUEUE_TIMEOUT if queue_timeout is None else queue_timeout
+
+        self._condition = threading.Condition()
+        self._active = 0
+        self._waiting = []
+        self._sequence = itertools.count()
+
+        self.counters = {'submitted': 0, 'rejected': 0, 'timed_out': 0, 'completed': 0, 'failed': 0}
+        self._queue_waits = deque(maxlen=500)
+        self._generation_times = deque(maxlen=500)
+
+    @contextmanager
+    def slot(self, priority=0):
+        """Giữ một lượt sinh trong khối with; raise QueueFull nếu không được phục vụ"""
+        waited = self._acquire(priority)
+        self._queue_waits.append(waited)
+        metrics.observe('chatbot_llm_queue_wait_seconds', waited)
+        started = time.monotonic()
+        failed = False
+        try:
+            yield waited
+        except BaseException:
+            failed = True
+            raise
+        finally:
+            with self._condition:
+                self._active -= 1
+                self.counters['failed' if failed else 'completed'] += 1
+                self._generation_times.append(time.monotonic() - started)
+                self._publish()
+                self._condition.notify_all()
+            metrics.observe('chatbot_llm_generation_seconds', time.monotonic() - started)
+
+    def _acquire(self, priority):
+        arrived = time.monotonic()
+        with self._condition:
+            self.counters['submitted'] += 1
+            if self._active < self.concurrency and not self._waiting:
+                self._active += 1
+                self._publish()
+                return 0.0
+
+            if len(self._waiting) >= self.max_queue:
+                self.counters['rejected'] += 1
+                raise QueueFull(f'Hàng đợi LLM đã đầy ({self.max_queue} lượt đang chờ)')
+
+            ticket = (priority, next(self._sequence))
+            heapq.heappush(self._waiting, ticket)
+            self._publish()
+            deadline = arrived + self.queue_timeout if self.queue_timeout else None
+            while not (self._waiting[0] == ticket and self._active < self.concurrency):
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self.counters['timed_out'] += 1
+                    self._publish()
+                    self._condition.notify_all()
+                    raise QueueFull(f'Chờ LLM quá {self.queue_timeout:.0f}s')
+                self._condition.wait(remaining)
+
+            heapq.heappop(self._waiting)
+            self._active += 1
+            self._publish()
+            # Lượt kế tiếp có thể cũng được chạy ngay nếu còn chỗ
+            self._condition.notify_all()
+            return time.monotonic() - arrived
+
+    def _publish(self):
+        """Cập nhật gauge độ sâu hàng đợi (gọi khi đang giữ lock)"""
+        metrics.set('chatbot_llm_queue_depth', len(self._waiting))
+        metrics.set('chatbot_llm_active', self._active)
+
+    def stats(self):
+        """Trạng thái hàng đợi và thời gian chờ / thời gian sinh (trung bình, p95, lớn nhất)"""
+        with self._condition:
+            waits = list(self._queue_waits)
+            generations = list(self._generation_times)
+            result = {
+                'concurrency': self.concurrency,
+                'max_queue': self.max_queue,
+                'active': self._active,
+                'queued': len(self._waiting),
+                **self.counters,
+            }
+        for name, values in (('queue_wait', waits), ('generation', generations)):
+            result[f'{name}_avg'] = sum(values) / len(values) if values else 0.0
+            result[f'{name}_p95'] = _percentile(values, 0.95)
+            result[f'{name}_max'] = max(values, default=0.0)
+        return result
@@ -1,17 +1,20 @@
 #!/usr/bin/env python
+import argparse
 import sys
 import os
+import time
 from datetime import datetime
 
-def interactive_chatbot():
+# Fix import path - cho phép chạy trực tiếp `python main.py`
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+sys.path.insert(0, parent_dir)
+
+def interactive_chatbot(profile_dir=None):
     try:
-        # Fix import path
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        parent_dir = os.path.dirname(current_dir)
-        sys.path.insert(0, parent_dir)
-        
         # Import trực tiếp
         from crew import Chatbot1thegioiCrew
+        from chatbot_1thegioi.profiler import profiling
         
         # Khởi tạo crew
         chatbot_crew = Chatbot1thegioiCrew()
@@ -85,8 +88,11 @@ def interactive_chatbot():
                 print(f"\n🔍 Đang tìm kiếm thông tin về '{topic}' trên 1thegioi.vn...")
                 print("⏳ Quá trình tìm kiếm có thể mất 1-2 phút...")
 
-                # Sử dụng phương thức search_topic_articles đã được tối ưu
-                result = chatbot_crew.search_topic_articles(topic)
+                # Tìm bài viết rồi tạo báo cáo từ 3 bài liên quan nhất
+                with profiling(profile_dir, topic, chatbot_crew) as session:
+                    articles = chatbot_crew.find_topic_articles(topic)
+                    result = chatbot_crew.build_search_report(topic, articles)
+                print_profile(session)
 
                 if result and isinstance(result, str) and len(result) > 100:
                     print(f"\n✅ Tìm thấy thông tin và đã tạo báo cáo!")
@@ -96,12 +102,7 @@ def interactive_chatbot():
 
                     # Lưu báo cáo vào file
                     try:
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        safe_topic = "".join(c for c in topic if c.isalnum() or c in (' ', '-', '_')).rstrip()
-                        report_filename = f"report_{safe_topic}_{timestamp}.md"
-                        report_path = os.path.join("reports", report_filename)
-
-                        os.makedirs("reports", exist_ok=True)
+                        report_path = report_path_for(topic)
                         with open(report_path, 'w', encoding='utf-8') as f:
                             f.write(result)
 
@@ -110,6 +111,14 @@ def interactive_chatbot():
                     except Exception as e:
                         print(f"⚠️  Không thể lưu báo cáo: {e}")
 
+                    # Phân tích chuyên sâu bằng AI (Ollama), hiển thị dần khi model sinh
+                    if articles:
+                        answer = input(f"\n🤖 {user_name} có muốn AI phân tích chuyên sâu không? (C/K) ").strip().lower()
+                        if answer in ('c', 'có', 'y', 'yes'):
+                            with profiling(profile_dir, f'{topic} ai', chatbot_crew) as session:
+                                stream_ai_report(chatbot_crew, topic, articles)
+                            print_profile(session)
+
                 else:
                     print(f"\n❌ Không tìm thấy thông tin về '{topic}'!")
                     print("💡 Vui lòng thử:")
@@ -126,16 +135,354 @@ def interactive_chatbot():
         print(f" Có lỗi xảy ra: {e}")
         print(" Vui lòng thử lại hoặc liên hệ hỗ trợ.")
 
+def report_path_for(topic, suffix=''):
+    """Đường dẫn file báo cáo mới trong thư mục reports/"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    safe_topic = "".join(c for c in topic if c.isalnum() or c in (' ', '-', '_')).rstrip()
+    os.makedirs("reports", exist_ok=True)
+    return os.path.join("reports", f"report_{safe_topic}_{timestamp}{suffix}.md")
+
+def stream_ai_report(chatbot_crew, topic, articles):
+    """In báo cáo AI ra terminal và ghi vào file ngay khi từng đoạn được sinh"""
+    report_path = report_path_for(topic, '_ai')
+    streamed = []
+
+    print(f"\n📋 PHÂN TÍCH AI VỀ '{topic.upper()}'")
+    print("=" * 80)
+    try:
+        with open(report_path, 'w', encoding='utf-8') as f:
+            def on_text(text):
+                streamed.append(text)
+                print(text, end='', flush=True)
+                f.write(text)
+                f.flush()
+
+            report = chatbot_crew.summarize_with_ollama(topic, articles, on_text=on_text)
+            if not streamed:
+                # Ollama không trả token nào - đã dùng báo cáo thủ công
+                print(report)
+                f.write(report)
+
+        print(f"\n\n💾 Báo cáo AI đã được lưu: {report_path}")
+    except OSError as e:
+        print(f"⚠️  Không thể lưu báo cáo AI: {e}")
+
+def print_profile(session):
+    """In đường dẫn các file của một phiên profile (không làm gì nếu không bật --profile)"""
+    if session is None:
+        return
+    print(f"\n⏱️  Profile {session.elapsed:.2f}s đã lưu:")
+    print(f"   - Báo cáo: {session.paths['report']}")
+    if 'pstats' in session.paths:
+        print(f"   - pstats (snakeviz, pstats): {session.paths['pstats']}")
+    print(f"   - Stack collapsed (flamegraph.pl, speedscope): {session.paths['collapsed']}")
+
+def search_command(args):
+    """Tìm lần lượt nhiều chủ đề không cần tương tác, lưu báo cáo (và phân tích AI nếu --ai)"""
+    from chatbot_1thegioi.crew import Chatbot1thegioiCrew
+    from chatbot_1thegioi.profiler import profiling
+
+    topics = [topic.strip() for topic in args.topics if topic.strip()]
+    if args.file:
+        with open(args.file, encoding='utf-8') as f:
+            topics.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    if not topics:
+        print("❌ Chưa có chủ đề nào (truyền trực tiếp hoặc qua --file)")
+        return 1
+
+    chatbot_crew = Chatbot1thegioiCrew()
+    for topic in topics:
+        print(f"\n🔍 {topic}")
+        started = time.perf_counter()
+        with profiling(args.profile, topic, chatbot_crew) as session:
+            articles = chatbot_crew.find_topic_articles(topic)
+            report = chatbot_crew.build_search_report(topic, articles)
+            ai_report = chatbot_crew.summarize_with_ollama(topic, articles) if args.ai and articles else None
+        print(f"✅ {len(articles)} bài trong {time.perf_counter() - started:.2f}s")
+
+        for text, suffix in ((report, ''), (ai_report, '_ai')):
+            if not text:
+                continue
+            if args.print:
+                print(text)
+            report_path = report_path_for(topic, suffix)
+            with open(report_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            print(f"💾 {report_path}")
+        print_profile(session)
+    return 0
+
+def cache_command(args):
+    """Xem thống kê hoặc xoá cache nội dung bài viết, HTTP cache, cache Custom Search và cache phân tích AI"""
+    from chatbot_1thegioi import settings
+    from chatbot_1thegioi.article_cache import ArticleCache
+    from chatbot_1thegioi.google_cse import CustomSearchStore, quota_day
+    from chatbot_1thegioi.http_cache import HttpCache
+    from chatbot_1thegioi.summary_cache import SummaryCache
+
+    cache = ArticleCache()
+    http_cache = HttpCache()
+    summary_cache = SummaryCache()
+    cse_store = CustomSearchStore()
+    try:
+        if args.action == 'purge':
+            removed = cache.purge(expired_only=args.expired)
+            print(f"🧹 Đã xoá {removed} bài viết khỏi cache: {cache.path}")
+            if not args.expired:
+                removed = http_cache.purge()
+                print(f"🧹 Đã xoá {removed} trang khỏi HTTP cache: {http_cache.path}")
+                removed = summary_cache.purge()
+                print(f"🧹 Đã xoá {removed} bản phân tích AI: {summary_cache.path}")
+                removed = cse_store.purge()
+                print(f"🧹 Đã xoá {removed} truy vấn Custom Search: {cse_store.path}")
+            return
+
+        stats = cache.stats()
+        print(f"📦 Cache bài viết: {stats['path']}")
+        print(f"   - Số bài: {stats['entries']} (hết hạn: {stats['expired']}, tối đa: {stats['max_entries']})")
+        print(f"   - Dung lượng nội dung: {stats['content_bytes'] / 1024:.1f} KB")
+        print(f"   - Thời gian sống: {stats['ttl'] / 3600:.0f} giờ")
+        if stats['newest']:
+            print(f"   - Mới nhất: {datetime.fromtimestamp(stats['newest']).strftime('%d/%m/%Y %H:%M:%S')}")
+            print(f"   - Cũ nhất: {datetime.fromtimestamp(stats['oldest']).strftime('%d/%m/%Y %H:%M:%S')}")
+
+        http_stats = http_cache.stats()
+        print(f"🌐 HTTP cache (chuyên mục, sitemap): {http_stats['path']}")
+        print(f"   - Số trang: {http_stats['entries']} (còn tươi: {http_stats['fresh']})")
+        print(f"   - Dung lượng: {http_stats['body_bytes'] / 1024:.1f} KB")
+
+        cse_stats = cse_store.stats()
+        print(f"🔎 Cache Google Custom Search: {cse_stats['path']}")
+        print(f"   - Số truy vấn: {cse_stats['entries']} (còn hạn: {cse_stats['fresh']}, "
+              f"thời gian sống: {cse_stats['ttl'] / 3600:.0f} giờ)")
+        print(f"   - Hạn mức hôm nay: {cse_store.used(quota_day())}/{settings.GOOGLE_CSE_DAILY_QUOTA} lượt "
+              f"(chừa lại {settings.GOOGLE_CSE_QUOTA_RESERVE})")
+
+        summary_stats = summary_cache.stats()
+        print(f"🤖 Cache phân tích AI: {summary_stats['path']}")
+        print(f"   - Số bản: {summary_stats['entries']} (tối đa: {summary_stats['max_entries']}), "
+              f"{summary_stats['analysis_bytes'] / 1024:.1f} KB")
+        print(f"   - Tỉ lệ trúng: {summary_stats['hit_rate']:.0%} "
+              f"({summary_stats['hits']} trúng / {summary_stats['misses']} trượt)")
+
+        if args.action == 'list':
+            for url, title, fetched_at in cache.recent(args.limit):
+                print(f"   [{datetime.fromtimestamp(fetched_at).strftime('%d/%m %H:%M')}] {title[:60]} - {url}")
+    finally:
+        cache.close()
+        http_cache.close()
+        summary_cache.close()
+        cse_store.close()
+
+def index_command(args):
+    """Xây, xem thống kê hoặc truy vấn chỉ mục bài viết cục bộ"""
+    if args.action == 'build':
+        from chatbot_1thegioi.crew import Chatbot1thegioiCrew
+
+        chatbot_crew = Chatbot1thegioiCrew()
+        print("🔄 Đang xây chỉ mục từ các chuyên mục và sitemap của 1thegioi.vn...")
+        indexed = chatbot_crew.build_search_index(limit=args.limit, include_sitemap=not args.no_sitemap)
+        print(f"✅ Đã đưa {indexed} bài viết vào chỉ mục: {chatbot_crew.search_index.path}")
+        return
+
+    from chatbot_1thegioi.search_index import SearchIndex
+
+    index = SearchIndex()
+    try:
+        if args.action == 'query':
+            query = ' '.join(args.query)
+            for document in index.search(query, limit=args.limit or 10):
+                print(f"   [{document['index_score']:.2f}] {document['title'][:70]} - {document['url']}")
+            return
+
+        stats = index.stats()
+        print(f"🗂️  Chỉ mục bài viết: {stats['path']}")
+        print(f"   - Số bài: {stats['documents']}")
+        print(f"   - Số từ khóa: {stats['terms']}")
+        if stats['newest']:
+            print(f"   - Cập nhật lần cuối: {datetime.fromtimestamp(stats['newest']).strftime('%d/%m/%Y %H:%M:%S')}")
+        if stats['feeds_checked']:
+            print(f"   - Đồng bộ sitemap lần cuối: {datetime.fromtimestamp(stats['feeds_checked']).strftime('%d/%m/%Y %H:%M:%S')}")
+    finally:
+        index.close()
+
+def watch_command(args):
+    """Đồng bộ sitemap/RSS vào chỉ mục cục bộ theo chu kỳ (hoặc một lần với --once)"""
+    from chatbot_1thegioi.crew import Chatbot1thegioiCrew
+    from chatbot_1thegioi.sitemap_watcher import SitemapWatcher
+
+    chatbot_crew = Chatbot1thegioiCrew()
+    watcher = SitemapWatcher(chatbot_crew, interval=args.interval)
+
+    while True:
+        result = watcher.poll_once()
+        print(f"🔄 [{datetime.now().strftime('%H:%M:%S')}] Đọc {result['feeds']} sitemap/feed, "
+              f"{result['changed']} bài mới/thay đổi, đã tải {result['fetched']} bài")
+        if args.once:
+            break
+        try:
+            time.sleep(watcher.interval)
+        except KeyboardInterrupt:
+            print("\n👋 Dừng theo dõi sitemap.")
+            break
+
+def serve_command(args):
+    """Chạy server HTTP/JSON dùng chung một crew cho mọi request"""
+    import asyncio
+
+    from chatbot_1thegioi.crew import Chatbot1thegioiCrew
+    from chatbot_1thegioi.server import ChatbotServer
+
+    chatbot_crew = Chatbot1thegioiCrew()
+    if args.watch and chatbot_crew.start_sitemap_watcher() is not None:
+        print("🔄 Đã bật đồng bộ sitemap/RSS nền")
+
+    server = ChatbotServer(chatbot_crew, host=args.host, port=args.port, workers=args.workers)
+
+    async def serve():
+        listener = await server.start()
+        print(f"🌐 Server đang chạy tại http://{server.host}:{server.port} ({server.workers} worker)")
+        await listener.serve_forever()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        print("\n👋 Dừng server.")
+    finally:
+        server.close()
+        if chatbot_crew.sitemap_watcher is not None:
+            chatbot_crew.sitemap_watcher.stop()
+
+def metrics_command(args):
+    """In metric của server đang chạy (--url) dạng Prometheus text hoặc JSON"""
+    import requests
+
+    url = args.url.rstrip('/')
+    if not url.endswith('/metrics'):
+        url += '/metrics'
+    try:
+        response = requests.get(url, timeout=10)
+        response.raise_for_status()
+    except requests.RequestException as e:
+        print(f"❌ Không lấy được metric từ {url}: {e}")
+        return 1
+    if args.format == 'prom':
+        print(response.text, end='')
+        return 0
+
+    import json
+    series = {}
+    for line in response.text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        name_labels, _, value = line.rpartition(' ')
+        series[name_labels] = float(value)
+    print(json.dumps(series, ensure_ascii=False, indent=2))
+    return 0
+
+def dump_metrics(path):
+    """Ghi metric của tiến trình hiện tại ra file khi thoát (.json hoặc Prometheus text)"""
+    import json
+    from chatbot_1thegioi.metrics import metrics
+
+    with open(path, 'w', encoding='utf-8') as handle:
+        if path.endswith('.json'):
+            json.dump(metrics.snapshot(), handle, ensure_ascii=False, indent=2)
+        else:
+            handle.write(metrics.render_prometheus())
+
+def build_parser():
+    """Tạo parser dòng lệnh; không có lệnh con thì chạy chatbot tương tác"""
+    parser = argparse.ArgumentParser(prog='chatbot_1thegioi', description='Chatbot hỗ trợ thông tin 1thegioi.vn')
+    parser.add_argument('--metrics-out', metavar='FILE', default=None,
+                        help='Ghi metric của lần chạy ra FILE khi thoát (.json hoặc Prometheus text)')
+    parser.add_argument('--profile', metavar='DIR', default=None,
+                        help='Profile mỗi lượt tìm kiếm (cProfile, tracemalloc, stack collapsed) và ghi báo cáo vào DIR')
+    subparsers = parser.add_subparsers(dest='command')
+
+    search_parser = subparsers.add_parser('search', help='Tìm lần lượt các chủ đề và lưu báo cáo (không tương tác)')
+    search_parser.add_argument('topics', nargs='*', help='Các chủ đề cần tìm')
+    search_parser.add_argument('--file', default=None, help='File chủ đề, mỗi dòng một chủ đề')
+    search_parser.add_argument('--ai', action='store_true', help='Phân tích thêm bằng AI (Ollama)')
+    search_parser.add_argument('--print', action='store_true', help='In báo cáo ra terminal')
+    search_parser.set_defaults(handler=search_command)
+
+    cache_parser = subparsers.add_parser('cache', help='Xem hoặc xoá cache bài viết, HTTP cache và cache phân tích AI')
+    cache_parser.add_argument('action', nargs='?', choices=['stats', 'list', 'purge'], default='stats')
+    cache_parser.add_argument('--expired', action='store_true', help='Chỉ xoá các bài đã hết hạn (dùng với purge)')
+    cache_parser.add_argument('--limit', type=int, default=20, help='Số bài hiển thị (dùng với list)')
+    cache_parser.set_defaults(handler=cache_command)
+
+    index_parser = subparsers.add_parser('index', help='Xây hoặc truy vấn chỉ mục bài viết cục bộ')
+    index_parser.add_argument('action', nargs='?', choices=['build', 'stats', 'query'], default='stats')
+    index_parser.add_argument('query', nargs='*', help='Chủ đề cần tìm (dùng với query)')
+    index_parser.add_argument('--limit', type=int, default=None, help='Số bài tối đa (build) hoặc số kết quả (query)')
+    index_parser.add_argument('--no-sitemap', action='store_true', help='Chỉ quét trang chuyên mục, bỏ qua sitemap/RSS')
+    index_parser.set_defaults(handler=index_command)
+
+    watch_parser = subparsers.add_parser('watch', help='Theo dõi sitemap/RSS và cập nhật chỉ mục cục bộ')
+    watch_parser.add_argument('--interval', type=int, default=None, help='Chu kỳ đồng bộ (giây)')
+    watch_parser.add_argument('--once', action='store_true', help='Chỉ đồng bộ một lượt rồi thoát')
+    watch_parser.set_defaults(handler=watch_command)
+
+    serve_parser = subparsers.add_parser('serve', help='Chạy server HTTP/JSON cho tìm kiếm và báo cáo')
+    serve_parser.add_argument('--host', default=None, help='Địa chỉ lắng nghe (mặc định CHATBOT_SERVER_HOST)')
+    serve_parser.add_argument('--port', type=int, default=None, help='Cổng (mặc định CHATBOT_SERVER_PORT)')
+    serve_parser.add_argument('--workers', type=int, default=None, help='Số request tìm kiếm/báo cáo xử lý đồng thời')
+    serve_parser.add_argument('--watch', action='store_true', help='Đồng bộ sitemap/RSS nền trong khi chạy')
+    serve_parser.set_defaults(handler=serve_command)
+
+    metrics_parser = subparsers.add_parser('metrics', help='Xem metric của server đang chạy')
+    metrics_parser.add_argument('--url', default=None, help='Địa chỉ server (mặc định http://CHATBOT_SERVER_HOST:CHATBOT_SERVER_PORT)')
+    metrics_parser.add_argument('--format', choices=['prom', 'json'], default='prom', help='Định dạng in ra')
+    metrics_parser.set_defaults(handler=metrics_command)
+
+    return parser
+
+def dispatch(argv=None):
+    """Chạy lệnh con tương ứng hoặc chatbot tương tác"""
+    import atexit
+    import logging
+    from chatbot_1thegioi import settings
+
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=settings.LOG_LEVEL, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+    if args.command == 'metrics' and args.url is None:
+        args.url = f"http://{settings.SERVER_HOST}:{settings.SERVER_PORT}"
+    if args.metrics_out:
+        atexit.register(dump_metrics, args.metrics_out)
+    handler = getattr(args, 'handler', None)
+    if handler is None:
+        interactive_chatbot(args.profile)
+    else:
+        handler(args)
+
 def run():
     """
     Run function required by CrewAI - chạy chatbot tương tác
     """
-    interactive_chatbot()
+    dispatch()
     return "Chatbot đã kết thúc phiên làm việc."
 
+def test():
+    """Chạy benchmark offline (site giả lập + Ollama giả), tham số truyền thẳng cho benchmarks/search_latency.py"""
+    import runpy
+
+    script = os.path.join(os.path.dirname(parent_dir), 'benchmarks', 'search_latency.py')
+    if not os.path.isfile(script):
+        print(f"❌ Không tìm thấy {script} - lệnh test cần chạy từ bản checkout của repo")
+        return 1
+
+    sys.argv = [script] + sys.argv[1:]
+    try:
+        runpy.run_path(script, run_name='__main__')
+    except SystemExit as e:
+        return e.code
+    return 0
+
 def main():
     """Entry point cho chương trình"""
-    interactive_chatbot()
+    dispatch()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,76 @@
+"""So khớp nhiều thuật ngữ cùng lúc theo âm tiết (Aho–Corasick trên token) cho từ bắt buộc, từ cấm và từ khoá"""
+from collections import Counter, deque
+from functools import lru_cache
+
+from chatbot_1thegioi.search_index import tokenize
+
+
+class TermMatcher:
+    """Automaton Aho–Corasick mà mỗi ký hiệu là một âm tiết/từ.
+
+    Thuật ngữ chỉ khớp trọn token nên 'ai' không còn khớp trong "tài", "hai" hay "lại";
+    mọi thuật ngữ được tìm trong một lượt duyệt văn bản.
+    """
+
+    def __init__(self, terms):
+        self.terms = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+
+        for term in terms:
+            tokens = tokenize(term)
+            if not tokens or term in self.terms:
+                continue
+            self.terms.append(term)
+
+            node = 0
+            for token in tokens:
+                child = self._goto[node].get(token)
+                if child is None:
+                    child = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                    self._goto[node][token] = child
+                node = child
+            self._output[node] += (term,)
+
+        # Liên kết thất bại theo BFS; output của nút gộp thêm output của nút thất bại
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for token, child in self._goto[node].items():
+                queue.append(child)
+                fallback = self._fail[node]
+                while fallback and token not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(token, 0)
+                self._output[child] += self._output[self._fail[child]]
+
+    def counts(self, text):
+        """Số lần xuất hiện của từng thuật ngữ trong văn bản (str hoặc list token đã tách)"""
+        tokens = tokenize(text) if isinstance(text, str) else text
+        found = Counter()
+        node = 0
+        for token in tokens:
+            while node and token not in self._goto[node]:
+                node = self._fail[node]
+            node = self._goto[node].get(token, 0)
+            for term in self._output[node]:
+                found[term] += 1
+        return found
+
+    def matches(self, text):
+        """Tập thuật ngữ có xuất hiện trong văn bản"""
+        return set(self.counts(text))
+
+
+@lru_cache(maxsize=256)
+def _compile(terms):
+    return TermMatcher(terms)
+
+
+def compile_terms(terms):
+    """TermMatcher cho một tập thuật ngữ, dựng một lần rồi dùng lại"""
+    return _compile(tuple(terms))
@@ -0,0 +1,149 @@
+"""Counter, gauge và histogram trong tiến trình; xuất dạng Prometheus text (/metrics) hoặc dict"""
+import threading
+import time
+from contextlib import contextmanager
+
+# Ngưỡng bucket (giây) mặc định cho histogram độ trễ
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Mô tả (# HELP) và loại của từng metric
+DESCRIPTIONS = {
+    'chatbot_http_requests_total': ('counter', 'Request HTTP theo host và mã trạng thái'),
+    'chatbot_http_request_seconds': ('histogram', 'Thời gian request HTTP theo host'),
+    'chatbot_search_seconds': ('histogram', 'Thời gian tìm bài cho một truy vấn (mọi tầng)'),
+    'chatbot_search_tier_seconds': ('histogram', 'Thời gian chạy của từng tầng tìm kiếm'),
+    'chatbot_search_tier_errors_total': ('counter', 'Tầng tìm kiếm kết thúc bằng lỗi'),
+    'chatbot_candidates_total': ('counter', 'Ứng viên theo giai đoạn: scored, pooled, fetched, kept, discarded, duplicate'),
+    'chatbot_cache_requests_total': ('counter', 'Lượt tra cache theo loại cache và kết quả'),
+    'chatbot_cse_requests_total': ('counter', 'Lượt gọi Google Custom Search API: ok, error, quota (bị chặn vì hết hạn mức)'),
+    'chatbot_llm_requests_total': ('counter', 'Lượt phân tích AI theo kết quả'),
+    'chatbot_llm_queue_wait_seconds': ('histogram', 'Thời gian chờ trong hàng đợi LLM'),
+    'chatbot_llm_generation_seconds': ('histogram', 'Thời gian giữ lượt sinh của Ollama'),
+    'chatbot_llm_first_token_seconds': ('histogram', 'Thời gian tới token đầu tiên của Ollama'),
+    'chatbot_llm_queue_depth': ('gauge', 'Số lượt phân tích AI đang chờ'),
+    'chatbot_llm_active': ('gauge', 'Số lượt phân tích AI đang chạy'),
+    'chatbot_server_requests_total': ('counter', 'Request tới server HTTP theo đường dẫn và mã trạng thái'),
+    'chatbot_server_request_seconds': ('histogram', 'Thời gian xử lý request của server theo đường dẫn'),
+}
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+class Histogram:
+    """Số lần rơi vào từng bucket (cộng dồn khi xuất), tổng và số mẫu"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+
+class Metrics:
+    """Sổ metric dùng chung cho cả tiến trình (xem biến `metrics` bên dưới)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+
+    def inc(self, name, value=1, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self._lock:
+            self.gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name, value, buckets=DEFAULT_BUCKETS, **labels):
+        key = _label_key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Đo thời gian khối with vào histogram `name`"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def value(self, name, **labels):
+        """Giá trị hiện tại của counter/gauge (0 nếu chưa có)"""
+        key = _label_key(labels)
+        with self._lock:
+            return self.counters.get(name, self.gauges.get(name, {})).get(key, 0)
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.gauges.clear()
+            self.histograms.clear()
+
+    def snapshot(self):
+        """Dict {tên: [{labels, value|count/sum/buckets}]} để in ra CLI hoặc ghi JSON"""
+        with self._lock:
+            result = {}
+            for store in (self.counters, self.gauges):
+                for name, series in store.items():
+                    result[name] = [{'labels': dict(key), 'value': value} for key, value in series.items()]
+            for name, series in self.histograms.items():
+                result[name] = [{
+                    'labels': dict(key),
+                    'count': histogram.count,
+                    'sum': round(histogram.sum, 6),
+                    'mean': round(histogram.sum / histogram.count, 6) if histogram.count else 0.0,
+                } for key, histogram in series.items()]
+            return dict(sorted(result.items()))
+
+    def render_prometheus(self):
+        """Toàn bộ metric ở định dạng Prometheus text exposition 0.0.4"""
+        lines = []
+        with self._lock:
+            names = sorted(set(self.counters) | set(self.gauges) | set(self.histograms))
+            for name in names:
+                kind, description = DESCRIPTIONS.get(name, ('untyped', ''))
+                if description:
+                    lines.append(f'# HELP {name} {description}')
+                lines.append(f'# TYPE {name} {kind}')
+                for store in (self.counters, self.gauges):
+                    for key, value in sorted(store.get(name, {}).items()):
+                        lines.append(f'{name}{_format_labels(key)} {value}')
+                for key, histogram in sorted(self.histograms.get(name, {}).items()):
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{_format_labels(key, [("le", str(bound))])} {cumulative}')
+                    lines.append(f'{name}_bucket{_format_labels(key, [("le", "+Inf")])} {histogram.count}')
+                    lines.append(f'{name}_sum{_format_labels(key)} {histogram.sum:.6f}')
+                    lines.append(f'{name}_count{_format_labels(key)} {histogram.count}')
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
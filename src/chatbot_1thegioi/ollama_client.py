@@ -0,0 +1,67 @@
+"""Gọi Ollama /api/generate ở chế độ stream (NDJSON), trả về từng đoạn văn bản ngay khi model sinh ra"""
+import json
+import time
+
+import requests
+
+from chatbot_1thegioi import settings
+
+
+class OllamaError(Exception):
+    """Ollama trả lỗi HTTP hoặc dòng {"error": ...} trong stream"""
+
+
+class OllamaTimeout(OllamaError):
+    """Quá thời gian chờ token đầu tiên hoặc tổng thời gian sinh"""
+
+
+class OllamaClient:
+    """Client Ollama dùng HttpClient chung; URL, model và timeout lấy từ settings"""
+
+    def __init__(self, http, url=None, model=None, first_token_timeout=None, total_timeout=None):
+        self.http = http
+        self.url = (url or settings.OLLAMA_URL).rstrip('/')
+        self.model = model or settings.OLLAMA_MODEL
+        self.first_token_timeout = first_token_timeout or settings.OLLAMA_FIRST_TOKEN_TIMEOUT
+        self.total_timeout = total_timeout or settings.OLLAMA_TIMEOUT
+
+    def generate_stream(self, prompt, options=None):
+        """Sinh văn bản cho prompt, yield từng đoạn khi về.
+
+        Chờ token đầu tiên tối đa first_token_timeout giây (cũng là khoảng lặng tối đa giữa
+        hai đoạn); cả lượt sinh không quá total_timeout giây.
+        """
+        started = time.monotonic()
+        try:
+            response = self.http.post(
+                f'{self.url}/api/generate',
+                json={'model': self.model, 'prompt': prompt, 'stream': True, 'options': options or {}},
+                timeout=(10, self.first_token_timeout),
+                stream=True,
+            )
+        except requests.exceptions.Timeout as e:
+            raise OllamaTimeout(f'Không nhận được token đầu tiên sau {self.first_token_timeout:.0f}s') from e
+
+        try:
+            if response.status_code != 200:
+                raise OllamaError(f'Ollama lỗi HTTP {response.status_code}')
+
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = json.loads(line)
+                if chunk.get('error'):
+                    raise OllamaError(chunk['error'])
+                if chunk.get('response'):
+                    yield chunk['response']
+                if chunk.get('done'):
+                    return
+                if time.monotonic() - started > self.total_timeout:
+                    raise OllamaTimeout(f'Ollama sinh quá {self.total_timeout:.0f}s')
+        except requests.exceptions.ConnectionError as e:
+            # requests báo timeout đọc giữa chừng stream dưới dạng ConnectionError
+            if 'timed out' in str(e):
+                raise OllamaTimeout(f'Ollama ngừng trả token quá {self.first_token_timeout:.0f}s') from e
+            raise
+        finally:
+            response.close()
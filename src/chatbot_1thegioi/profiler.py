@@ -0,0 +1,216 @@
+"""Chế độ profile một lượt tìm kiếm: cProfile mọi luồng, snapshot tracemalloc và stack dạng collapsed (flamegraph)"""
+import cProfile
+import io
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, thread as futures_thread
+from contextlib import contextmanager
+from datetime import datetime
+
+from chatbot_1thegioi import settings
+
+
+def frame_label(code):
+    """Tên một khung stack trong file collapsed: module.py:hàm:dòng"""
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}:{code.co_firstlineno}"
+
+
+class StackSampler:
+    """Luồng nền lấy mẫu stack của mọi luồng mỗi `interval` giây, đếm theo stack (định dạng collapsed)"""
+
+    def __init__(self, interval=None):
+        self.interval = settings.PROFILE_SAMPLE_INTERVAL if interval is None else interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.run, name='stack-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def run(self):
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                # Bỏ luồng lấy mẫu và worker đang rảnh (chờ việc trong hàng đợi của pool)
+                if ident == own or frame.f_code is futures_thread._worker.__code__:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(frame_label(frame.f_code))
+                    frame = frame.f_back
+                # Gộp các luồng cùng pool (crawl_0, crawl_1...) thành một gốc
+                root = re.sub(r'_\d+$', '', names.get(ident, 'thread'))
+                self.stacks[';'.join([root] + stack[::-1])] += 1
+            self.samples += 1
+
+    def write_collapsed(self, path):
+        """Ghi 'gốc;khung;...;khung số_mẫu' - đọc được bằng flamegraph.pl, speedscope, inferno"""
+        with open(path, 'w', encoding='utf-8') as handle:
+            for stack, count in self.stacks.most_common():
+                handle.write(f'{stack} {count}\n')
+
+
+class ThreadProfiles:
+    """cProfile cho luồng gọi và mọi luồng được tạo trong lúc profile (cProfile chỉ theo dõi từng luồng riêng)"""
+
+    def __init__(self):
+        self.profiles = []
+        self.main = None
+        self._lock = threading.Lock()
+
+    def new_profile(self):
+        profile = cProfile.Profile()
+        with self._lock:
+            self.profiles.append(profile)
+        return profile
+
+    def bootstrap(self, frame, event, arg):
+        # Hàm profile tạm của luồng mới: bật cProfile riêng, cProfile thay chỗ hàm này ngay sau đó
+        self.new_profile().enable()
+
+    def start(self):
+        # Từ Python 3.12 cProfile dựa trên sys.monitoring nên một profile đã thấy mọi luồng
+        if sys.version_info < (3, 12):
+            threading.setprofile(self.bootstrap)
+        self.main = self.new_profile()
+        self.main.enable()
+
+    def stop(self):
+        self.main.disable()
+        threading.setprofile(None)
+
+    def stats(self):
+        """Gộp kết quả của mọi luồng thành một pstats.Stats"""
+        with self._lock:
+            profiles = list(self.profiles)
+        merged = None
+        for profile in profiles:
+            try:
+                stats = pstats.Stats(profile, stream=io.StringIO())
+            except TypeError:
+                # Luồng chưa chạy hàm Python nào sau khi bật profile
+                continue
+            if merged is None:
+                merged = stats
+            else:
+                merged.add(stats)
+        return merged
+
+
+@contextmanager
+def fresh_executors(crew):
+    """Cho crew dùng pool mới trong lúc profile để mọi worker được tạo (và được theo dõi) trong phiên"""
+    saved = crew.executor, crew.tier_executor
+    crew.executor = ThreadPoolExecutor(max_workers=settings.CRAWL_WORKERS, thread_name_prefix='crawl')
+    crew.tier_executor = ThreadPoolExecutor(max_workers=settings.SEARCH_TIER_WORKERS, thread_name_prefix='tier')
+    try:
+        yield
+    finally:
+        # Chờ worker thoát để cProfile của từng luồng dừng hẳn trước khi đọc kết quả
+        crew.executor.shutdown(wait=True)
+        crew.tier_executor.shutdown(wait=True)
+        crew.executor, crew.tier_executor = saved
+
+
+class ProfileSession:
+    """Một phiên profile: cProfile + tracemalloc + lấy mẫu stack, ghi báo cáo vào `output_dir`.
+
+    Dùng dạng `with ProfileSession(dir, topic, crew): ...`; sau khi thoát khối with,
+    `paths` chứa đường dẫn báo cáo (.txt), stack collapsed (.collapsed) và dữ liệu pstats (.pstats,
+    không có khi cProfile không ghi nhận lời gọi nào).
+    """
+
+    def __init__(self, output_dir, label, crew=None, top=None, interval=None):
+        self.output_dir = output_dir
+        self.label = label
+        self.crew = crew
+        self.top = settings.PROFILE_TOP if top is None else top
+        self.profiles = ThreadProfiles()
+        self.sampler = StackSampler(interval)
+        self.paths = {}
+
+    def __enter__(self):
+        self._executors = fresh_executors(self.crew) if self.crew is not None else None
+        if self._executors is not None:
+            self._executors.__enter__()
+        tracemalloc.start(settings.PROFILE_TRACEMALLOC_FRAMES)
+        self.sampler.start()
+        self.started = time.perf_counter()
+        self.profiles.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiles.stop()
+        self.elapsed = time.perf_counter() - self.started
+        self.sampler.stop()
+        snapshot = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        if self._executors is not None:
+            self._executors.__exit__(*exc_info)
+        self.write(snapshot, peak)
+        return False
+
+    def base_path(self):
+        safe_label = re.sub(r'[^\w-]+', '_', self.label).strip('_') or 'profile'
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        os.makedirs(self.output_dir, exist_ok=True)
+        return os.path.join(self.output_dir, f'profile_{safe_label}_{timestamp}')
+
+    def write(self, snapshot, peak):
+        base = self.base_path()
+        # None khi không luồng nào kịp chạy hàm Python (khối with lỗi ngay) - vẫn ghi stack và bộ nhớ
+        stats = self.profiles.stats()
+        if stats is not None:
+            stats.dump_stats(base + '.pstats')
+        self.sampler.write_collapsed(base + '.collapsed')
+
+        report = io.StringIO()
+        report.write(f'Profile: {self.label}\n')
+        report.write(f'Thời gian: {self.elapsed:.3f}s, {len(self.profiles.profiles)} luồng được theo dõi, '
+                     f'{self.sampler.samples} lượt lấy mẫu stack\n')
+        report.write(f'Bộ nhớ đỉnh (tracemalloc): {peak / 1024 / 1024:.1f} MiB\n')
+        for sort_key, title in (('tottime', 'THỜI GIAN RIÊNG (tottime)'), ('cumulative', 'THỜI GIAN TÍCH LUỸ (cumtime)')):
+            report.write(f'\n=== {title} - top {self.top} ===\n')
+            if stats is None:
+                report.write('(cProfile không ghi nhận lời gọi nào)\n')
+                continue
+            stats.stream = report
+            stats.sort_stats(sort_key).print_stats(self.top)
+        report.write(f'\n=== BỘ NHỚ CÒN GIỮ THEO DÒNG - top {self.top} ===\n')
+        ignored = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'))
+        for stat in snapshot.filter_traces(ignored).statistics('lineno')[:self.top]:
+            report.write(f'{stat}\n')
+
+        with open(base + '.txt', 'w', encoding='utf-8') as handle:
+            handle.write(report.getvalue())
+        self.paths = {'report': base + '.txt', 'collapsed': base + '.collapsed'}
+        if stats is not None:
+            self.paths['pstats'] = base + '.pstats'
+
+
+def profiling(output_dir, label, crew=None):
+    """ProfileSession nếu bật profile (`output_dir` khác rỗng), ngược lại một khối with không làm gì"""
+    if not output_dir:
+        return _disabled()
+    return ProfileSession(output_dir, label, crew)
+
+
+@contextmanager
+def _disabled():
+    yield None
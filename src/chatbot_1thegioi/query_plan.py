@@ -0,0 +1,51 @@
+"""QueryPlan: mọi thứ suy ra từ câu hỏi của người dùng, tính một lần cho mỗi lượt tìm kiếm"""
+from chatbot_1thegioi import settings
+from chatbot_1thegioi.matcher import compile_terms
+from chatbot_1thegioi.ranking import query_terms
+from chatbot_1thegioi.search_index import tokenize
+from chatbot_1thegioi.topics import topic_category
+
+
+class QueryPlan:
+    """Topic đã chuẩn hoá, token, từ khoá mở rộng, nhóm chủ đề, bộ từ bắt buộc/từ cấm,
+    trọng số BM25F, ngưỡng điểm, thứ tự chuyên mục và matcher tiêu đề đã dựng sẵn.
+
+    Các tầng tìm kiếm và hàm chấm điểm nhận plan thay vì chuỗi topic nên mỗi ứng viên
+    chỉ còn việc duyệt tiêu đề/nội dung.
+    """
+
+    def __init__(self, topic, related_keywords, section_pages):
+        self.topic = topic.strip()
+        self.topic_lower = self.topic.lower()
+        self.tokens = tokenize(self.topic)
+        self.phrase = ' '.join(self.tokens)
+
+        # Từ quan trọng của topic và từ khoá mở rộng (như extract_keywords)
+        self.words = [word for word in self.tokens if len(word) > 2]
+        self.related_keywords = list(related_keywords)
+        self.keywords = self.words + self.related_keywords
+
+        # Bộ từ bắt buộc/từ cấm theo nhóm chủ đề; topic tổng quát dùng từ khoá của chính topic
+        self.category = topic_category(self.topic)
+        if self.category:
+            self.required_terms = list(self.category['required'])
+            self.forbidden_terms = list(self.category['forbidden'])
+        else:
+            self.required_terms = self.words + self.related_keywords[:5]
+            self.forbidden_terms = []
+
+        # Trọng số token cho BM25F và ngưỡng điểm tiêu đề (thang 0-10 của BM25FRanker.relevance)
+        self.query_weights = query_terms(self.topic, self.keywords)
+        self.threshold = settings.TITLE_SCORE_THRESHOLD
+
+        # Chuyên mục cần quét theo thứ tự ưu tiên
+        self.section_pages = list(section_pages)
+
+        # Matcher cho tiêu đề (từ topic, từ bắt buộc, từ cấm)
+        self.title_matcher = compile_terms(self.words + self.required_terms + self.forbidden_terms)
+
+    def __str__(self):
+        return self.topic
+
+    def __repr__(self):
+        return f'QueryPlan({self.topic!r}, category={self.category["name"] if self.category else None})'
@@ -0,0 +1,148 @@
+"""Xếp hạng BM25F trên tiêu đề / slug URL / nội dung, thống kê corpus cập nhật dần khi gặp bài mới"""
+import math
+import threading
+from collections import Counter, OrderedDict
+
+from chatbot_1thegioi import settings
+from chatbot_1thegioi.search_index import strip_accents, tokenize, url_slug
+
+
+# Trọng số token đến từ từ khoá mở rộng so với token của chính câu hỏi
+EXPANSION_WEIGHT = 0.3
+
+
+def query_terms(topic, topic_keywords=()):
+    """Bản đồ token -> trọng số: token của câu hỏi nặng hơn token của từ khoá mở rộng"""
+    weights = {token: 1.0 for token in tokenize(topic)}
+    for keyword in topic_keywords or ():
+        for token in tokenize(keyword):
+            weights.setdefault(token, EXPANSION_WEIGHT)
+    return weights
+
+
+class BM25FRanker:
+    """Chấm điểm BM25F cho một bài theo câu hỏi.
+
+    Thống kê corpus (số bài, số bài chứa từng token, độ dài trung bình mỗi trường) được
+    nạp từ chỉ mục cục bộ lúc khởi động và cộng dồn với mọi bài các tầng tìm kiếm gặp.
+    Tần suất tài liệu đếm trên token đã bỏ dấu để IDF dùng chung cho tiêu đề/nội dung (có dấu)
+    và slug (không dấu).
+    """
+
+    # Trọng số và hệ số chuẩn hoá độ dài (b) của từng trường
+    FIELD_WEIGHTS = {'title': 3.0, 'slug': 1.5, 'body': 1.0}
+    FIELD_B = {'title': 0.4, 'slug': 0.3, 'body': 0.75}
+
+    def __init__(self, k1=1.2, max_documents=None):
+        self.k1 = k1
+        self.max_documents = settings.RANKER_MAX_DOCUMENTS if max_documents is None else max_documents
+        self.doc_count = 0
+        self.document_frequency = Counter()
+        self.field_length_totals = Counter()
+        self.field_documents = Counter()
+        # URL -> token (bỏ dấu) đã đếm cho bài, hoặc None khi đã đếm cả nội dung; giữ tối đa max_documents URL
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    def field_tokens(self, title, url, body=''):
+        """Token từng trường; slug không dấu nên so bằng token đã bỏ dấu"""
+        return {
+            'title': tokenize(title),
+            'slug': tokenize(strip_accents(url_slug(url or ''))),
+            'body': tokenize(body),
+        }
+
+    def observe(self, url, title, body=''):
+        """Đưa một bài vào thống kê corpus (mỗi URL tính một bài).
+
+        Bài đã gặp qua tiêu đề (trang chuyên mục) được cộng thêm trường nội dung khi nội dung về sau.
+        """
+        fields = self.field_tokens(title, url, body)
+        with self._lock:
+            if url in self._seen:
+                counted = self._seen[url]
+                self._seen.move_to_end(url)
+                if counted is None or not fields['body']:
+                    return
+                new_fields = ('body',)
+            else:
+                counted = frozenset()
+                self.doc_count += 1
+                new_fields = ('title', 'slug', 'body') if fields['body'] else ('title', 'slug')
+
+            terms = set()
+            for field in new_fields:
+                self.field_length_totals[field] += len(fields[field])
+                self.field_documents[field] += 1
+                terms.update(strip_accents(token) for token in fields[field])
+            self.document_frequency.update(terms - counted)
+
+            self._seen[url] = None if fields['body'] else counted | terms
+            # Quên URL cũ nhất (thống kê của nó vẫn giữ) để bộ nhớ không tăng mãi
+            while len(self._seen) > self.max_documents:
+                self._seen.popitem(last=False)
+
+    def seed(self, documents):
+        """Nạp thống kê từ các bài sẵn có: iterable (url, title, body)"""
+        for url, title, body in documents:
+            self.observe(url, title, body)
+
+    def idf(self, term):
+        with self._lock:
+            total = max(self.doc_count, 1)
+            frequency = self.document_frequency.get(strip_accents(term), 0)
+        return math.log(1 + (total - frequency + 0.5) / (frequency + 0.5))
+
+    def query_terms(self, topic, topic_keywords=()):
+        return query_terms(topic, topic_keywords)
+
+    def score(self, query_weights, title, url, body=''):
+        """Điểm BM25F của bài với câu hỏi đã tách token (xem query_terms)"""
+        fields = self.field_tokens(title, url, body)
+        counts = {field: Counter(tokens) for field, tokens in fields.items()}
+
+        with self._lock:
+            totals = dict(self.field_length_totals)
+            documents = dict(self.field_documents)
+        # Độ dài trung bình chỉ tính trên các bài có trường đó (phần lớn bài chỉ mới có tiêu đề)
+        averages = {}
+        for field, tokens in fields.items():
+            total = totals.get(field, 0)
+            averages[field] = total / documents[field] if documents.get(field) and total else max(len(tokens), 1)
+
+        score = 0.0
+        for term, query_weight in query_weights.items():
+            ascii_term = strip_accents(term)
+            weighted_tf = 0.0
+            for field, weight in self.FIELD_WEIGHTS.items():
+                tf = counts[field].get(ascii_term if field == 'slug' else term, 0)
+                if not tf:
+                    continue
+                b = self.FIELD_B[field]
+                weighted_tf += weight * tf / (1 - b + b * len(fields[field]) / averages[field])
+            if weighted_tf:
+                saturation = weighted_tf * (self.k1 + 1) / (weighted_tf + self.k1)
+                score += query_weight * self.idf(term) * saturation
+        return score
+
+    def relevance(self, query_weights, title, url, topic):
+        """BM25F của bài chia cho BM25F của một tiêu đề chỉ gồm đúng câu hỏi, nhân 10.
+
+        Bài khớp đủ mọi từ của câu hỏi được khoảng 10 điểm bất kể IDF hiện tại của corpus, nên một
+        ngưỡng cố định dùng được cho mọi chủ đề; khớp thêm từ khoá mở rộng có thể vượt 10.
+        """
+        reference = self.score(query_weights, topic, '')
+        if not reference:
+            return 0.0
+        return 10.0 * self.score(query_weights, title, url) / reference
+
+    def content_relevance(self, query_weights, body, topic):
+        """BM25F của riêng trường nội dung trên thang 0-10: 10 là mức bão hoà khi nội dung nhắc rất nhiều lần mọi từ của câu hỏi"""
+        ceiling = sum(query_weights.get(term, 1.0) * self.idf(term) * (self.k1 + 1) for term in set(tokenize(topic)))
+        if not ceiling:
+            return 0.0
+        return min(10.0, 10.0 * self.score(query_weights, '', '', body) / ceiling)
+
+    def stats(self):
+        with self._lock:
+            return {'documents': self.doc_count, 'terms': len(self.document_frequency)}
@@ -0,0 +1,137 @@
+"""Giới hạn tốc độ request theo host (token bucket), tôn trọng 429/503 và header Retry-After"""
+import threading
+import time
+import urllib.parse
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+from chatbot_1thegioi import settings
+
+
+def host_of(url):
+    """Host (chữ thường, không cổng) của url; chuỗi không có scheme được coi là host"""
+    if '://' not in url:
+        return url.lower()
+    return (urllib.parse.urlsplit(url).hostname or '').lower()
+
+
+def parse_host_rates(spec):
+    """Đọc cấu hình 'host=rate/burst,host=rate' thành {host: (rate, burst)}; rate 0 = không giới hạn"""
+    rates = {}
+    for item in (spec or '').split(','):
+        if '=' not in item:
+            continue
+        host, value = item.split('=', 1)
+        rate, _, burst = value.partition('/')
+        try:
+            rates[host.strip().lower()] = (float(rate), float(burst) if burst else None)
+        except ValueError:
+            continue
+    return rates
+
+
+def retry_after_seconds(value):
+    """Số giây chờ từ header Retry-After (dạng số giây hoặc ngày HTTP); None nếu không đọc được"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return max(0.0, (moment - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Bucket của một host: `rate` token mỗi giây, tích tối đa `burst` token"""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1.0, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def reserve(self, now):
+        """Lấy một token; trả về 0 nếu được đi ngay, ngược lại số giây cần chờ trước khi thử lại"""
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if not self.rate:
+            return 0.0
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+class RateLimiter:
+    """Token bucket theo host dùng chung cho mọi request của HttpClient.
+
+    Host trả 429/503 thì bị chặn đến hết Retry-After (hoặc `penalty` giây nếu không có
+    header); mọi luồng đang gửi tới host đó cùng chờ thay vì mỗi nơi tự sleep cố định.
+    """
+
+    def __init__(self, rate=None, burst=None, host_rates=None, penalty=None):
+        self.rate = settings.HTTP_RATE if rate is None else rate
+        self.burst = settings.HTTP_BURST if burst is None else burst
+        self.host_rates = parse_host_rates(settings.HTTP_HOST_RATES) if host_rates is None else host_rates
+        self.penalty = settings.HTTP_RATE_PENALTY if penalty is None else penalty
+
+        self._lock = threading.Lock()
+        self._buckets = {}
+        self.waited = {}
+
+    def bucket(self, host):
+        """Bucket của host (tạo khi gặp lần đầu; gọi khi đang giữ lock)"""
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate, burst = self.host_rates.get(host, (self.rate, None))
+            bucket = TokenBucket(rate, burst or self.burst)
+            self._buckets[host] = bucket
+        return bucket
+
+    def acquire(self, url, cancelled=None):
+        """Chờ đến khi host của url cho phép gửi; trả về False nếu `cancelled` được set trong lúc chờ"""
+        host = host_of(url)
+        waited = 0.0
+        while True:
+            with self._lock:
+                delay = self.bucket(host).reserve(time.monotonic())
+                if not delay:
+                    if waited:
+                        self.waited[host] = self.waited.get(host, 0.0) + waited
+                    return True
+            if cancelled is not None:
+                if cancelled.wait(delay):
+                    return False
+            else:
+                time.sleep(delay)
+            waited += delay
+
+    def backoff(self, url, seconds=None):
+        """Chặn host của url thêm `seconds` giây (mặc định `penalty`) và xả hết token"""
+        seconds = self.penalty if seconds is None else seconds
+        with self._lock:
+            bucket = self.bucket(host_of(url))
+            bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + seconds)
+            bucket.tokens = 0.0
+
+    def observe(self, url, response):
+        """Ghi nhận response: 429/503 thì lùi theo Retry-After"""
+        if response.status_code in (429, 503):
+            delay = retry_after_seconds(response.headers.get('Retry-After'))
+            self.backoff(url, min(delay, settings.HTTP_MAX_RETRY_AFTER) if delay is not None else None)
+
+    def stats(self):
+        """Tổng thời gian đã chờ theo host và các host đang bị chặn"""
+        now = time.monotonic()
+        with self._lock:
+            blocked = {host: bucket.blocked_until - now for host, bucket in self._buckets.items()
+                       if bucket.blocked_until > now}
+            return {'waited': dict(self.waited), 'blocked': blocked}
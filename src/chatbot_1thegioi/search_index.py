@@ -0,0 +1,220 @@
+"""Chỉ mục ngược cục bộ (SQLite) cho bài viết 1thegioi.vn: tiêu đề, slug URL, chuyên mục, ngày và nội dung"""
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+import urllib.parse
+from collections import defaultdict
+
+from chatbot_1thegioi import settings
+from chatbot_1thegioi.urls import canonical_url
+
+# Trọng số từng trường khi cộng điểm (khớp tiêu đề quan trọng hơn khớp nội dung)
+FIELD_WEIGHTS = {'title': 3.0, 'slug': 2.0, 'section': 1.0, 'body': 1.0}
+
+
+def tokenize(text):
+    """Tách văn bản thành các âm tiết/từ viết thường"""
+    return re.findall(r'\w+', (text or '').lower())
+
+
+def strip_accents(text):
+    """Bỏ dấu tiếng Việt: 'chiến tranh' -> 'chien tranh'"""
+    text = unicodedata.normalize('NFD', text or '').replace('đ', 'd').replace('Đ', 'D')
+    return ''.join(c for c in text if unicodedata.category(c) != 'Mn')
+
+
+def url_slug(url):
+    """Lấy slug bài viết từ URL, bỏ đuôi .html và mã số bài"""
+    path = urllib.parse.urlsplit(url).path.rstrip('/')
+    slug = path.rsplit('/', 1)[-1]
+    slug = re.sub(r'\.html?$', '', slug)
+    slug = re.sub(r'-?\d{4,}$', '', slug)
+    return slug.replace('-', ' ').replace('_', ' ')
+
+
+class SearchIndex:
+    """Chỉ mục ngược lưu trên đĩa: bảng documents và bảng postings (term, field, doc_id, tf)"""
+
+    def __init__(self, path=None):
+        self.path = path or settings.SEARCH_INDEX_PATH
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                url TEXT UNIQUE NOT NULL,
+                title TEXT NOT NULL,
+                section TEXT,
+                published TEXT,
+                lastmod TEXT,
+                body TEXT,
+                indexed_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                field TEXT NOT NULL,
+                doc_id INTEGER NOT NULL,
+                tf INTEGER NOT NULL,
+                PRIMARY KEY (term, field, doc_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings (doc_id);
+            CREATE TABLE IF NOT EXISTS feeds (
+                url TEXT PRIMARY KEY,
+                lastmod TEXT,
+                checked_at REAL NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def field_tokens(self, url, title, section, body):
+        """Token của từng trường khi đưa vào chỉ mục"""
+        return {
+            'title': tokenize(title),
+            'slug': tokenize(strip_accents(url_slug(url))),
+            'section': tokenize(strip_accents((section or '').replace('-', ' '))),
+            'body': tokenize(body),
+        }
+
+    def add(self, url, title, body='', section='', published='', lastmod=''):
+        """Thêm hoặc cập nhật một bài viết trong chỉ mục (khoá theo URL đã chuẩn hoá)"""
+        url = canonical_url(url)
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO documents (url, title, section, published, lastmod, body, indexed_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)
+                   ON CONFLICT(url) DO UPDATE SET title = excluded.title, section = excluded.section,
+                       published = excluded.published, lastmod = excluded.lastmod,
+                       body = excluded.body, indexed_at = excluded.indexed_at""",
+                (url, title, section or '', published or '', lastmod or '', body or '', time.time())
+            )
+            doc_id = self._conn.execute("SELECT id FROM documents WHERE url = ?", (url,)).fetchone()[0]
+            self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (doc_id,))
+
+            rows = []
+            for field, tokens in self.field_tokens(url, title, section, body).items():
+                counts = defaultdict(int)
+                for token in tokens:
+                    counts[token] += 1
+                rows.extend((term, field, doc_id, tf) for term, tf in counts.items())
+            self._conn.executemany("INSERT INTO postings (term, field, doc_id, tf) VALUES (?, ?, ?, ?)", rows)
+            self._conn.commit()
+        return doc_id
+
+    def remove(self, url):
+        url = canonical_url(url)
+        with self._lock:
+            row = self._conn.execute("SELECT id FROM documents WHERE url = ?", (url,)).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM postings WHERE doc_id = ?", (row[0],))
+                self._conn.execute("DELETE FROM documents WHERE id = ?", (row[0],))
+                self._conn.commit()
+
+    def get(self, url):
+        url = canonical_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, title, section, published, lastmod, body FROM documents WHERE url = ?", (url,)
+            ).fetchone()
+        return self._row_to_dict(row) if row else None
+
+    def search(self, query, limit=20):
+        """Tìm bài khớp query, trả về list dict bài viết kèm 'index_score' giảm dần"""
+        tokens = set(tokenize(query))
+        if not tokens:
+            return []
+
+        scores = defaultdict(float)
+        with self._lock:
+            total_docs = self._conn.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+            if not total_docs:
+                return []
+
+            for token in tokens:
+                ascii_token = strip_accents(token)
+                rows = self._conn.execute(
+                    """SELECT doc_id, field, tf FROM postings
+                       WHERE (term = ? AND field IN ('title', 'body'))
+                          OR (term = ? AND field IN ('slug', 'section'))""",
+                    (token, ascii_token)
+                ).fetchall()
+                if not rows:
+                    continue
+
+                # IDF theo số bài chứa token ở bất kỳ trường nào
+                document_frequency = len({doc_id for doc_id, _, _ in rows})
+                idf = math.log(1 + total_docs / document_frequency)
+                for doc_id, field, tf in rows:
+                    scores[doc_id] += FIELD_WEIGHTS.get(field, 1.0) * (1 + math.log(tf)) * idf
+
+            best = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:limit]
+            results = []
+            for doc_id, score in best:
+                row = self._conn.execute(
+                    "SELECT url, title, section, published, lastmod, body FROM documents WHERE id = ?", (doc_id,)
+                ).fetchone()
+                if row:
+                    document = self._row_to_dict(row)
+                    document['index_score'] = score
+                    results.append(document)
+        return results
+
+    def documents(self):
+        """Danh sách (url, title, body) mọi bài trong chỉ mục, dùng để nạp thống kê xếp hạng"""
+        with self._lock:
+            return self._conn.execute("SELECT url, title, body FROM documents").fetchall()
+
+    def lastmods(self):
+        """Bản đồ url -> lastmod của các bài đang có trong chỉ mục"""
+        with self._lock:
+            return dict(self._conn.execute("SELECT url, lastmod FROM documents").fetchall())
+
+    def feed_lastmods(self):
+        """Bản đồ url sitemap/feed -> lastmod lần đồng bộ trước"""
+        with self._lock:
+            return dict(self._conn.execute("SELECT url, lastmod FROM feeds").fetchall())
+
+    def mark_feed(self, url, lastmod=''):
+        """Ghi nhận đã đồng bộ một sitemap/feed"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO feeds (url, lastmod, checked_at) VALUES (?, ?, ?)",
+                (url, lastmod or '', time.time())
+            )
+            self._conn.commit()
+
+    def last_feed_check(self):
+        """Thời điểm đồng bộ sitemap/feed gần nhất (None nếu chưa từng)"""
+        with self._lock:
+            return self._conn.execute("SELECT MAX(checked_at) FROM feeds").fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            documents, newest = self._conn.execute(
+                "SELECT COUNT(*), MAX(indexed_at) FROM documents"
+            ).fetchone()
+            terms = self._conn.execute("SELECT COUNT(DISTINCT term) FROM postings").fetchone()[0]
+            feeds_checked = self._conn.execute("SELECT MAX(checked_at) FROM feeds").fetchone()[0]
+        return {'path': self.path, 'documents': documents, 'terms': terms, 'newest': newest,
+                'feeds_checked': feeds_checked}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    @staticmethod
+    def _row_to_dict(row):
+        url, title, section, published, lastmod, body = row
+        return {
+            'url': url, 'title': title, 'section': section,
+            'published': published, 'lastmod': lastmod, 'content': body,
+        }
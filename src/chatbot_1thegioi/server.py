@@ -0,0 +1,260 @@
+"""Chế độ server HTTP/JSON (asyncio, thư viện chuẩn): tìm kiếm và tạo báo cáo cho widget chat trên website.
+
+Mọi request dùng chung một Chatbot1thegioiCrew nên cache, chỉ mục, pool kết nối và hàng đợi
+LLM được chia sẻ giữa các người đọc trong cùng một tiến trình.
+
+    GET  /health                     trạng thái server, số request đang chạy, hàng đợi LLM
+    GET  /metrics                    metric dạng Prometheus text
+    GET  /search?topic=...           tối đa 3 bài liên quan nhất
+    POST /report {"topic": ..., "ai": false}
+                                     bài viết kèm báo cáo tóm tắt (ai=true: phân tích bằng Ollama)
+"""
+import asyncio
+import json
+import logging
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+from chatbot_1thegioi import settings
+from chatbot_1thegioi.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Trường của bài viết trả về cho client
+ARTICLE_FIELDS = ('title', 'url', 'published', 'content', 'relevance_score')
+
+
+class HttpError(Exception):
+    """Lỗi trả về client dưới dạng {"error": message} với mã HTTP tương ứng"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def article_json(article):
+    return {field: article[field] for field in ARTICLE_FIELDS if field in article}
+
+
+class ChatbotServer:
+    """Server HTTP/1.1 keep-alive tối giản trên asyncio.start_server.
+
+    Tìm kiếm được điều phối trên event loop (find_topic_articles_async) còn tải trang, xếp hạng và
+    chấm điểm chạy trong các pool luồng của crew; phần chặn như tạo báo cáo và gọi Ollama chạy trong
+    pool `workers` luồng. Tối đa `workers` request tìm kiếm/báo cáo được xử lý cùng lúc, các request
+    khác chờ đến lượt.
+    """
+
+    def __init__(self, crew, host=None, port=None, workers=None, request_timeout=None):
+        self.crew = crew
+        self.host = host or settings.SERVER_HOST
+        self.port = settings.SERVER_PORT if port is None else port
+        self.workers = max(1, workers or settings.SERVER_WORKERS)
+        self.request_timeout = request_timeout or settings.SERVER_REQUEST_TIMEOUT
+
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='server')
+        self.started_at = time.time()
+        self.in_flight = 0
+        self.served = 0
+        self._slots = None
+        self._server = None
+        self.routes = {
+            ('GET', '/health'): self.health,
+            ('GET', '/metrics'): self.metrics,
+            ('GET', '/search'): self.search,
+            ('POST', '/search'): self.search,
+            ('POST', '/report'): self.report,
+        }
+
+    async def start(self):
+        self._slots = asyncio.Semaphore(self.workers)
+        self._server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        # Cổng thực tế (port=0 thì hệ điều hành tự chọn)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self._server
+
+    async def serve_forever(self):
+        server = await self.start()
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+        self.executor.shutdown(wait=False)
+
+    async def handle_connection(self, reader, writer):
+        """Đọc lần lượt các request trên một kết nối (keep-alive) cho đến khi client đóng"""
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except HttpError as e:
+                    await self.write_response(writer, e.status, {'error': str(e)}, keep_alive=False)
+                    break
+                if request is None:
+                    break
+
+                method, path, query, headers, body = request
+                started = time.perf_counter()
+                status, payload = await self.dispatch(method, path, query, body)
+                # Chỉ gắn nhãn đường dẫn đã biết để số chuỗi metric không tăng theo URL lạ
+                route = path if any(route_path == path for _, route_path in self.routes) else 'other'
+                metrics.inc('chatbot_server_requests_total', path=route, status=status.value)
+                metrics.observe('chatbot_server_request_seconds', time.perf_counter() - started, path=route)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+                await self.write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            # Client ngắt kết nối giữa chừng
+            pass
+        finally:
+            writer.close()
+
+    async def read_request(self, reader):
+        """Phân tích request line, header và body (theo Content-Length); None nếu client đã đóng"""
+        try:
+            head = await reader.readuntil(b'\r\n\r\n')
+        except asyncio.IncompleteReadError as e:
+            if e.partial.strip():
+                raise HttpError(HTTPStatus.BAD_REQUEST, 'Request không hoàn chỉnh')
+            return None
+        except asyncio.LimitOverrunError:
+            raise HttpError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, 'Header quá lớn')
+
+        lines = head.decode('latin-1').split('\r\n')
+        try:
+            method, target, _ = lines[0].split(' ', 2)
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'Request line không hợp lệ')
+
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                name, value = line.split(':', 1)
+                headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'Content-Length không hợp lệ')
+        if length > settings.SERVER_MAX_BODY:
+            raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, 'Body quá lớn')
+        body = await reader.readexactly(length) if length else b''
+
+        parsed = urllib.parse.urlsplit(target)
+        query = dict(urllib.parse.parse_qsl(parsed.query))
+        return method.upper(), parsed.path.rstrip('/') or '/', query, headers, body
+
+    async def dispatch(self, method, path, query, body):
+        """Gọi handler của route; lỗi được chuyển thành JSON {"error": ...}"""
+        if method == 'OPTIONS':
+            return HTTPStatus.NO_CONTENT, None
+
+        handler = self.routes.get((method, path))
+        if handler is None:
+            allowed = any(route_path == path for _, route_path in self.routes)
+            status = HTTPStatus.METHOD_NOT_ALLOWED if allowed else HTTPStatus.NOT_FOUND
+            return status, {'error': f'Không hỗ trợ {method} {path}'}
+
+        try:
+            params = dict(query)
+            if body:
+                try:
+                    data = json.loads(body)
+                except ValueError:
+                    data = None
+                if not isinstance(data, dict):
+                    raise HttpError(HTTPStatus.BAD_REQUEST, 'Body phải là JSON object')
+                params.update(data)
+            return HTTPStatus.OK, await handler(params)
+        except HttpError as e:
+            return e.status, {'error': str(e)}
+        except asyncio.TimeoutError:
+            return HTTPStatus.GATEWAY_TIMEOUT, {'error': f'Quá {self.request_timeout:.0f}s chưa xử lý xong'}
+        except Exception as e:
+            logger.exception("Lỗi xử lý %s %s", method, path)
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {'error': 'Lỗi nội bộ'}
+
+    async def write_response(self, writer, status, payload, keep_alive=True):
+        """Ghi response: payload là str thì gửi dạng text (Prometheus), còn lại dạng JSON"""
+        if isinstance(payload, str):
+            body = payload.encode('utf-8')
+            content_type = 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            body = b'' if payload is None else json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+            content_type = 'application/json; charset=utf-8'
+        headers = [
+            f'HTTP/1.1 {status.value} {status.phrase}',
+            f'Content-Type: {content_type}',
+            f'Content-Length: {len(body)}',
+            f'Connection: {"keep-alive" if keep_alive else "close"}',
+        ]
+        # Widget chat nhúng trên website gọi API từ origin khác
+        if settings.SERVER_CORS_ORIGIN:
+            headers += [
+                f'Access-Control-Allow-Origin: {settings.SERVER_CORS_ORIGIN}',
+                'Access-Control-Allow-Methods: GET, POST, OPTIONS',
+                'Access-Control-Allow-Headers: Content-Type',
+            ]
+        writer.write(('\r\n'.join(headers) + '\r\n\r\n').encode('latin-1') + body)
+        await writer.drain()
+
+    async def run_limited(self, coroutine):
+        """Chạy một tác vụ tìm kiếm/báo cáo trong giới hạn số worker và thời gian"""
+        async with self._slots:
+            self.in_flight += 1
+            try:
+                return await asyncio.wait_for(coroutine, self.request_timeout)
+            finally:
+                self.in_flight -= 1
+                self.served += 1
+
+    def run_blocking(self, fn, *args):
+        return asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    @staticmethod
+    def topic_param(params):
+        topic = ' '.join(str(params.get('topic') or '').split())
+        if not topic:
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'Thiếu tham số topic')
+        if len(topic) > 200:
+            raise HttpError(HTTPStatus.BAD_REQUEST, 'Chủ đề quá dài (tối đa 200 ký tự)')
+        return topic
+
+    async def health(self, params):
+        scheduler = self.crew.llm_scheduler.stats()
+        return {
+            'status': 'ok',
+            'uptime': round(time.time() - self.started_at, 1),
+            'workers': self.workers,
+            'in_flight': self.in_flight,
+            'served': self.served,
+            'llm': {key: scheduler[key] for key in ('active', 'queued', 'rejected')},
+        }
+
+    async def metrics(self, params):
+        return metrics.render_prometheus()
+
+    async def search(self, params):
+        topic = self.topic_param(params)
+        articles = await self.run_limited(self.crew.find_topic_articles_async(topic))
+        return {'topic': topic, 'articles': [article_json(article) for article in articles]}
+
+    async def report(self, params):
+        topic = self.topic_param(params)
+        use_ai = str(params.get('ai', '')).lower() in ('1', 'true', 'yes', 'c')
+
+        async def build():
+            articles = await self.crew.find_topic_articles_async(topic)
+            if use_ai and articles:
+                report = await self.run_blocking(self.crew.summarize_with_ollama, topic, articles)
+            else:
+                report = await self.run_blocking(self.crew.build_search_report, topic, articles)
+            return articles, report
+
+        articles, report = await self.run_limited(build())
+        return {'topic': topic, 'ai': use_ai, 'articles': [article_json(article) for article in articles], 'report': report}
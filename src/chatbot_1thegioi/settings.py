@@ -0,0 +1,151 @@
+"""Cấu hình runtime của chatbot_1thegioi - đọc từ biến môi trường (.env)"""
+import os
+
+
+def env_int(name, default):
+    """Đọc biến môi trường kiểu int, trả về default nếu thiếu hoặc sai định dạng"""
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_float(name, default):
+    """Đọc biến môi trường kiểu float, trả về default nếu thiếu hoặc sai định dạng"""
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+# HTTP client dùng chung - số pool theo host và số kết nối keep-alive mỗi host
+HTTP_POOL_CONNECTIONS = env_int('CHATBOT_HTTP_POOL_CONNECTIONS', 10)
+HTTP_POOL_MAXSIZE = env_int('CHATBOT_HTTP_POOL_MAXSIZE', 20)
+HTTP_MAX_RETRIES = env_int('CHATBOT_HTTP_MAX_RETRIES', 1)
+# Số request đồng thời tối đa tới cùng một host
+HTTP_MAX_PER_HOST = env_int('CHATBOT_HTTP_MAX_PER_HOST', 4)
+# Token bucket theo host: số request mỗi giây và burst mặc định
+HTTP_RATE = env_float('CHATBOT_HTTP_RATE', 5)
+HTTP_BURST = env_float('CHATBOT_HTTP_BURST', 8)
+# Tốc độ riêng từng host dạng 'host=rate/burst,...' (rate 0 = không giới hạn, ví dụ Ollama cục bộ)
+HTTP_HOST_RATES = os.getenv(
+    'CHATBOT_HTTP_HOST_RATES',
+    'www.google.com=0.5/2,www.bing.com=0.5/2,www.googleapis.com=2/4,localhost=0,127.0.0.1=0'
+)
+# Host trả 429/503 không kèm Retry-After thì tạm dừng bấy nhiêu giây; Retry-After dài hơn mức trần bị cắt
+HTTP_RATE_PENALTY = env_float('CHATBOT_HTTP_RATE_PENALTY', 5)
+HTTP_MAX_RETRY_AFTER = env_float('CHATBOT_HTTP_MAX_RETRY_AFTER', 60)
+# Chuyển hướng origin sang máy chủ khác dạng 'https://1thegioi.vn=http://127.0.0.1:8765/1thegioi.vn,...'
+# (benchmark offline); cache, rate limiter và kết quả vẫn dùng URL gốc
+HTTP_HOST_OVERRIDES = os.getenv('CHATBOT_HTTP_HOST_OVERRIDES', '')
+
+# Số worker quét chuyên mục / tải bài song song
+CRAWL_WORKERS = env_int('CHATBOT_CRAWL_WORKERS', 8)
+
+# Số tầng tìm kiếm (direct, Google API, Google, sitemap) chạy đồng thời
+SEARCH_TIER_WORKERS = env_int('CHATBOT_SEARCH_TIER_WORKERS', 4)
+
+USER_AGENT = os.getenv(
+    'CHATBOT_USER_AGENT',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+
+# Header mặc định cho mọi request (1thegioi.vn, sitemap, Ollama...)
+DEFAULT_HEADERS = {
+    'User-Agent': USER_AGENT,
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'vi-VN,vi;q=0.8,en-US;q=0.5,en;q=0.3',
+    'Connection': 'keep-alive',
+}
+
+# Header bổ sung khi truy cập trang kết quả Google/Bing
+SEARCH_ENGINE_HEADERS = {
+    'DNT': '1',
+    'Upgrade-Insecure-Requests': '1',
+    'Cache-Control': 'max-age=0',
+}
+
+# Thư mục lưu cache trên đĩa (nội dung bài viết, HTTP cache...)
+CACHE_DIR = os.getenv('CHATBOT_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'chatbot_1thegioi'))
+
+# Cache nội dung bài viết: bật/tắt, thời gian sống (giây) và số bài tối đa
+ARTICLE_CACHE_ENABLED = os.getenv('CHATBOT_ARTICLE_CACHE', '1') != '0'
+ARTICLE_CACHE_TTL = env_int('CHATBOT_ARTICLE_CACHE_TTL', 7 * 24 * 3600)
+ARTICLE_CACHE_MAX_ENTRIES = env_int('CHATBOT_ARTICLE_CACHE_MAX_ENTRIES', 5000)
+
+# HTTP cache cho trang chuyên mục / sitemap: thời gian tươi mặc định (giây) khi server không gửi Cache-Control
+HTTP_CACHE_ENABLED = os.getenv('CHATBOT_HTTP_CACHE', '1') != '0'
+HTTP_CACHE_DEFAULT_TTL = env_int('CHATBOT_HTTP_CACHE_DEFAULT_TTL', 60)
+
+# Chỉ mục ngược cục bộ: vị trí file và số ứng viên lấy ra trước khi chấm điểm
+SEARCH_INDEX_ENABLED = os.getenv('CHATBOT_SEARCH_INDEX', '1') != '0'
+SEARCH_INDEX_PATH = os.getenv('CHATBOT_SEARCH_INDEX_PATH', os.path.join(CACHE_DIR, 'index.sqlite3'))
+SEARCH_INDEX_CANDIDATES = env_int('CHATBOT_SEARCH_INDEX_CANDIDATES', 30)
+
+# Watcher sitemap/RSS: chu kỳ đồng bộ (giây) và số bài tối đa tải mỗi lượt
+SITEMAP_WATCH_INTERVAL = env_int('CHATBOT_SITEMAP_WATCH_INTERVAL', 600)
+SITEMAP_WATCH_MAX_ARTICLES = env_int('CHATBOT_SITEMAP_WATCH_MAX_ARTICLES', 50)
+
+# Ngưỡng điểm tiêu đề BM25F (thang 0-10: khớp đủ mọi từ của câu hỏi ~10 điểm)
+TITLE_SCORE_THRESHOLD = env_float('CHATBOT_TITLE_SCORE_THRESHOLD', 4.0)
+
+# Số URL tối đa bộ xếp hạng BM25F nhớ để không đếm trùng một bài vào thống kê corpus
+RANKER_MAX_DOCUMENTS = env_int('CHATBOT_RANKER_MAX_DOCUMENTS', 20000)
+
+# Số ứng viên xếp hạng BM25F cao nhất tầng quét trực tiếp đưa vào pool ứng viên
+RANK_FETCH_LIMIT = env_int('CHATBOT_RANK_FETCH_LIMIT', 12)
+
+# Số ứng viên tối đa pool giữ lại từ mọi tầng (chỉ các ứng viên đứng đầu pool mới được tải nội dung)
+CANDIDATE_POOL_SIZE = env_int('CHATBOT_CANDIDATE_POOL_SIZE', 50)
+
+# Engine phân tích HTML: auto (nhanh nhất đã cài), selectolax, lxml hoặc html.parser
+HTML_PARSER = os.getenv('CHATBOT_HTML_PARSER', 'auto')
+
+# Tải bài viết dạng streaming: số ký tự nội dung cần lấy, giới hạn byte đọc mỗi trang và cỡ mỗi đoạn đọc
+ARTICLE_STREAMING = os.getenv('CHATBOT_ARTICLE_STREAMING', '1') != '0'
+ARTICLE_CONTENT_BUDGET = env_int('CHATBOT_ARTICLE_CONTENT_BUDGET', 800)
+ARTICLE_MAX_BYTES = env_int('CHATBOT_ARTICLE_MAX_BYTES', 256 * 1024)
+ARTICLE_CHUNK_SIZE = env_int('CHATBOT_ARTICLE_CHUNK_SIZE', 8 * 1024)
+
+# Ollama: địa chỉ server, model, thời gian chờ token đầu tiên / tổng thời gian sinh (giây) và số token tối đa
+OLLAMA_URL = os.getenv('CHATBOT_OLLAMA_URL', 'http://localhost:11434')
+OLLAMA_MODEL = os.getenv('CHATBOT_OLLAMA_MODEL', 'gemma2:2b')
+OLLAMA_FIRST_TOKEN_TIMEOUT = env_float('CHATBOT_OLLAMA_FIRST_TOKEN_TIMEOUT', 30)
+OLLAMA_TIMEOUT = env_float('CHATBOT_OLLAMA_TIMEOUT', 90)
+OLLAMA_NUM_PREDICT = env_int('CHATBOT_OLLAMA_NUM_PREDICT', 800)
+
+# Hàng đợi LLM: số lượt sinh đồng thời, số lượt chờ tối đa (đầy thì từ chối ngay), thời gian chờ tối đa (giây)
+LLM_CONCURRENCY = env_int('CHATBOT_LLM_CONCURRENCY', 1)
+LLM_MAX_QUEUE = env_int('CHATBOT_LLM_MAX_QUEUE', 4)
+LLM_QUEUE_TIMEOUT = env_float('CHATBOT_LLM_QUEUE_TIMEOUT', 60)
+
+# Cache phần phân tích AI: bật/tắt và số bản tối đa
+SUMMARY_CACHE_ENABLED = os.getenv('CHATBOT_SUMMARY_CACHE', '1') != '0'
+SUMMARY_CACHE_MAX_ENTRIES = env_int('CHATBOT_SUMMARY_CACHE_MAX_ENTRIES', 500)
+
+# Chế độ server HTTP/JSON: địa chỉ, số request tìm kiếm/báo cáo xử lý đồng thời, thời gian tối đa mỗi request
+SERVER_HOST = os.getenv('CHATBOT_SERVER_HOST', '127.0.0.1')
+SERVER_PORT = env_int('CHATBOT_SERVER_PORT', 8080)
+SERVER_WORKERS = env_int('CHATBOT_SERVER_WORKERS', 8)
+SERVER_REQUEST_TIMEOUT = env_float('CHATBOT_SERVER_REQUEST_TIMEOUT', 180)
+SERVER_MAX_BODY = env_int('CHATBOT_SERVER_MAX_BODY', 64 * 1024)
+# Origin được phép gọi API từ trình duyệt, ví dụ https://1thegioi.vn (mặc định rỗng = không gửi header CORS)
+SERVER_CORS_ORIGIN = os.getenv('CHATBOT_SERVER_CORS_ORIGIN', '')
+
+# Mức log (DEBUG hiện cả các lỗi được bỏ qua như trang không tải được, sitemap hỏng...)
+LOG_LEVEL = os.getenv('CHATBOT_LOG_LEVEL', 'WARNING').upper()
+
+# Chế độ profile (--profile): khoảng lấy mẫu stack (giây), số dòng mỗi bảng báo cáo, số khung stack tracemalloc giữ
+PROFILE_SAMPLE_INTERVAL = env_float('CHATBOT_PROFILE_INTERVAL', 0.005)
+PROFILE_TOP = env_int('CHATBOT_PROFILE_TOP', 40)
+PROFILE_TRACEMALLOC_FRAMES = env_int('CHATBOT_PROFILE_TRACEMALLOC_FRAMES', 1)
+
+# Google Custom Search API: hạn mức lượt gọi mỗi ngày, số lượt chừa lại (chạm thì chuyển sang tầng khác),
+# thời gian sống (giây) và số truy vấn tối đa trong cache kết quả
+GOOGLE_CSE_DAILY_QUOTA = env_int('CHATBOT_CSE_DAILY_QUOTA', 100)
+GOOGLE_CSE_QUOTA_RESERVE = env_int('CHATBOT_CSE_QUOTA_RESERVE', 5)
+GOOGLE_CSE_CACHE_TTL = env_int('CHATBOT_CSE_CACHE_TTL', 6 * 3600)
+GOOGLE_CSE_CACHE_MAX_ENTRIES = env_int('CHATBOT_CSE_CACHE_MAX_ENTRIES', 2000)
+
+# Hai bài có SimHash nội dung lệch không quá bấy nhiêu bit (trên 64) được coi là cùng một bài
+SIMHASH_THRESHOLD = env_int('CHATBOT_SIMHASH_THRESHOLD', 3)
@@ -0,0 +1,82 @@
+"""Gộp các lượt gọi trùng nhau đang chạy cùng lúc: lượt đầu làm việc, các lượt sau chờ chung kết quả"""
+import asyncio
+import threading
+from concurrent.futures import Future
+
+
+def normalize_topic(topic):
+    """Khoá gộp cho chủ đề: chữ thường, gộp khoảng trắng"""
+    return ' '.join(str(topic or '').lower().split())
+
+
+class SingleFlight:
+    """Bảng các lượt đang chạy theo khoá, dùng được từ nhiều luồng và nhiều event loop.
+
+    Kết quả (hoặc exception) của lượt đầu được chia cho mọi lượt cùng khoá đến trong lúc nó
+    còn chạy; xong thì khoá được xoá, lượt gọi sau đó chạy lại từ đầu (cache lo phần còn lại).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.counters = {'leaders': 0, 'shared': 0}
+
+    def _join(self, key):
+        """(future, là lượt đầu?) cho khoá"""
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.counters['shared'] += 1
+                return future, False
+            future = Future()
+            self._calls[key] = future
+            self.counters['leaders'] += 1
+            return future, True
+
+    def _finish(self, key, future):
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def do(self, key, fn, *args):
+        """Chạy fn(*args) một lần cho mọi lượt gọi đồng thời cùng khoá; trả về (kết quả, dùng chung?)"""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            self._finish(key, future)
+        future.set_result(result)
+        return result, False
+
+    async def do_async(self, key, factory):
+        """Bản async của do: factory() tạo coroutine, chỉ lượt đầu await nó.
+
+        Lượt đầu bị huỷ (ví dụ timeout của một request) không làm hỏng các lượt đang chờ:
+        công việc chung vẫn chạy tiếp đến khi xong.
+        """
+        future, leader = self._join(key)
+        if leader:
+            task = asyncio.ensure_future(factory())
+
+            def settle(task):
+                self._finish(key, future)
+                if task.cancelled():
+                    future.set_exception(asyncio.CancelledError())
+                elif task.exception() is not None:
+                    future.set_exception(task.exception())
+                else:
+                    future.set_result(task.result())
+
+            task.add_done_callback(settle)
+        # shield: huỷ một lượt chờ không huỷ future dùng chung
+        return await asyncio.shield(asyncio.wrap_future(future)), not leader
+
+    def stats(self):
+        with self._lock:
+            return {'in_flight': len(self._calls), **self.counters}
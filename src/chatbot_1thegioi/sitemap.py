@@ -0,0 +1,83 @@
+"""Đọc sitemap, sitemap index và RSS/Atom của 1thegioi.vn thành danh sách URL có lastmod"""
+from xml.etree import ElementTree as ET
+
+from chatbot_1thegioi.urls import canonical_url
+
+
+def _local(tag):
+    """Bỏ namespace khỏi tên thẻ XML: '{ns}loc' -> 'loc'"""
+    return tag.rsplit('}', 1)[-1].lower() if isinstance(tag, str) else ''
+
+
+def _child_text(element, *names):
+    for child in element:
+        if _local(child.tag) in names and child.text and child.text.strip():
+            return child.text.strip()
+    return ''
+
+
+def parse_sitemap(content):
+    """Phân tích nội dung XML, trả về (entries, child_sitemaps).
+
+    entries là list dict {'url' (đã chuẩn hoá), 'lastmod', 'title'} cho từng bài (urlset, RSS item, Atom entry);
+    child_sitemaps là list dict {'url', 'lastmod'} khi đây là sitemap index.
+    """
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', errors='ignore')
+
+    root = ET.fromstring(content.strip())
+    entries = []
+    child_sitemaps = []
+
+    for element in root.iter():
+        name = _local(element.tag)
+
+        if name == 'sitemap':
+            loc = _child_text(element, 'loc')
+            if loc:
+                child_sitemaps.append({'url': loc, 'lastmod': _child_text(element, 'lastmod')})
+
+        elif name == 'url':
+            loc = _child_text(element, 'loc')
+            if loc:
+                entries.append({
+                    'url': canonical_url(loc),
+                    'lastmod': _child_text(element, 'lastmod'),
+                    'title': _child_text(element, 'title', 'name'),
+                })
+
+        elif name == 'item':
+            link = _child_text(element, 'link')
+            if link:
+                entries.append({
+                    'url': canonical_url(link),
+                    'lastmod': _child_text(element, 'pubdate', 'date', 'updated'),
+                    'title': _child_text(element, 'title'),
+                })
+
+        elif name == 'entry':
+            link = ''
+            for child in element:
+                if _local(child.tag) == 'link':
+                    link = child.get('href') or (child.text or '').strip()
+                    if link:
+                        break
+            if link:
+                entries.append({
+                    'url': canonical_url(link),
+                    'lastmod': _child_text(element, 'updated', 'published'),
+                    'title': _child_text(element, 'title'),
+                })
+
+    return entries, child_sitemaps
+
+
+def sitemaps_from_robots(text):
+    """Lấy các URL khai báo 'Sitemap:' trong robots.txt"""
+    urls = []
+    for line in text.split('\n'):
+        if line.lower().startswith('sitemap:'):
+            url = line.split(':', 1)[1].strip()
+            if url and url not in urls:
+                urls.append(url)
+    return urls
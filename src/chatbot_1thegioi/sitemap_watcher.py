@@ -0,0 +1,148 @@
+"""Đồng bộ định kỳ sitemap/RSS của 1thegioi.vn vào chỉ mục cục bộ"""
+import logging
+import threading
+import time
+
+from chatbot_1thegioi import settings
+from chatbot_1thegioi.sitemap import parse_sitemap, sitemaps_from_robots
+
+logger = logging.getLogger(__name__)
+
+
+class SitemapWatcher:
+    """Theo dõi sitemap, sitemap index và RSS; chỉ tải các bài mới hoặc có lastmod thay đổi.
+
+    Sitemap/feed được tải qua HttpClient.get_cached nên mỗi lượt không đổi chỉ tốn
+    vài request 304. Sitemap con có lastmod trùng lần trước thì bỏ qua hẳn.
+    """
+
+    def __init__(self, crew, interval=None, max_articles_per_poll=None):
+        self.crew = crew
+        self.index = crew.search_index
+        self.interval = interval or settings.SITEMAP_WATCH_INTERVAL
+        self.max_articles_per_poll = max_articles_per_poll or settings.SITEMAP_WATCH_MAX_ARTICLES
+
+        self.last_result = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def discover_feeds(self):
+        """Danh sách sitemap/feed gốc, kể cả sitemap khai báo trong robots.txt"""
+        feeds = list(self.crew.SITEMAP_URLS)
+        try:
+            response = self.crew.http.get_cached('https://1thegioi.vn/robots.txt', timeout=15)
+            if response.status_code == 200:
+                for url in sitemaps_from_robots(response.text):
+                    if url not in feeds:
+                        feeds.append(url)
+        except Exception as e:
+            logger.debug("Không đọc được robots.txt - dùng danh sách sitemap mặc định: %s", e)
+        return feeds
+
+    def poll_once(self):
+        """Một lượt đồng bộ; trả về thống kê số feed đã đọc, số bài thay đổi và số bài đã tải"""
+        known_feeds = self.index.feed_lastmods()
+        known_articles = self.index.lastmods()
+
+        queue = [(url, '') for url in self.discover_feeds()]
+        visited = set()
+        changed = {}  # url bài -> entry sitemap
+        feed_changes = {}  # url feed -> (lastmod, các url bài thay đổi trong feed)
+        feeds_read = 0
+
+        while queue:
+            feed_url, feed_lastmod = queue.pop(0)
+            if feed_url in visited:
+                continue
+            visited.add(feed_url)
+
+            # Sitemap con không đổi lastmod kể từ lần trước thì không cần đọc lại
+            if feed_lastmod and known_feeds.get(feed_url) == feed_lastmod:
+                continue
+
+            try:
+                response = self.crew.http.get_cached(feed_url, timeout=15)
+                if response.status_code != 200:
+                    continue
+                entries, child_sitemaps = parse_sitemap(response.content)
+            except Exception as e:
+                logger.debug("Bỏ qua feed %s (lỗi tải hoặc không phải XML): %s", feed_url, e)
+                continue
+
+            feeds_read += 1
+            queue.extend((child['url'], child['lastmod']) for child in child_sitemaps)
+
+            feed_urls = set()
+            for entry in entries:
+                url = entry['url']
+                if '1thegioi.vn' not in url or not url.endswith('.html'):
+                    continue
+                if url in known_articles and (not entry['lastmod'] or known_articles[url] == entry['lastmod']):
+                    continue  # Đã có và không đổi
+                changed.setdefault(url, entry)
+                feed_urls.add(url)
+            feed_changes[feed_url] = (feed_lastmod, feed_urls)
+
+        # Bài mới nhất trước, giới hạn số bài tải mỗi lượt
+        pending = sorted(changed.values(), key=lambda entry: entry['lastmod'], reverse=True)
+        pending = pending[:self.max_articles_per_poll]
+
+        futures = [
+            (entry, self.crew.submit(self.crew.fetch_article, entry['url'], entry['url'] in known_articles))
+            for entry in pending
+        ]
+        fetched = set()
+        for entry, future in futures:
+            fetched.add(entry['url'])
+            try:
+                article = future.result()
+            except Exception as e:
+                logger.debug("Lỗi tải bài %s - thử lại ở lượt sau: %s", entry['url'], e)
+                fetched.discard(entry['url'])
+                continue
+            if not article or not article['content']:
+                continue
+
+            existing = self.index.get(entry['url'])
+            self.index.add(
+                entry['url'],
+                entry['title'] or article['title'] or (existing or {}).get('title', ''),
+                article['content'],
+                section=(existing or {}).get('section', ''),
+                published=article.get('published', ''),
+                lastmod=entry['lastmod']
+            )
+
+        # Chỉ ghi nhận lastmod của feed khi mọi bài thay đổi trong đó đã được xử lý
+        for feed_url, (feed_lastmod, feed_urls) in feed_changes.items():
+            self.index.mark_feed(feed_url, feed_lastmod if feed_urls <= fetched else '')
+
+        self.last_result = {
+            'feeds': feeds_read,
+            'changed': len(changed),
+            'fetched': len(fetched),
+            'finished_at': time.time(),
+        }
+        return self.last_result
+
+    def run(self):
+        """Vòng lặp nền: đồng bộ ngay rồi lặp lại sau mỗi interval giây cho tới khi stop()"""
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                # Lỗi một lượt đồng bộ không được làm dừng watcher
+                logger.warning("Lỗi đồng bộ sitemap: %s", e)
+            self._stop.wait(self.interval)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name='sitemap-watcher', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
@@ -0,0 +1,129 @@
+"""Cache phần phân tích AI theo nội dung (SQLite): cùng model, prompt và bài viết thì không gọi lại Ollama"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from chatbot_1thegioi import settings
+
+
+def content_hash(text):
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def summary_key(model, prompt_version, topic, articles):
+    """Khoá cache: hash của model, phiên bản prompt, topic và (URL, hash nội dung) từng bài"""
+    material = {
+        'model': model,
+        'prompt_version': prompt_version,
+        'topic': ' '.join((topic or '').lower().split()),
+        'articles': [(article.get('url', ''), content_hash(article.get('content', ''))) for article in articles],
+    }
+    return hashlib.sha256(json.dumps(material, ensure_ascii=False, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class SummaryCache:
+    """Lưu phần phân tích do Ollama sinh, khoá theo summary_key.
+
+    Khi vượt số bản ghi tối đa, bản ít được đọc nhất bị xoá trước; số lần trúng/trượt
+    được cộng dồn trên đĩa để báo tỉ lệ trúng cache.
+    """
+
+    def __init__(self, path=None, max_entries=None):
+        self.path = path or os.path.join(settings.CACHE_DIR, 'summaries.sqlite3')
+        self.max_entries = settings.SUMMARY_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS summaries (
+                key TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                topic TEXT,
+                analysis TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE INDEX IF NOT EXISTS idx_summaries_accessed ON summaries (accessed_at);
+            CREATE TABLE IF NOT EXISTS counters (
+                name TEXT PRIMARY KEY,
+                value INTEGER NOT NULL
+            );
+        """)
+        self._conn.commit()
+
+    def get(self, key):
+        """Phần phân tích đã lưu cho key, hoặc None"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute("SELECT analysis FROM summaries WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._count('misses')
+            else:
+                self._conn.execute(
+                    "UPDATE summaries SET accessed_at = ?, hits = hits + 1 WHERE key = ?", (now, key)
+                )
+                self._count('hits')
+            self._conn.commit()
+        return row[0] if row else None
+
+    def put(self, key, model, topic, analysis):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, model, topic, analysis, created_at, accessed_at, hits) VALUES (?, ?, ?, ?, ?, ?, 0)",
+                (key, model, topic, analysis, now, now)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _count(self, name):
+        """Cộng một vào bộ đếm (gọi khi đang giữ lock)"""
+        self._conn.execute(
+            "INSERT INTO counters (name, value) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1",
+            (name,)
+        )
+
+    def _evict(self):
+        """Xoá các bản ít được đọc nhất khi vượt max_entries (gọi khi đang giữ lock)"""
+        if not self.max_entries:
+            return
+        count = self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM summaries WHERE key IN (SELECT key FROM summaries ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def purge(self):
+        """Xoá toàn bộ bản phân tích đã lưu (giữ bộ đếm), trả về số bản đã xoá"""
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM summaries")
+            self._conn.commit()
+        return cursor.rowcount
+
+    def stats(self):
+        with self._lock:
+            entries, analysis_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(analysis)), 0) FROM summaries"
+            ).fetchone()
+            counters = dict(self._conn.execute("SELECT name, value FROM counters").fetchall())
+        hits = counters.get('hits', 0)
+        misses = counters.get('misses', 0)
+        return {
+            'path': self.path,
+            'entries': entries,
+            'analysis_bytes': analysis_bytes,
+            'max_entries': self.max_entries,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / (hits + misses) if hits + misses else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
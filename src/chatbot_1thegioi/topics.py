@@ -0,0 +1,145 @@
+"""Bảng chủ đề dùng khi chấm điểm: từ bắt buộc / từ cấm theo nhóm chủ đề, từ không liên quan và từ khoá mở rộng"""
+from chatbot_1thegioi.matcher import compile_terms
+
+# Nhóm chủ đề theo thứ tự ưu tiên: topic chứa một từ kích hoạt thì áp dụng bộ từ bắt buộc/từ cấm tương ứng
+TOPIC_CATEGORIES = [
+    {
+        'name': 'y_te',
+        'triggers': ['y tế', 'sức khỏe', 'health', 'medical', 'bệnh viện', 'bác sĩ'],
+        'required': ['y tế', 'sức khỏe', 'health', 'medical', 'bệnh viện', 'bác sĩ', 'doctor', 'điều trị', 'bệnh nhân', 'phòng khám', 'thuốc', 'vaccine', 'cấp cứu', 'phẫu thuật', 'sinh', 'thai', 'nhi', 'khoa', 'viện', 'cdc', 'y khoa', 'nhập viện', 'hồi sức', 'icu'],
+        'forbidden': ['công nghệ', 'ai', 'blockchain', 'thể thao', 'giải trí', 'chính trị', 'kinh tế'],
+    },
+    {
+        'name': 'cong_nghe',
+        'triggers': ['công nghệ', 'technology', 'ai', 'tech', 'blockchain'],
+        'required': ['công nghệ', 'technology', 'tech', 'ai', 'artificial intelligence', 'blockchain', 'crypto', 'digital', 'innovation', 'internet', 'software', 'app', 'smartphone'],
+        'forbidden': ['y tế', 'bệnh viện', 'thể thao', 'giải trí', 'chiến tranh', 'quân sự'],
+    },
+    {
+        'name': 'quan_su',
+        'triggers': ['chiến tranh', 'quân sự', 'war', 'military', 'vũ khí'],
+        'required': ['chiến tranh', 'war', 'ukraine', 'russia', 'quân sự', 'military', 'vũ khí', 'weapon', 'nato', 'army', 'quân đội', 'quốc phòng', 'patriot', 'tên lửa', 'missile', 'tank', 'fighter', 'aircraft', 'navy', 'airforce', 'drone', 'radar', 'defense', 'tàu chiến', 'máy bay', 'hạm đội', 'binh sĩ', 'tác chiến', 'chiến đấu', 'phòng không', 'tấn công', 'pháo', 'súng', 'b-52', 'f-16', 'himars', 'triều tiên', 'hàn quốc', 'israel', 'palestine', 'gaza'],
+        'forbidden': ['y tế', 'công nghệ', 'ai', 'thể thao', 'giải trí', 'kinh tế'],
+    },
+    {
+        'name': 'kinh_te',
+        'triggers': ['kinh tế', 'economy', 'tài chính', 'finance'],
+        'required': ['kinh tế', 'economy', 'tài chính', 'finance', 'chứng khoán', 'stock', 'market', 'investment', 'banking', 'trade', 'doanh nghiệp', 'company'],
+        'forbidden': ['y tế', 'thể thao', 'giải trí', 'thiên tai', 'chiến tranh'],
+    },
+    {
+        'name': 'the_thao',
+        'triggers': ['thể thao', 'sports', 'bóng đá', 'football'],
+        'required': ['thể thao', 'sports', 'bóng đá', 'football', 'soccer', 'world cup', 'olympic', 'vô địch', 'champion', 'thi đấu', 'giải đấu'],
+        'forbidden': ['y tế', 'công nghệ', 'ai', 'chính trị', 'kinh tế'],
+    },
+    {
+        'name': 'moi_truong',
+        'triggers': ['môi trường', 'environment', 'sinh thái', 'khí hậu', 'climate'],
+        'required': ['môi trường', 'environment', 'sinh thái', 'ecology', 'bảo tồn', 'conservation', 'ô nhiễm', 'pollution', 'khí hậu', 'climate', 'carbon', 'xanh', 'green', 'bền vững', 'sustainable', 'rác thải', 'waste', 'tái chế', 'recycle', 'năng lượng tái tạo', 'renewable', 'biodiversity', 'đa dạng sinh học'],
+        'forbidden': ['quân sự', 'chiến tranh', 'thể thao', 'giải trí', 'chính trị'],
+    },
+    {
+        'name': 'giao_duc',
+        'triggers': ['giáo dục', 'education', 'trường học', 'school', 'đại học'],
+        'required': ['giáo dục', 'education', 'trường học', 'school', 'đại học', 'university', 'học sinh', 'student', 'giáo viên', 'teacher', 'học tập', 'learning', 'đào tạo', 'training', 'khóa học', 'course'],
+        'forbidden': ['quân sự', 'chiến tranh', 'thể thao', 'giải trí'],
+    },
+]
+
+# Từ không liên quan theo chủ đề, cộng thêm các từ quảng cáo chung
+IRRELEVANT_RULES = [
+    (['thiên tai', 'động đất', 'lũ lụt', 'bão', 'tsunami'], ['ai', 'chatgpt', 'technology', 'tech', 'blockchain', 'crypto', 'robot']),
+    (['công nghệ', 'ai', 'tech', 'blockchain'], ['thiên tai', 'động đất', 'lũ lụt', 'bão', 'thể thao', 'giải trí']),
+    (['chính trị', 'bầu cử', 'tổng thống', 'ngoại giao'], ['ai', 'chatgpt', 'technology', 'thiên tai', 'thể thao']),
+    (['thể thao', 'bóng đá', 'world cup', 'olympic'], ['chính trị', 'ai', 'technology', 'thiên tai', 'kinh tế']),
+    (['kinh tế', 'tài chính', 'chứng khoán', 'ngân hàng'], ['thể thao', 'bóng đá', 'thiên tai', 'giải trí']),
+]
+GENERAL_IRRELEVANT = ['quảng cáo', 'ads', 'advertisement', 'sponsored', 'promotion']
+
+# Từ điển từ khóa liên quan CHÍNH XÁC - mỗi chủ đề chỉ có từ khóa liên quan trực tiếp
+KEYWORD_RELATIONS = {
+    # Y TẾ - Mở rộng từ khóa
+    'y tế': ['y tế', 'sức khỏe', 'y học', 'điều trị', 'bệnh viện', 'bác sĩ', 'y khoa', 'chăm sóc sức khỏe', 'phòng khám', 'bệnh nhân', 'thuốc', 'y tế công cộng', 'bảo hiểm y tế', 'hệ thống y tế', 'khám bệnh', 'chữa bệnh', 'cấp cứu', 'phẫu thuật', 'sinh', 'đẻ', 'thai sản', 'nhi khoa', 'tim mạch', 'ung thư', 'cancer', 'vaccine', 'tiêm chủng', 'hồi sức', 'icu', 'bệnh', 'tử vong', 'ca bệnh', 'nhiễm trùng', 'vi khuẩn', 'virus', 'dịch bệnh', 'kháng sinh', 'antibiotic', 'tế bào', 'gene', 'dna', 'xét nghiệm', 'chẩn đoán', 'triệu chứng', 'hội chứng', 'syndrome'],
+    'sức khỏe': ['sức khỏe', 'y tế', 'khỏe mạnh', 'chăm sóc sức khỏe', 'tập luyện', 'dinh dưỡng', 'bệnh', 'điều trị', 'phòng bệnh'],
+    'bệnh viện': ['bệnh viện', 'y tế', 'bác sĩ', 'điều trị', 'phòng khám', 'khoa', 'viện', 'trung tâm y tế', 'phẫu thuật', 'cấp cứu', 'nhập viện', 'xuất viện'],
+    'bác sĩ': ['bác sĩ', 'doctor', 'y tế', 'điều trị', 'khám bệnh', 'chữa bệnh', 'bệnh viện', 'phòng khám', 'y khoa', 'chuyên khoa'],
+    'covid': ['covid', 'coronavirus', 'đại dịch', 'sars-cov-2', 'y tế', 'vaccine', 'f0', 'f1', 'cách ly', 'phong tỏa'],
+    'vaccine': ['vaccine', 'tiêm chủng', 'miễn dịch', 'y tế', 'phòng bệnh', 'vắc xin'],
+
+    # CÔNG NGHỆ - Mở rộng
+    'công nghệ': ['công nghệ', 'technology', 'tech', 'kỹ thuật', 'số hóa', 'đổi mới', 'innovation', 'digital', 'IT', 'phần mềm', 'ứng dụng', 'internet'],
+    'ai': ['AI', 'artificial intelligence', 'trí tuệ nhân tạo', 'học máy', 'machine learning', 'deep learning', 'neural network', 'chatgpt', 'công nghệ'],
+    'blockchain': ['blockchain', 'tiền mã hóa', 'cryptocurrency', 'bitcoin', 'crypto', 'công nghệ'],
+    'technology': ['technology', 'công nghệ', 'tech', 'innovation', 'digital'],
+
+    # KINH TẾ - Mở rộng
+    'kinh tế': ['kinh tế', 'economy', 'tăng trưởng', 'suy thoái', 'lạm phát', 'GDP', 'thị trường', 'tài chính', 'doanh nghiệp', 'đầu tư'],
+    'tài chính': ['tài chính', 'finance', 'ngân hàng', 'đầu tư', 'investment', 'tiền tệ', 'kinh tế'],
+    'chứng khoán': ['chứng khoán', 'stock market', 'thị trường', 'cổ phiếu', 'giao dịch', 'tài chính'],
+
+    # QUÂN SỰ - Mở rộng
+    'quân sự': ['quân sự', 'military', 'quân đội', 'quốc phòng', 'defense', 'vũ khí', 'weapon', 'chiến tranh', 'war', 'an ninh', 'security', 'bộ quốc phòng', 'army', 'navy', 'air force'],
+    'chiến tranh': ['chiến tranh', 'war', 'conflict', 'xung đột', 'quân sự', 'military', 'ukraine', 'russia', 'nato', 'quân đội', 'weapon', 'vũ khí'],
+    'quân đội': ['quân đội', 'army', 'military', 'quân sự', 'lính', 'soldier', 'chiến sĩ', 'defense'],
+    'vũ khí': ['vũ khí', 'weapon', 'quân sự', 'military', 'tên lửa', 'missile', 'máy bay chiến đấu'],
+
+    # THIÊN TAI - Mở rộng
+    'thiên tai': ['thiên tai', 'natural disaster', 'thảm họa', 'disaster', 'khẩn cấp', 'emergency', 'cứu hộ', 'rescue', 'bão', 'storm', 'lũ lụt', 'flood', 'động đất', 'earthquake'],
+    'động đất': ['động đất', 'earthquake', 'dư chấn', 'tâm chấn', 'địa chấn', 'richter', 'thiên tai'],
+    'lũ lụt': ['lũ lụt', 'flood', 'ngập lụt', 'nước lũ', 'mưa lớn', 'thiên tai'],
+    'bão': ['bão', 'storm', 'typhoon', 'siêu bão', 'gió mạnh', 'thiên tai'],
+
+    # CHÍNH TRỊ - Mở rộng  
+    'chính trị': ['chính trị', 'politics', 'government', 'nhà nước', 'quốc hội', 'parliament', 'chính sách', 'policy', 'bộ trưởng', 'minister'],
+    'bầu cử': ['bầu cử', 'election', 'vote', 'ứng cử viên', 'candidate', 'phiếu bầu', 'campaign'],
+    'tổng thống': ['tổng thống', 'president', 'chính phủ', 'government', 'lãnh đạo', 'leader'],
+
+    # THỂ THAO - Mở rộng
+    'thể thao': ['thể thao', 'sports', 'sport', 'giải đấu', 'tournament', 'thi đấu', 'competition', 'vô địch', 'champion'],
+    'bóng đá': ['bóng đá', 'football', 'soccer', 'World Cup', 'FIFA', 'premier league', 'thể thao'],
+    'tennis': ['tennis', 'Wimbledon', 'US Open', 'thể thao'],
+    'olympic': ['Olympic', 'Olympics', 'Thế vận hội', 'thể thao'],
+
+    # MÔI TRƯỜNG - TỐI ƯU HÓA
+    'môi trường': ['môi trường', 'environment', 'sinh thái', 'ecology', 'bảo tồn', 'conservation', 'ô nhiễm', 'pollution', 'khí hậu', 'climate', 'carbon', 'xanh', 'green', 'bền vững', 'sustainable', 'rác thải', 'waste', 'tái chế', 'recycle', 'năng lượng tái tạo', 'renewable energy', 'biodiversity', 'đa dạng sinh học'],
+    'biến đổi khí hậu': ['biến đổi khí hậu', 'climate change', 'nóng lên toàn cầu', 'global warming', 'môi trường', 'carbon', 'khí thải', 'emissions'],
+    'ô nhiễm': ['ô nhiễm', 'pollution', 'môi trường', 'khí thải', 'nước thải', 'rác thải', 'chất độc', 'toxic'],
+    'năng lượng tái tạo': ['năng lượng tái tạo', 'renewable energy', 'solar', 'wind', 'điện mặt trời', 'điện gió', 'xanh', 'green energy'],
+
+    # GIÁO DỤC
+    'giáo dục': ['giáo dục', 'education', 'trường học', 'school', 'đại học', 'university', 'học sinh', 'student', 'giáo viên', 'teacher'],
+}
+
+# Từ đồng nghĩa tiếng Anh/Việt thêm vào từ khoá mở rộng
+KEYWORD_SYNONYMS = {
+    'y tế': ['healthcare', 'medical', 'health'],
+    'công nghệ': ['technology', 'tech', 'innovation'],
+    'kinh tế': ['economy', 'economic', 'finance'],
+    'chính trị': ['politics', 'political', 'government'],
+    'thể thao': ['sports', 'sport', 'athletic'],
+    'quân sự': ['military', 'defense', 'army'],
+    'thiên tai': ['disaster', 'natural disaster', 'emergency']
+}
+
+
+def _mentions(topic, triggers):
+    return bool(compile_terms(triggers).matches(topic))
+
+
+def topic_category(topic):
+    """Nhóm chủ đề đầu tiên có từ kích hoạt xuất hiện trong topic, hoặc None"""
+    for category in TOPIC_CATEGORIES:
+        if _mentions(topic, category['triggers']):
+            return category
+    return None
+
+
+def irrelevant_terms(topic):
+    """Danh sách từ không liên quan đến topic"""
+    terms = []
+    for triggers, rule_terms in IRRELEVANT_RULES:
+        if _mentions(topic, triggers):
+            terms.extend(rule_terms)
+            break
+    return terms + GENERAL_IRRELEVANT
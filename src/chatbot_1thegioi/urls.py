@@ -0,0 +1,85 @@
+"""Chuẩn hoá URL bài viết để dùng làm khoá cache và so trùng"""
+import re
+import urllib.parse
+
+SITE_HOST = '1thegioi.vn'
+
+# Tham số theo dõi/quảng cáo không đổi nội dung trang
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid', '_ga', '_gl',
+    'zarsrc', 'gidzl', 'ref_src', 'spm',
+}
+
+# Tham số chỉ vô nghĩa trên 1thegioi.vn - ở site khác 'ref'/'amp' có thể chọn nội dung (mã giới thiệu, bản trang)
+SITE_TRACKING_PARAMS = {'ref', 'amp'}
+
+# Host phụ của cùng một trang: bản www, bản di động, bản AMP
+HOST_PREFIXES = ('www.', 'm.', 'amp.')
+
+# Bản cache AMP của Google: https://<host>.cdn.ampproject.org/c/s/1thegioi.vn/...
+AMP_CACHE_RE = re.compile(r'^/[cv]/(?:s/)?(?P<rest>.+)$')
+
+
+def _strip_amp_path(path):
+    """Bỏ dấu hiệu AMP trong đường dẫn: /amp/x.html, /x.html/amp, /x.amp.html"""
+    if path.startswith('/amp/'):
+        path = path[4:]
+    for suffix in ('/amp/', '/amp'):
+        if path.endswith(suffix):
+            path = path[:-len(suffix)]
+    if path.endswith('.amp.html'):
+        path = path[:-len('.amp.html')] + '.html'
+    return path or '/'
+
+
+def is_site_host(host):
+    """Host thuộc 1thegioi.vn (kể cả www./m./amp.), không nhận host chỉ có đuôi giống như evil1thegioi.vn"""
+    return host == SITE_HOST or host.endswith('.' + SITE_HOST)
+
+
+def canonical_url(url):
+    """Đưa URL về dạng chuẩn để bản http/https, www/m/amp, tham số theo dõi và fragment của cùng bài trùng nhau.
+
+    URL tương đối (không có host) trả về ''. Với 1thegioi.vn: luôn https, bỏ www./m./amp., bỏ dấu hiệu AMP
+    trong đường dẫn và tham số 'ref'/'amp'. Với mọi host:
+    host chữ thường, bỏ cổng mặc định, gộp '//' trong đường dẫn, bỏ tham số theo dõi (utm_*, fbclid...)
+    và sắp xếp các tham số còn lại.
+    """
+    if not url:
+        return url
+
+    parts = urllib.parse.urlsplit(url.strip())
+    host = (parts.hostname or '').lower()
+    # URL tương đối (không có host) không chuẩn hoá được - để nơi gọi tự ghép với trang gốc
+    if not host:
+        return ''
+    scheme = (parts.scheme or 'https').lower()
+    path = re.sub(r'/{2,}', '/', parts.path or '/')
+
+    # Mở bọc bản cache AMP của Google
+    if host.endswith('.cdn.ampproject.org'):
+        match = AMP_CACHE_RE.match(path)
+        if match:
+            return canonical_url('https://' + match.group('rest'))
+
+    try:
+        port = parts.port if parts.port not in (80, 443) else None
+    except ValueError:
+        port = None
+
+    dropped = TRACKING_PARAMS
+    if is_site_host(host):
+        scheme = 'https'
+        dropped = TRACKING_PARAMS | SITE_TRACKING_PARAMS
+        for prefix in HOST_PREFIXES:
+            if host.startswith(prefix):
+                host = host[len(prefix):]
+                break
+        path = _strip_amp_path(path)
+
+    query = urllib.parse.urlencode(sorted(
+        (name, value) for name, value in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith('utm_') and name.lower() not in dropped
+    ))
+    netloc = f'{host}:{port}' if port else host
+    return urllib.parse.urlunsplit((scheme, netloc, path, query, ''))
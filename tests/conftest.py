@@ -0,0 +1,9 @@
+"""Cấu hình chung cho test: import gói từ src/ và dùng thư mục cache tạm"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+# settings đọc biến môi trường lúc import - không để test ghi vào cache thật của người dùng
+os.environ.setdefault('CHATBOT_CACHE_DIR', tempfile.mkdtemp(prefix='chatbot_1thegioi_test_'))
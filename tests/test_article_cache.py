@@ -0,0 +1,94 @@
+import sqlite3
+import time
+
+import pytest
+
+from chatbot_1thegioi.article_cache import ArticleCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ArticleCache(str(tmp_path / 'articles.sqlite3'), ttl=3600, max_entries=2)
+    yield cache
+    cache.close()
+
+
+def age(cache, url, seconds):
+    """Lùi thời điểm tải của một bài về quá khứ"""
+    with cache._lock:
+        cache._conn.execute("UPDATE articles SET fetched_at = fetched_at - ? WHERE url = ?", (seconds, url))
+        cache._conn.commit()
+
+
+def test_put_and_get_by_canonical_url(cache):
+    cache.put('http://www.1thegioi.vn/a-1.html#top', 'Nội dung bài', 'Tiêu đề')
+    entry = cache.get('https://1thegioi.vn/a-1.html')
+    assert entry['url'] == 'https://1thegioi.vn/a-1.html'
+    assert (entry['title'], entry['content']) == ('Tiêu đề', 'Nội dung bài')
+    assert cache.get('https://1thegioi.vn/b-2.html') is None
+
+
+def test_expired_entry_is_dropped(cache):
+    cache.put('https://1thegioi.vn/a-1.html', 'Nội dung')
+    age(cache, 'https://1thegioi.vn/a-1.html', 7200)
+    assert cache.get('https://1thegioi.vn/a-1.html') is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_zero_ttl_never_expires(tmp_path):
+    cache = ArticleCache(str(tmp_path / 'articles.sqlite3'), ttl=0, max_entries=0)
+    cache.put('https://1thegioi.vn/a-1.html', 'Nội dung')
+    age(cache, 'https://1thegioi.vn/a-1.html', 10 ** 9)
+    assert cache.get('https://1thegioi.vn/a-1.html')['content'] == 'Nội dung'
+    assert cache.purge(expired_only=True) == 0
+    cache.close()
+
+
+def test_evicts_least_recently_read(cache):
+    cache.put('https://1thegioi.vn/a.html', 'A')
+    time.sleep(0.01)
+    cache.put('https://1thegioi.vn/b.html', 'B')
+    time.sleep(0.01)
+    # Đọc 'a' để 'b' thành bài lâu chưa dùng nhất
+    assert cache.get('https://1thegioi.vn/a.html')['content'] == 'A'
+    time.sleep(0.01)
+    cache.put('https://1thegioi.vn/c.html', 'C')
+
+    assert cache.stats()['entries'] == 2
+    assert cache.get('https://1thegioi.vn/b.html') is None
+    assert cache.get('https://1thegioi.vn/a.html')['content'] == 'A'
+
+
+def test_purge_expired_only(cache):
+    cache.put('https://1thegioi.vn/a.html', 'A')
+    cache.put('https://1thegioi.vn/b.html', 'B')
+    age(cache, 'https://1thegioi.vn/a.html', 7200)
+    assert cache.stats()['expired'] == 1
+    assert cache.purge(expired_only=True) == 1
+    assert cache.purge() == 1
+    assert cache.stats()['entries'] == 0
+
+
+def test_published_date_round_trip(cache):
+    cache.put('https://1thegioi.vn/a.html', 'A', 'Tiêu đề', '2024-05-01')
+    assert cache.get('https://1thegioi.vn/a.html')['published'] == '2024-05-01'
+    cache.put('https://1thegioi.vn/b.html', 'B')
+    assert cache.get('https://1thegioi.vn/b.html')['published'] == ''
+
+
+def test_adds_published_column_to_old_cache(tmp_path):
+    path = str(tmp_path / 'articles.sqlite3')
+    # Bảng theo định dạng trước khi có cột ngày đăng
+    connection = sqlite3.connect(path)
+    connection.execute("""CREATE TABLE articles (url TEXT PRIMARY KEY, title TEXT, content TEXT NOT NULL,
+                          fetched_at REAL NOT NULL, accessed_at REAL NOT NULL)""")
+    connection.execute("INSERT INTO articles VALUES ('https://1thegioi.vn/a.html', 'Cũ', 'Nội dung', ?, ?)",
+                       (time.time(), time.time()))
+    connection.commit()
+    connection.close()
+
+    cache = ArticleCache(path, ttl=3600, max_entries=10)
+    assert cache.get('https://1thegioi.vn/a.html')['published'] == ''
+    cache.put('https://1thegioi.vn/b.html', 'Mới', published='2024-05-01')
+    assert cache.get('https://1thegioi.vn/b.html')['published'] == '2024-05-01'
+    cache.close()
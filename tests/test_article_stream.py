@@ -0,0 +1,134 @@
+import pytest
+
+from chatbot_1thegioi.article_stream import ArticleExtractor, response_encoding, stream_article
+
+URL = 'https://1thegioi.vn/bai-viet-thu-nghiem-123.html'
+
+PARAGRAPH = 'Chiến sự tại Ukraine tiếp tục diễn biến phức tạp trong tuần qua.'
+
+
+def page(paragraphs=20):
+    body = ''.join(f'<p>{PARAGRAPH} Đoạn {index}.</p>' for index in range(paragraphs))
+    return (
+        '<html><head><title>Tin thế giới</title>'
+        '<meta property="article:published_time" content="2024-05-01T08:00:00+07:00">'
+        '<script>var x = "<p>không phải nội dung</p>";</script></head>'
+        f'<body><h1>Tiêu đề bài</h1><div class="article-content">{body}</div>'
+        '<footer><p>Bản quyền thuộc về toà soạn, không sao chép khi chưa được phép.</p></footer>'
+        '</body></html>'
+    )
+
+
+class StubResponse:
+    """Response dạng stream: trả body theo từng đoạn, ghi lại số đoạn đã đọc và việc đóng"""
+
+    def __init__(self, body, status_code=200, content_type='text/html; charset=utf-8', encoding='utf-8'):
+        self.body = body
+        self.status_code = status_code
+        self.headers = {'Content-Type': content_type}
+        self.encoding = encoding
+        self.chunks_read = 0
+        self.closed = False
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.body), chunk_size):
+            self.chunks_read += 1
+            yield self.body[start:start + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+class StubHttp:
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        return self.response
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr('chatbot_1thegioi.settings.ARTICLE_CHUNK_SIZE', 256)
+
+
+def test_extracts_title_published_and_zone_paragraphs():
+    extractor = ArticleExtractor(budget=10000)
+    extractor.feed(page(3))
+    article = extractor.result()
+
+    assert article['title'] == 'Tin thế giới'
+    assert article['published'] == '2024-05-01T08:00:00+07:00'
+    assert article['content'].startswith(PARAGRAPH)
+    assert 'không phải nội dung' not in article['content']
+    assert 'Bản quyền' not in article['content']
+
+
+def test_stops_reading_once_budget_is_filled():
+    response = StubResponse(page(200).encode('utf-8'))
+    http = StubHttp(response)
+
+    article = stream_article(http, URL, budget=300)
+
+    assert http.calls[0][1]['stream'] is True
+    assert len(article['content']) == 300
+    assert article['bytes_read'] < len(response.body)
+    assert response.chunks_read < len(response.body) // 256
+    assert response.closed
+
+
+def test_stops_at_max_bytes():
+    response = StubResponse(page(200).encode('utf-8'))
+
+    article = stream_article(StubHttp(response), URL, budget=10 ** 6, max_bytes=1024)
+
+    assert 1024 <= article['bytes_read'] < 1024 + 256
+    assert article['title'] == 'Tin thế giới'
+    assert response.closed
+
+
+def test_reads_whole_small_page():
+    response = StubResponse(page(2).encode('utf-8'))
+
+    article = stream_article(StubHttp(response), URL, budget=10000)
+
+    assert article['bytes_read'] == len(response.body)
+    assert article['url'] == URL
+    assert 'Đoạn 1.' in article['content']
+
+
+def test_multibyte_characters_split_across_chunks():
+    # Đoạn 256 byte cắt ngang ký tự UTF-8 nhiều byte - bộ giải mã tăng dần phải ghép lại đúng
+    response = StubResponse(page(5).encode('utf-8'))
+
+    article = stream_article(StubHttp(response), URL, budget=10000)
+
+    assert '�' not in article['content']
+    assert 'Đoạn 4.' in article['content']
+
+
+def test_declared_charset_is_used():
+    html = '<html><head><title>Café</title></head><body><p>Crème brûlée à la française, très appréciée</p></body></html>'
+    response = StubResponse(html.encode('latin-1'), content_type='text/html; charset=ISO-8859-1', encoding='ISO-8859-1')
+
+    article = stream_article(StubHttp(response), URL, budget=10000)
+
+    assert article['title'] == 'Café'
+    assert article['content'] == 'Crème brûlée à la française, très appréciée'
+
+
+def test_missing_charset_defaults_to_utf8():
+    response = StubResponse(b'', content_type='text/html', encoding='ISO-8859-1')
+    assert response_encoding(response) == 'utf-8'
+
+    response = StubResponse(b'', content_type='text/html; charset=windows-1252', encoding='windows-1252')
+    assert response_encoding(response) == 'windows-1252'
+
+
+def test_http_error_returns_none_and_closes():
+    response = StubResponse(b'not found', status_code=404)
+
+    assert stream_article(StubHttp(response), URL) is None
+    assert response.closed
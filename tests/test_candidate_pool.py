@@ -0,0 +1,57 @@
+from chatbot_1thegioi.candidate_pool import Candidate, CandidatePool
+
+
+def candidate(url, score, title=None, rank=0.0):
+    return Candidate(url, title or url.rsplit('/', 1)[-1], score, 'test', rank=rank)
+
+
+def test_same_article_keeps_better_copy():
+    pool = CandidatePool(capacity=10)
+    assert pool.add(candidate('https://1thegioi.vn/a-1.html', 5))
+    assert not pool.add(candidate('https://www.1thegioi.vn/a-1.html?utm_source=x', 4))
+    assert pool.add(candidate('http://m.1thegioi.vn/a-1.html', 7))
+    assert len(pool) == 1
+    assert pool.take(1)[0].relevance_score == 7
+
+
+def test_same_title_different_url_is_one_slot():
+    pool = CandidatePool(capacity=10)
+    pool.add(candidate('https://1thegioi.vn/a-1.html', 5, 'Giá vàng tăng'))
+    pool.add(candidate('https://1thegioi.vn/a-2.html', 6, ' giá  VÀNG tăng '))
+    assert len(pool) == 1
+    assert pool.take(5)[0].url == 'https://1thegioi.vn/a-2.html'
+
+
+def test_relative_url_is_rejected():
+    assert not CandidatePool(capacity=10).add(candidate('/a-1.html', 9))
+
+
+def test_evicts_weakest_when_full():
+    pool = CandidatePool(capacity=2)
+    pool.add(candidate('https://1thegioi.vn/a.html', 5))
+    pool.add(candidate('https://1thegioi.vn/b.html', 7))
+    assert not pool.add(candidate('https://1thegioi.vn/c.html', 4))
+    assert pool.add(candidate('https://1thegioi.vn/d.html', 6))
+    assert len(pool) == 2
+    assert [c.url for c in pool.take(5)] == ['https://1thegioi.vn/b.html', 'https://1thegioi.vn/d.html']
+
+
+def test_take_orders_by_score_then_rank():
+    pool = CandidatePool(capacity=10)
+    pool.extend([
+        candidate('https://1thegioi.vn/a.html', 5, rank=1.0),
+        candidate('https://1thegioi.vn/b.html', 5, rank=3.0),
+        candidate('https://1thegioi.vn/c.html', 8),
+    ])
+    assert [c.url.rsplit('/', 1)[-1] for c in pool.take(2)] == ['c.html', 'b.html']
+    assert [c.url.rsplit('/', 1)[-1] for c in pool.take(2)] == ['a.html']
+    assert pool.take(2) == []
+
+
+def test_taken_candidates_are_not_readded():
+    pool = CandidatePool(capacity=10)
+    pool.add(candidate('https://1thegioi.vn/a.html', 5, 'Tiêu đề A'))
+    pool.take(1)
+    assert not pool.add(candidate('https://www.1thegioi.vn/a.html', 9, 'Khác'))
+    assert not pool.add(candidate('https://1thegioi.vn/a-copy.html', 9, 'Tiêu đề A'))
+    assert len(pool) == 0
@@ -0,0 +1,61 @@
+from chatbot_1thegioi.dedupe import MIN_WORDS, SimHashIndex, hamming, simhash, unique_articles
+
+SENTENCE = (
+    'giá vàng trong nước hôm nay tiếp tục tăng mạnh theo đà của thị trường thế giới khi nhà đầu tư '
+    'tìm đến kênh trú ẩn an toàn trước những biến động của kinh tế toàn cầu'
+)
+# Đủ dài như một bài thật: mỗi đoạn khác nhau ở số thứ tự
+TEXT = ' '.join(f'đoạn {i} {SENTENCE}' for i in range(10))
+
+
+def test_short_text_has_no_fingerprint():
+    assert simhash(' '.join(['từ'] * (MIN_WORDS - 1))) is None
+    assert simhash('') is None
+    assert simhash(None) is None
+
+
+def test_near_duplicate_is_close():
+    # Bản đăng lại chỉ thêm dòng nguồn ở cuối
+    edited = TEXT + ' theo báo điện tử'
+    assert hamming(simhash(TEXT), simhash(edited)) <= 3
+    unrelated = ' '.join(f'từ{i}' for i in range(60))
+    assert hamming(simhash(TEXT), simhash(unrelated)) > 3
+
+
+def test_index_finds_near_duplicate():
+    index = SimHashIndex(threshold=3)
+    fingerprint = simhash(TEXT)
+    index.add(fingerprint, 'a')
+    assert index.find(fingerprint ^ 0b101) == 'a'
+    assert index.find(fingerprint ^ 0xFFFF_FFFF) is None
+
+
+def test_unique_articles_by_url_keeps_higher_score():
+    articles = [
+        {'url': 'https://1thegioi.vn/a-1.html', 'content': 'ngắn', 'relevance_score': 5},
+        {'url': 'https://www.1thegioi.vn/a-1.html?utm_source=x', 'content': 'ngắn', 'relevance_score': 8},
+        {'url': 'https://1thegioi.vn/b-2.html', 'content': 'khác', 'relevance_score': 6},
+    ]
+    kept, dupes = unique_articles(articles)
+    assert dupes == 1
+    assert [article['relevance_score'] for article in kept] == [8, 6]
+
+
+def test_unique_articles_by_content():
+    articles = [
+        {'url': 'https://1thegioi.vn/a-1.html', 'content': TEXT, 'relevance_score': 5},
+        {'url': 'https://baokhac.vn/dang-lai.html', 'content': TEXT + ' Nguồn 1thegioi', 'relevance_score': 3},
+    ]
+    kept, dupes = unique_articles(articles, threshold=3)
+    assert dupes == 1
+    assert kept == articles[:1]
+
+
+def test_relative_urls_are_not_merged():
+    articles = [
+        {'url': '/a-1.html', 'content': 'một', 'relevance_score': 5},
+        {'url': '/b-2.html', 'content': 'hai', 'relevance_score': 5},
+    ]
+    kept, dupes = unique_articles(articles)
+    assert dupes == 0
+    assert kept == articles
@@ -0,0 +1,147 @@
+import json
+
+import pytest
+import requests
+
+from chatbot_1thegioi.google_cse import CustomSearchClient, CustomSearchStore, QuotaExhausted, query_key, quota_day
+
+ITEMS = [{'link': 'https://1thegioi.vn/ukraine-1.html', 'title': 'Ukraine'}]
+
+
+def make_response(status_code=200, payload=None):
+    response = requests.models.Response()
+    response.status_code = status_code
+    response._content = json.dumps(payload if payload is not None else {'items': ITEMS}).encode('utf-8')
+    return response
+
+
+def quota_payload(status_code, reason, message='Quota exceeded'):
+    return {'error': {'code': status_code, 'message': message, 'errors': [{'reason': reason}]}}
+
+
+class StubHttp:
+    """Thay HttpClient: trả lần lượt các response dựng sẵn và ghi lại tham số đã gửi"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def get(self, url, **kwargs):
+        self.calls.append(kwargs)
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CustomSearchStore(str(tmp_path / 'cse.sqlite3'), ttl=60, max_entries=10)
+    yield store
+    store.close()
+
+
+def make_client(http, store=None, daily_quota=3, reserve=1):
+    return CustomSearchClient(http, 'test-key', 'test-cx', store=store, daily_quota=daily_quota, reserve=reserve)
+
+
+def test_query_key_normalizes_query():
+    assert query_key('  Chiến sự   UKRAINE ', {'cx': 'a'}) == query_key('chiến sự ukraine', {'cx': 'a'})
+    assert query_key('ukraine', {'start': 1}) != query_key('ukraine', {'start': 11})
+
+
+def test_results_are_cached(store):
+    http = StubHttp(make_response())
+    client = make_client(http, store)
+
+    assert client.search('Ukraine', num=10) == ITEMS
+    assert client.search(' ukraine ', num=10) == ITEMS
+
+    assert len(http.calls) == 1
+    assert http.calls[0]['params']['q'] == 'Ukraine'
+    assert http.calls[0]['params']['cx'] == 'test-cx'
+    assert client.used_today() == 1
+
+
+def test_api_key_is_sent_in_header_not_url(store):
+    http = StubHttp(make_response())
+    make_client(http, store).search('Ukraine')
+
+    assert http.calls[0]['headers'] == {'X-Goog-Api-Key': 'test-key'}
+    assert 'key' not in http.calls[0]['params']
+
+
+def test_quota_reserve_stops_before_daily_limit(store):
+    http = StubHttp(make_response(), make_response(), make_response())
+    client = make_client(http, store, daily_quota=3, reserve=1)
+
+    client.search('một')
+    assert client.available()
+    client.search('hai')
+    assert not client.available()
+    with pytest.raises(QuotaExhausted):
+        client.search('ba')
+    assert len(http.calls) == 2
+    # Truy vấn đã cache vẫn trả được khi hết lượt
+    assert client.search('một') == ITEMS
+
+
+def test_quota_is_shared_through_store(store):
+    make_client(StubHttp(make_response()), store).search('một')
+    assert store.used(quota_day()) == 1
+    assert make_client(StubHttp(), store).used_today() == 1
+
+
+def test_in_memory_quota_without_store():
+    client = make_client(StubHttp(make_response()), daily_quota=2, reserve=1)
+    client.search('một')
+    with pytest.raises(QuotaExhausted):
+        client.search('hai')
+
+
+@pytest.mark.parametrize('status_code, payload', [
+    (403, quota_payload(403, 'dailyLimitExceeded')),
+    (429, quota_payload(429, 'rateLimitExceeded', "Quota exceeded for quota metric 'Queries' and limit 'Queries per day'")),
+])
+def test_daily_quota_error_exhausts(store, status_code, payload):
+    http = StubHttp(make_response(status_code, payload))
+    client = make_client(http, store, daily_quota=100, reserve=5)
+
+    with pytest.raises(QuotaExhausted):
+        client.search('Ukraine')
+    assert client.used_today() == 100
+    with pytest.raises(QuotaExhausted):
+        client.search('khác')
+    assert len(http.calls) == 1
+
+
+def test_rate_limit_error_does_not_exhaust(store):
+    payload = quota_payload(429, 'rateLimitExceeded', "Quota exceeded for quota metric 'Queries' and limit 'Queries per minute'")
+    http = StubHttp(make_response(429, payload), make_response())
+    client = make_client(http, store, daily_quota=100, reserve=5)
+
+    with pytest.raises(requests.HTTPError):
+        client.search('Ukraine')
+    assert client.available()
+    assert client.search('Ukraine') == ITEMS
+
+
+def test_non_json_error_is_not_quota(store):
+    response = make_response(403)
+    response._content = b'<html>Forbidden</html>'
+    client = make_client(StubHttp(response), store, daily_quota=100)
+
+    with pytest.raises(requests.HTTPError):
+        client.search('Ukraine')
+    assert client.used_today() == 1
+
+
+def test_store_expiry_and_eviction(tmp_path):
+    store = CustomSearchStore(str(tmp_path / 'cse.sqlite3'), ttl=0, max_entries=2)
+    store.put('a', ITEMS)
+    assert store.get('a') is None
+
+    store.ttl = 60
+    for key in ('a', 'b', 'c'):
+        store.put(key, ITEMS)
+    assert store.stats()['entries'] == 2
+    assert store.get('a') is None and store.get('c') == ITEMS
+    assert store.purge() == 2
+    store.close()
@@ -0,0 +1,58 @@
+import pytest
+
+from chatbot_1thegioi import html_engine
+from chatbot_1thegioi.html_engine import ENGINES, parse_html, resolve_engine
+
+PAGE = """<html><head><title>Giá vàng hôm nay</title>
+<meta property="article:published_time" content="2024-05-01T08:00:00+07:00"></head>
+<body>
+  <h1 class="title">Giá vàng tăng mạnh</h1>
+  <div class="content">
+    <p>Đoạn <b>một</b>.</p>
+    <p>Đoạn hai.</p>
+  </div>
+  <ul class="news">
+    <li><a href="/a-1.html">Bài A</a></li>
+    <li><a>Không có link</a></li>
+    <li><a href="/b-2.html">Bài B</a></li>
+  </ul>
+</body></html>"""
+
+
+@pytest.fixture(params=ENGINES)
+def engine(request):
+    if not html_engine._available(request.param):
+        pytest.skip(f'{request.param} chưa cài')
+    return request.param
+
+
+def test_engines_agree(engine):
+    soup = parse_html(PAGE.encode('utf-8'), engine)
+    assert soup.find('title').get_text(strip=True) == 'Giá vàng hôm nay'
+    assert soup.select_one('h1.title').text == 'Giá vàng tăng mạnh'
+    assert soup.select_one('h2') is None
+    assert [p.get_text(' ', strip=True) for p in soup.select('.content p')] == ['Đoạn một .', 'Đoạn hai.']
+    assert [a.get('href') for a in soup.find_all('a', href=True)] == ['/a-1.html', '/b-2.html']
+    assert soup.select('ul.news a')[1].get('href', 'không') == 'không'
+    assert [tag.name for tag in soup.find_all(['h1', 'title'])] == ['title', 'h1']
+    meta = soup.select_one('meta[property="article:published_time"]')
+    assert meta.get('content') == '2024-05-01T08:00:00+07:00'
+
+
+def test_empty_markup(engine):
+    soup = parse_html('', engine)
+    assert soup.select('p') == []
+    assert soup.find('title') is None
+
+
+def test_resolve_engine_falls_back():
+    assert resolve_engine('html.parser') == 'html.parser'
+    assert resolve_engine('khong-co') == 'html.parser'
+    assert resolve_engine('auto') in ENGINES
+
+
+def test_item_access(engine):
+    meta = parse_html(PAGE, engine).select_one('meta[property="article:published_time"]')
+    assert meta['content'] == '2024-05-01T08:00:00+07:00'
+    with pytest.raises(KeyError):
+        meta['name']
@@ -0,0 +1,126 @@
+import email.utils
+import time
+
+import pytest
+import requests
+
+from chatbot_1thegioi.http_cache import HttpCache, freshness_lifetime, parse_cache_control
+from chatbot_1thegioi.http_client import HttpClient
+
+URL = 'https://1thegioi.vn/the-gioi'
+
+
+def make_response(status_code=200, headers=None, body=b''):
+    response = requests.models.Response()
+    response.status_code = status_code
+    response.url = URL
+    response.headers = requests.structures.CaseInsensitiveDict(headers or {})
+    response._content = body
+    return response
+
+
+class StubSession:
+    """Thay requests.Session: trả lần lượt các response dựng sẵn và ghi lại header đã gửi"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.sent = []
+
+    def request(self, method, url, **kwargs):
+        self.sent.append(dict(kwargs.get('headers') or {}))
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HttpCache(str(tmp_path / 'http.sqlite3'), default_ttl=60)
+    yield cache
+    cache.close()
+
+
+def test_parse_cache_control():
+    assert parse_cache_control('Public, Max-Age="300", no-transform') == {
+        'public': True, 'max-age': '300', 'no-transform': True,
+    }
+    assert parse_cache_control(None) == {}
+
+
+@pytest.mark.parametrize('headers, expected', [
+    ({'Cache-Control': 'no-store, max-age=300'}, None),
+    ({'Cache-Control': 'no-cache, max-age=300'}, 0),
+    ({'Cache-Control': 'max-age=300'}, 300),
+    ({'Cache-Control': 'max-age=100, s-maxage=200'}, 200),
+    ({'Cache-Control': 'max-age=-5'}, 0),
+    ({'Cache-Control': 'public'}, 60),
+    ({}, 60),
+    ({'Expires': 'không phải ngày'}, 0),
+    ({'Expires': 'Thu, 01 Jan 1970 00:00:00 GMT'}, 0),
+])
+def test_freshness_lifetime(headers, expected):
+    assert freshness_lifetime(headers, 60) == expected
+
+
+def test_freshness_lifetime_from_expires():
+    expires = email.utils.formatdate(time.time() + 120, usegmt=True)
+    assert 110 <= freshness_lifetime({'Expires': expires}, 60) <= 120
+    # max-age thắng Expires
+    assert freshness_lifetime({'Expires': expires, 'Cache-Control': 'max-age=5'}, 60) == 5
+
+
+def test_no_store_response_is_not_kept(cache):
+    cache.store(URL, make_response(headers={'ETag': '"a"'}, body=b'cu'))
+    assert cache.store(URL, make_response(headers={'Cache-Control': 'no-store'}, body=b'moi')) is None
+    assert cache.lookup(URL) is None
+
+
+def test_fresh_entry_served_without_request(cache):
+    client = HttpClient(cache=cache)
+    client.session = StubSession(make_response(headers={'Cache-Control': 'max-age=300'}, body=b'<html>1</html>'))
+    assert client.get_cached(URL).content == b'<html>1</html>'
+
+    response = client.get_cached(URL)
+    assert response.content == b'<html>1</html>'
+    assert response.from_cache
+    assert len(client.session.sent) == 1
+
+
+def test_stale_entry_revalidated_with_304(cache):
+    client = HttpClient(cache=cache)
+    client.session = StubSession(
+        make_response(headers={'Cache-Control': 'no-cache', 'ETag': '"v1"', 'Last-Modified': 'Mon, 01 Jan 2024 00:00:00 GMT'},
+                      body=b'<html>1</html>'),
+        make_response(304, headers={'Cache-Control': 'max-age=300'}),
+    )
+    client.get_cached(URL)
+
+    response = client.get_cached(URL, headers={'Accept': 'text/html'})
+    assert response.status_code == 200
+    assert response.content == b'<html>1</html>'
+    assert client.session.sent[1] == {
+        'Accept': 'text/html',
+        'If-None-Match': '"v1"',
+        'If-Modified-Since': 'Mon, 01 Jan 2024 00:00:00 GMT',
+    }
+    # 304 mang max-age mới nên bản lưu tươi trở lại
+    assert cache.lookup(URL).is_fresh
+
+
+def test_changed_page_replaces_entry(cache):
+    client = HttpClient(cache=cache)
+    client.session = StubSession(
+        make_response(headers={'Cache-Control': 'no-cache', 'ETag': '"v1"'}, body=b'1'),
+        make_response(headers={'Cache-Control': 'no-cache', 'ETag': '"v2"'}, body=b'2'),
+    )
+    client.get_cached(URL)
+    assert client.get_cached(URL).content == b'2'
+    assert cache.lookup(URL).headers['ETag'] == '"v2"'
+
+
+def test_without_cache_plain_get():
+    client = HttpClient()
+    client.session = StubSession(make_response(body=b'x'), make_response(body=b'y'))
+    assert client.get_cached(URL).content == b'x'
+    assert client.get_cached(URL).content == b'y'
@@ -0,0 +1,77 @@
+import gc
+import io
+
+import pytest
+import requests
+
+from chatbot_1thegioi.http_client import HttpClient
+from chatbot_1thegioi.rate_limiter import RateLimiter
+
+URL = 'https://1thegioi.vn/bai-viet-1.html'
+
+
+class StubSession:
+    def __init__(self, error=None):
+        self.error = error
+
+    def request(self, method, url, **kwargs):
+        if self.error:
+            raise self.error
+        response = requests.models.Response()
+        response.status_code = 200
+        response.url = url
+        response.raw = io.BytesIO(b'ok')
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def client():
+    client = HttpClient(max_per_host=1, rate_limiter=RateLimiter(rate=0, host_rates={}), overrides='')
+    client.session = StubSession()
+    return client
+
+
+def slot_free(client, url=URL):
+    slot = client.host_slot(url)
+    if slot.acquire(blocking=False):
+        slot.release()
+        return True
+    return False
+
+
+def test_plain_request_releases_slot_on_return(client):
+    client.get(URL)
+    assert slot_free(client)
+
+
+def test_stream_holds_slot_until_closed(client):
+    response = client.get(URL, stream=True)
+    assert not slot_free(client)
+    assert slot_free(client, 'https://www.google.com/search')
+
+    response.close()
+    assert slot_free(client)
+    # Đóng lần nữa không trả slot hai lần (BoundedSemaphore sẽ báo lỗi)
+    response.close()
+
+
+def test_stream_released_by_context_manager(client):
+    with client.get(URL, stream=True):
+        assert not slot_free(client)
+    assert slot_free(client)
+
+
+def test_stream_released_when_garbage_collected(client):
+    client.get(URL, stream=True)
+    gc.collect()
+    assert slot_free(client)
+
+
+def test_failed_request_releases_slot(client):
+    client.session = StubSession(error=requests.exceptions.ConnectionError('refused'))
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.get(URL, stream=True)
+    assert slot_free(client)
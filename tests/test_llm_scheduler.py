@@ -0,0 +1,77 @@
+import threading
+import time
+
+import pytest
+
+from chatbot_1thegioi.llm_scheduler import LLMScheduler, QueueFull
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'hết thời gian chờ'
+        time.sleep(0.005)
+
+
+def test_runs_immediately_when_idle():
+    scheduler = LLMScheduler(concurrency=1, max_queue=1, queue_timeout=1)
+    with scheduler.slot() as waited:
+        assert waited == 0.0
+    assert scheduler.stats()['completed'] == 1
+
+
+def test_rejects_when_queue_full():
+    scheduler = LLMScheduler(concurrency=1, max_queue=0, queue_timeout=1)
+    with scheduler.slot():
+        with pytest.raises(QueueFull):
+            with scheduler.slot():
+                pass
+    assert scheduler.counters['rejected'] == 1
+
+
+def test_times_out_in_queue():
+    scheduler = LLMScheduler(concurrency=1, max_queue=1, queue_timeout=0.05)
+    with scheduler.slot():
+        with pytest.raises(QueueFull):
+            with scheduler.slot():
+                pass
+    assert scheduler.counters['timed_out'] == 1
+    assert scheduler.stats()['queued'] == 0
+
+
+def test_failure_is_counted_and_releases_slot():
+    scheduler = LLMScheduler(concurrency=1, max_queue=1, queue_timeout=1)
+    with pytest.raises(RuntimeError):
+        with scheduler.slot():
+            raise RuntimeError('ollama lỗi')
+    with scheduler.slot():
+        pass
+    assert scheduler.counters['failed'] == 1
+    assert scheduler.counters['completed'] == 1
+
+
+def test_lower_priority_value_served_first():
+    scheduler = LLMScheduler(concurrency=1, max_queue=5, queue_timeout=5)
+    order = []
+    release = threading.Event()
+
+    def holder():
+        with scheduler.slot():
+            release.wait()
+
+    def worker(name, priority):
+        with scheduler.slot(priority):
+            order.append(name)
+
+    threads = [threading.Thread(target=holder)]
+    threads[0].start()
+    wait_for(lambda: scheduler.stats()['active'] == 1)
+    for name, priority in (('thấp', 5), ('cao', 0), ('vừa', 2)):
+        thread = threading.Thread(target=worker, args=(name, priority))
+        thread.start()
+        threads.append(thread)
+        wait_for(lambda count=len(threads) - 1: scheduler.stats()['queued'] == count)
+    release.set()
+    for thread in threads:
+        thread.join(2)
+    assert order == ['cao', 'vừa', 'thấp']
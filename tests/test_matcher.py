@@ -0,0 +1,47 @@
+from chatbot_1thegioi.matcher import TermMatcher, compile_terms
+from chatbot_1thegioi.topics import irrelevant_terms, topic_category
+
+
+def test_matches_whole_tokens_only():
+    matcher = TermMatcher(['ai'])
+    assert matcher.matches('Tài chính hai lần lại giảm') == set()
+    assert matcher.matches('Công nghệ AI phát triển') == {'ai'}
+
+
+def test_multi_word_terms_and_overlaps():
+    matcher = TermMatcher(['trí tuệ nhân tạo', 'nhân tạo', 'trí tuệ'])
+    assert matcher.matches('Ứng dụng trí tuệ nhân tạo trong y tế') == {'trí tuệ nhân tạo', 'nhân tạo', 'trí tuệ'}
+    assert matcher.matches('Trí nhớ nhân tạo') == {'nhân tạo'}
+    assert matcher.matches('tuệ nhân') == set()
+
+
+def test_counts_every_occurrence():
+    matcher = TermMatcher(['giá vàng', 'vàng'])
+    counts = matcher.counts('Giá vàng hôm nay: vàng SJC tăng, giá vàng nhẫn giảm')
+    assert counts == {'giá vàng': 2, 'vàng': 3}
+
+
+def test_counts_accepts_tokens():
+    matcher = TermMatcher(['chiến tranh'])
+    assert matcher.counts(['cuộc', 'chiến', 'tranh', 'lạnh']) == {'chiến tranh': 1}
+
+
+def test_duplicate_and_empty_terms_are_ignored():
+    matcher = TermMatcher(['vàng', 'vàng', '', '  '])
+    assert matcher.terms == ['vàng']
+
+
+def test_compile_terms_is_cached():
+    assert compile_terms(['uav', 'quân']) is compile_terms(['uav', 'quân'])
+
+
+def test_topic_category_matches_whole_tokens():
+    assert topic_category('Công nghệ AI')['name'] == 'cong_nghe'
+    # 'ai' trong "tài chính" không còn kéo chủ đề sang công nghệ
+    assert topic_category('tài chính ngân hàng')['name'] == 'kinh_te'
+    assert topic_category('lại hai người') is None
+
+
+def test_irrelevant_terms_always_include_ads():
+    assert irrelevant_terms('bóng đá')[:2] == ['chính trị', 'ai']
+    assert irrelevant_terms('du lịch') == ['quảng cáo', 'ads', 'advertisement', 'sponsored', 'promotion']
@@ -0,0 +1,77 @@
+import pytest
+
+from chatbot_1thegioi.metrics import Metrics
+
+
+@pytest.fixture
+def registry():
+    return Metrics()
+
+
+def test_counter_and_gauge_values(registry):
+    registry.inc('chatbot_http_requests_total', host='1thegioi.vn', status=200)
+    registry.inc('chatbot_http_requests_total', 2, status=200, host='1thegioi.vn')
+    registry.set('chatbot_llm_queue_depth', 3)
+    registry.set('chatbot_llm_queue_depth', 1)
+
+    assert registry.value('chatbot_http_requests_total', host='1thegioi.vn', status='200') == 3
+    assert registry.value('chatbot_llm_queue_depth') == 1
+    assert registry.value('chatbot_http_requests_total', host='khac') == 0
+
+
+def test_render_counter_with_help_and_type(registry):
+    registry.inc('chatbot_http_requests_total', host='www.google.com', status=429)
+    registry.inc('chatbot_http_requests_total', host='1thegioi.vn', status=200)
+
+    assert registry.render_prometheus() == (
+        '# HELP chatbot_http_requests_total Request HTTP theo host và mã trạng thái\n'
+        '# TYPE chatbot_http_requests_total counter\n'
+        'chatbot_http_requests_total{host="1thegioi.vn",status="200"} 1\n'
+        'chatbot_http_requests_total{host="www.google.com",status="429"} 1\n'
+    )
+
+
+def test_render_histogram_buckets_are_cumulative(registry):
+    for value in (0.05, 0.3, 0.3, 7):
+        registry.observe('chatbot_search_tier_seconds', value, buckets=(0.1, 1, 5), tier='sitemap')
+
+    lines = registry.render_prometheus().splitlines()
+
+    assert lines[1] == '# TYPE chatbot_search_tier_seconds histogram'
+    assert lines[2:] == [
+        'chatbot_search_tier_seconds_bucket{tier="sitemap",le="0.1"} 1',
+        'chatbot_search_tier_seconds_bucket{tier="sitemap",le="1"} 3',
+        'chatbot_search_tier_seconds_bucket{tier="sitemap",le="5"} 3',
+        'chatbot_search_tier_seconds_bucket{tier="sitemap",le="+Inf"} 4',
+        'chatbot_search_tier_seconds_sum{tier="sitemap"} 7.650000',
+        'chatbot_search_tier_seconds_count{tier="sitemap"} 4',
+    ]
+
+
+def test_unknown_metric_is_untyped_and_labels_escaped(registry):
+    registry.set('custom_gauge', 1.5, topic='a "b"\\c\nd')
+
+    assert registry.render_prometheus() == (
+        '# TYPE custom_gauge untyped\n'
+        'custom_gauge{topic="a \\"b\\"\\\\c\\nd"} 1.5\n'
+    )
+
+
+def test_timer_and_snapshot(registry):
+    with registry.timer('chatbot_search_seconds'):
+        pass
+    registry.inc('chatbot_candidates_total', stage='kept')
+
+    snapshot = registry.snapshot()
+
+    assert list(snapshot) == ['chatbot_candidates_total', 'chatbot_search_seconds']
+    assert snapshot['chatbot_candidates_total'] == [{'labels': {'stage': 'kept'}, 'value': 1}]
+    assert snapshot['chatbot_search_seconds'][0]['count'] == 1
+
+
+def test_reset(registry):
+    registry.inc('chatbot_candidates_total', stage='scored')
+    registry.reset()
+
+    assert registry.render_prometheus() == '\n'
+    assert registry.snapshot() == {}
@@ -0,0 +1,140 @@
+import json
+
+import pytest
+import requests
+
+from chatbot_1thegioi import ollama_client
+from chatbot_1thegioi.ollama_client import OllamaClient, OllamaError, OllamaTimeout
+
+
+def ndjson(*chunks):
+    return [json.dumps(chunk).encode('utf-8') for chunk in chunks]
+
+
+class StubResponse:
+    def __init__(self, lines, status_code=200, on_line=None):
+        self.lines = lines
+        self.status_code = status_code
+        self.on_line = on_line
+        self.closed = False
+
+    def iter_lines(self):
+        for line in self.lines:
+            if isinstance(line, Exception):
+                raise line
+            if self.on_line:
+                self.on_line()
+            yield line
+
+    def close(self):
+        self.closed = True
+
+
+class StubHttp:
+    def __init__(self, response=None, error=None):
+        self.response = response
+        self.error = error
+        self.calls = []
+
+    def post(self, url, **kwargs):
+        self.calls.append((url, kwargs))
+        if self.error:
+            raise self.error
+        return self.response
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ollama_client.time, 'monotonic', clock)
+    return clock
+
+
+def make_client(http, **kwargs):
+    kwargs.setdefault('first_token_timeout', 5)
+    kwargs.setdefault('total_timeout', 20)
+    return OllamaClient(http, url='http://ollama:11434/', model='test-model', **kwargs)
+
+
+def test_yields_chunks_until_done():
+    response = StubResponse(ndjson(
+        {'response': 'Xin '}, {'response': 'chào'}, {'response': '', 'done': False},
+        {'response': '!', 'done': True}, {'response': 'không đọc tới'},
+    ))
+    http = StubHttp(response)
+
+    assert list(make_client(http).generate_stream('câu hỏi', options={'num_predict': 10})) == ['Xin ', 'chào', '!']
+
+    url, kwargs = http.calls[0]
+    assert url == 'http://ollama:11434/api/generate'
+    assert kwargs['json'] == {'model': 'test-model', 'prompt': 'câu hỏi', 'stream': True, 'options': {'num_predict': 10}}
+    assert kwargs['stream'] is True
+    assert response.closed
+
+
+def test_blank_lines_are_skipped():
+    response = StubResponse([b''] + ndjson({'response': 'a'}) + [b''] + ndjson({'done': True}))
+    assert list(make_client(StubHttp(response)).generate_stream('q')) == ['a']
+
+
+def test_error_line_raises():
+    response = StubResponse(ndjson({'response': 'a'}, {'error': 'model not found'}))
+    stream = make_client(StubHttp(response)).generate_stream('q')
+
+    assert next(stream) == 'a'
+    with pytest.raises(OllamaError, match='model not found'):
+        next(stream)
+    assert response.closed
+
+
+def test_http_error_raises():
+    response = StubResponse([], status_code=500)
+    with pytest.raises(OllamaError, match='500'):
+        list(make_client(StubHttp(response)).generate_stream('q'))
+    assert response.closed
+
+
+def test_first_token_timeout_is_the_read_timeout():
+    http = StubHttp(error=requests.exceptions.ReadTimeout('read timed out'))
+    with pytest.raises(OllamaTimeout, match='token đầu tiên'):
+        list(make_client(http).generate_stream('q'))
+
+
+def test_read_timeout_mid_stream():
+    response = StubResponse(ndjson({'response': 'a'}) + [requests.exceptions.ConnectionError('Read timed out.')])
+    http = StubHttp(response)
+    stream = make_client(http).generate_stream('q')
+
+    assert next(stream) == 'a'
+    with pytest.raises(OllamaTimeout, match='ngừng trả token'):
+        next(stream)
+    assert http.calls[0][1]['timeout'] == (10, 5)
+
+
+def test_other_connection_errors_propagate():
+    response = StubResponse([requests.exceptions.ConnectionError('Connection reset by peer')])
+    with pytest.raises(requests.exceptions.ConnectionError):
+        list(make_client(StubHttp(response)).generate_stream('q'))
+
+
+def test_total_timeout(clock):
+    def tick():
+        clock.now += 8
+
+    response = StubResponse(ndjson(*({'response': str(index)} for index in range(10))), on_line=tick)
+    stream = make_client(StubHttp(response)).generate_stream('q')
+
+    # Mỗi đoạn về cách nhau 8 giây (dưới first_token_timeout của requests) nhưng tổng vượt 20 giây
+    assert next(stream) == '0'
+    assert next(stream) == '1'
+    with pytest.raises(OllamaTimeout, match='20s'):
+        list(stream)
+    assert response.closed
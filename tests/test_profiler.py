@@ -0,0 +1,53 @@
+import os
+
+import pytest
+
+from chatbot_1thegioi import profiler
+from chatbot_1thegioi.profiler import ProfileSession, profiling
+
+
+def busy():
+    return sum(i * i for i in range(2000))
+
+
+def test_session_writes_report_pstats_and_collapsed(tmp_path):
+    with ProfileSession(str(tmp_path), 'giá vàng', interval=0.001) as session:
+        busy()
+
+    assert set(session.paths) == {'report', 'pstats', 'collapsed'}
+    assert all(os.path.exists(path) for path in session.paths.values())
+    report = open(session.paths['report'], encoding='utf-8').read()
+    assert 'Profile: giá vàng' in report
+    assert 'busy' in report
+    assert 'BỘ NHỚ CÒN GIỮ THEO DÒNG' in report
+
+
+def test_missing_cprofile_stats_still_writes_collapsed_and_memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler.ThreadProfiles, 'stats', lambda self: None)
+
+    with ProfileSession(str(tmp_path), 'rỗng', interval=0.001) as session:
+        busy()
+
+    assert set(session.paths) == {'report', 'collapsed'}
+    assert os.path.exists(session.paths['collapsed'])
+    report = open(session.paths['report'], encoding='utf-8').read()
+    assert 'cProfile không ghi nhận lời gọi nào' in report
+    assert 'Bộ nhớ đỉnh (tracemalloc)' in report
+    assert 'BỘ NHỚ CÒN GIỮ THEO DÒNG' in report
+    assert not list(tmp_path.glob('*.pstats'))
+
+
+def test_error_in_block_is_not_masked(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiler.ThreadProfiles, 'stats', lambda self: None)
+
+    with pytest.raises(ValueError, match='lỗi thật'):
+        with ProfileSession(str(tmp_path), 'lỗi', interval=0.001):
+            raise ValueError('lỗi thật')
+
+    assert list(tmp_path.glob('*.txt'))
+
+
+def test_profiling_disabled_yields_none(tmp_path):
+    with profiling('', 'x') as session:
+        assert session is None
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,37 @@
+from chatbot_1thegioi import settings
+from chatbot_1thegioi.query_plan import QueryPlan
+from chatbot_1thegioi.ranking import EXPANSION_WEIGHT, BM25FRanker
+
+
+def test_category_plan():
+    plan = QueryPlan('  UAV quân sự ', ['drone'], ['quan-su', ''])
+    assert plan.topic == 'UAV quân sự'
+    assert plan.words == ['uav', 'quân']
+    assert plan.keywords == ['uav', 'quân', 'drone']
+    assert plan.category['name'] == 'quan_su'
+    assert 'quân đội' in plan.required_terms
+    assert plan.query_weights == {'uav': 1.0, 'quân': 1.0, 'sự': 1.0, 'drone': EXPANSION_WEIGHT}
+    assert plan.threshold == settings.TITLE_SCORE_THRESHOLD
+    assert plan.section_pages == ['quan-su', '']
+
+
+def test_general_topic_requires_own_words():
+    plan = QueryPlan('du lịch Đà Nẵng', ['biển', 'khách sạn'], [])
+    assert plan.category is None
+    assert plan.required_terms == ['lịch', 'nẵng', 'biển', 'khách sạn']
+    assert plan.forbidden_terms == []
+
+
+def test_title_matcher_gates_uav_title():
+    # Hồi quy: tiêu đề chỉ có 'UAV' (không có cụm 'quân sự') phải qua được bộ lọc và ngưỡng
+    plan = QueryPlan('UAV quân sự', [], [])
+    ranker = BM25FRanker(max_documents=100)
+    ranker.seed([
+        ('https://1thegioi.vn/gia-vang-1.html', 'Giá vàng hôm nay tăng mạnh', ''),
+        ('https://1thegioi.vn/nga-tap-tran-3.html', 'Quân sự Nga tập trận lớn', ''),
+        ('https://1thegioi.vn/thoi-tiet-4.html', 'Thời tiết miền Bắc chuyển lạnh', ''),
+    ])
+    title = 'UAV tự sát thay đổi chiến trường hiện đại'
+    assert 'uav' in plan.title_matcher.matches(title)
+    assert ranker.relevance(plan.query_weights, title, 'https://1thegioi.vn/uav-tu-sat-221010.html', plan.topic) >= plan.threshold
+    assert 'y tế' in plan.title_matcher.matches('Y tế quân đội')
@@ -0,0 +1,87 @@
+import pytest
+
+from chatbot_1thegioi import settings
+from chatbot_1thegioi.ranking import EXPANSION_WEIGHT, BM25FRanker, query_terms
+
+CORPUS = [
+    ('https://1thegioi.vn/gia-vang-hom-nay-1.html', 'Giá vàng hôm nay tăng mạnh', ''),
+    ('https://1thegioi.vn/bong-da-viet-nam-2.html', 'Bóng đá Việt Nam thắng Thái Lan', ''),
+    ('https://1thegioi.vn/nga-tap-tran-3.html', 'Quân sự Nga tập trận lớn', ''),
+    ('https://1thegioi.vn/thoi-tiet-mien-bac-4.html', 'Thời tiết miền Bắc chuyển lạnh', ''),
+    ('https://1thegioi.vn/tau-ngam-khong-nguoi-lai-5.html', 'Tàu ngầm không người lái', ''),
+]
+
+
+@pytest.fixture
+def ranker():
+    ranker = BM25FRanker(max_documents=100)
+    ranker.seed(CORPUS)
+    return ranker
+
+
+def test_query_terms_weights_expansion_lower():
+    weights = query_terms('giá vàng', ['vàng miếng', 'SJC'])
+    assert weights == {'giá': 1.0, 'vàng': 1.0, 'miếng': EXPANSION_WEIGHT, 'sjc': EXPANSION_WEIGHT}
+
+
+def test_exact_title_scores_ten(ranker):
+    weights = query_terms('giá vàng')
+    assert ranker.relevance(weights, 'Giá vàng', '', 'giá vàng') == pytest.approx(10.0)
+    assert ranker.relevance(weights, 'Bóng đá Việt Nam', '', 'giá vàng') == 0.0
+
+
+def test_slug_matches_unaccented_query():
+    ranker = BM25FRanker(max_documents=100)
+    weights = query_terms('giá vàng')
+    assert ranker.score(weights, 'Tin mới', 'https://1thegioi.vn/gia-vang-sjc-9.html') > 0.0
+
+
+def test_idf_ignores_accents(ranker):
+    assert ranker.idf('quân') == ranker.idf('quan')
+    assert ranker.idf('vàng') < ranker.idf('kim cương')
+
+
+def test_body_counted_once_after_title_observe():
+    ranker = BM25FRanker(max_documents=100)
+    url = 'https://1thegioi.vn/uav-1.html'
+    ranker.observe(url, 'UAV tự sát')
+    assert ranker.doc_count == 1
+    assert ranker.field_documents['body'] == 0
+
+    ranker.observe(url, 'UAV tự sát', 'UAV được dùng để trinh sát')
+    assert ranker.doc_count == 1
+    assert ranker.field_documents == {'title': 1, 'slug': 1, 'body': 1}
+    # 'uav' đã đếm qua tiêu đề, 'trinh' chỉ mới xuất hiện trong nội dung
+    assert ranker.document_frequency['uav'] == 1
+    assert ranker.document_frequency['trinh'] == 1
+
+    ranker.observe(url, 'UAV tự sát', 'UAV được dùng để trinh sát')
+    assert ranker.field_documents['body'] == 1
+    assert ranker.document_frequency['uav'] == 1
+
+
+def test_seen_is_bounded():
+    ranker = BM25FRanker(max_documents=3)
+    for i in range(10):
+        ranker.observe(f'https://1thegioi.vn/bai-{i}.html', f'Bài số {i}')
+    assert len(ranker._seen) == 3
+    assert ranker.doc_count == 10
+    assert list(ranker._seen) == [f'https://1thegioi.vn/bai-{i}.html' for i in (7, 8, 9)]
+
+
+def test_relevant_title_without_topic_phrase_passes_threshold(ranker):
+    # Hồi quy: tiêu đề chỉ chứa 'UAV' (không có cụm 'quân sự') từng bị chấm 0 và rơi khỏi kết quả
+    weights = query_terms('UAV quân sự')
+    title = 'UAV tự sát thay đổi chiến trường hiện đại'
+    url = 'https://1thegioi.vn/uav-tu-sat-thay-doi-chien-truong-221010.html'
+    assert ranker.relevance(weights, title, url, 'UAV quân sự') >= settings.TITLE_SCORE_THRESHOLD
+    assert ranker.relevance(weights, 'Giá vàng hôm nay', 'https://1thegioi.vn/gia-vang.html', 'UAV quân sự') == 0.0
+
+
+def test_content_relevance_scale(ranker):
+    weights = query_terms('giá vàng')
+    filler = ' '.join(['thị trường trong nước biến động'] * 20)
+    often = f'Giá vàng hôm nay. {filler} Giá vàng nhẫn. {filler} Vàng SJC giữ giá.'
+    once = f'{filler} Có nhắc tới giá vàng. {filler}'
+    assert 0.0 < ranker.content_relevance(weights, once, 'giá vàng') < ranker.content_relevance(weights, often, 'giá vàng') <= 10.0
+    assert ranker.content_relevance(weights, filler, 'giá vàng') == 0.0
@@ -0,0 +1,132 @@
+import email.utils
+import threading
+import time
+
+import pytest
+
+from chatbot_1thegioi import rate_limiter
+from chatbot_1thegioi.rate_limiter import RateLimiter, TokenBucket, host_of, parse_host_rates, retry_after_seconds
+
+
+class Clock:
+    """Đồng hồ giả: sleep chỉ cộng thời gian, ghi lại từng lần chờ"""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, 'monotonic', clock.monotonic)
+    monkeypatch.setattr(rate_limiter.time, 'sleep', clock.sleep)
+    return clock
+
+
+class StubResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+def test_host_of():
+    assert host_of('https://WWW.Google.com:443/search?q=x') == 'www.google.com'
+    assert host_of('1thegioi.vn') == '1thegioi.vn'
+
+
+def test_parse_host_rates():
+    assert parse_host_rates('www.google.com=0.5/2, localhost=0,bad,x=abc') == {
+        'www.google.com': (0.5, 2.0), 'localhost': (0.0, None),
+    }
+    assert parse_host_rates('') == {}
+
+
+def test_bucket_burst_then_rate(clock):
+    bucket = TokenBucket(rate=2, burst=3)
+    assert [bucket.reserve(clock.now) for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve(clock.now) == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert bucket.reserve(clock.now) == 0.0
+    # Tích token không quá burst
+    clock.now += 100
+    assert [bucket.reserve(clock.now) for _ in range(4)][-1] == pytest.approx(0.5)
+
+
+def test_zero_rate_is_unlimited(clock):
+    bucket = TokenBucket(rate=0, burst=1)
+    assert all(bucket.reserve(clock.now) == 0.0 for _ in range(100))
+
+
+def test_acquire_waits_per_host(clock):
+    limiter = RateLimiter(rate=1, burst=1, host_rates={'localhost': (0, None)}, penalty=5)
+
+    assert limiter.acquire('https://1thegioi.vn/a')
+    assert limiter.acquire('https://1thegioi.vn/b')
+    assert clock.sleeps == [pytest.approx(1.0)]
+    # Host khác và host không giới hạn không phải chờ
+    assert limiter.acquire('https://www.bing.com/search')
+    for _ in range(5):
+        assert limiter.acquire('http://localhost:11434/api/generate')
+    assert len(clock.sleeps) == 1
+    assert limiter.stats()['waited'] == {'1thegioi.vn': pytest.approx(1.0)}
+
+
+def test_acquire_cancelled_while_waiting(clock):
+    limiter = RateLimiter(rate=0.001, burst=1, host_rates={}, penalty=5)
+    cancelled = threading.Event()
+    cancelled.set()
+
+    assert limiter.acquire('https://1thegioi.vn/a', cancelled)
+    assert limiter.acquire('https://1thegioi.vn/b', cancelled) is False
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('120', 120.0),
+    (' 7 ', 7.0),
+    ('', None),
+    (None, None),
+    ('không phải số', None),
+    ('Thu, 01 Jan 1970 00:00:00 GMT', 0.0),
+])
+def test_retry_after_seconds(value, expected):
+    assert retry_after_seconds(value) == expected
+
+
+def test_retry_after_http_date():
+    value = email.utils.formatdate(time.time() + 30, usegmt=True)
+    assert 28 <= retry_after_seconds(value) <= 30
+
+
+def test_429_blocks_host_for_retry_after(clock, monkeypatch):
+    monkeypatch.setattr('chatbot_1thegioi.settings.HTTP_MAX_RETRY_AFTER', 60)
+    limiter = RateLimiter(rate=100, burst=10, host_rates={}, penalty=5)
+
+    limiter.observe('https://www.google.com/search', StubResponse(429, {'Retry-After': '12'}))
+    assert limiter.stats()['blocked'] == {'www.google.com': pytest.approx(12)}
+    assert limiter.acquire('https://www.google.com/search?q=2')
+    assert sum(clock.sleeps) == pytest.approx(12, abs=0.1)
+
+
+def test_retry_after_is_capped(clock, monkeypatch):
+    monkeypatch.setattr('chatbot_1thegioi.settings.HTTP_MAX_RETRY_AFTER', 60)
+    limiter = RateLimiter(rate=100, burst=10, host_rates={}, penalty=5)
+
+    limiter.observe('https://www.google.com/search', StubResponse(503, {'Retry-After': '86400'}))
+    assert limiter.stats()['blocked']['www.google.com'] == pytest.approx(60)
+
+
+def test_backoff_without_header_uses_penalty(clock):
+    limiter = RateLimiter(rate=100, burst=10, host_rates={}, penalty=5)
+
+    limiter.observe('https://www.bing.com/search', StubResponse(503))
+    limiter.observe('https://1thegioi.vn/', StubResponse(200, {'Retry-After': '99'}))
+    assert limiter.stats()['blocked'] == {'www.bing.com': pytest.approx(5)}
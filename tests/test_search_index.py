@@ -0,0 +1,72 @@
+import pytest
+
+from chatbot_1thegioi.search_index import SearchIndex, strip_accents, tokenize, url_slug
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = SearchIndex(str(tmp_path / 'index.sqlite3'))
+    yield index
+    index.close()
+
+
+def test_tokenize_and_strip_accents():
+    assert tokenize('Giá vàng, SJC-9999!') == ['giá', 'vàng', 'sjc', '9999']
+    assert strip_accents('Đường sắt chiến tranh') == 'Duong sat chien tranh'
+
+
+def test_url_slug_drops_extension_and_article_id():
+    assert url_slug('https://1thegioi.vn/gia-vang-tang-manh-221010.html') == 'gia vang tang manh'
+    assert url_slug('https://1thegioi.vn/the-gioi/') == 'the gioi'
+
+
+def test_postings_per_field(index):
+    doc_id = index.add('https://1thegioi.vn/gia-vang-1234.html', 'Giá vàng tăng', 'vàng vàng nhẫn', 'kinh-te')
+    rows = index._conn.execute(
+        "SELECT term, field, tf FROM postings WHERE doc_id = ? ORDER BY field, term", (doc_id,)
+    ).fetchall()
+    assert ('vàng', 'body', 2) in rows
+    assert ('vàng', 'title', 1) in rows
+    assert ('vang', 'slug', 1) in rows
+    assert ('kinh', 'section', 1) in rows
+    assert len(index) == 1
+
+
+def test_title_match_outranks_body_match(index):
+    index.add('https://1thegioi.vn/a-1.html', 'Thời tiết hôm nay', 'nói thêm về giá vàng')
+    index.add('https://1thegioi.vn/b-2.html', 'Giá vàng hôm nay', 'thị trường')
+    assert [doc['url'] for doc in index.search('giá vàng')] == [
+        'https://1thegioi.vn/b-2.html', 'https://1thegioi.vn/a-1.html',
+    ]
+
+
+def test_rare_term_weighs_more(index):
+    index.add('https://1thegioi.vn/a-1.html', 'Tin thế giới hôm nay', '')
+    index.add('https://1thegioi.vn/b-2.html', 'Tin tàu ngầm', '')
+    index.add('https://1thegioi.vn/c-3.html', 'Tin thời tiết', '')
+    results = index.search('tin tàu ngầm')
+    assert results[0]['url'] == 'https://1thegioi.vn/b-2.html'
+    assert results[0]['index_score'] > results[1]['index_score']
+
+
+def test_unaccented_slug_matches_accented_query(index):
+    index.add('https://1thegioi.vn/tau-ngam-khong-nguoi-lai-5.html', 'Bài mới', '')
+    assert [doc['url'] for doc in index.search('tàu ngầm')] == ['https://1thegioi.vn/tau-ngam-khong-nguoi-lai-5.html']
+
+
+def test_update_replaces_postings_and_remove(index):
+    url = 'https://1thegioi.vn/a-1.html'
+    index.add(url, 'Giá vàng', '')
+    index.add(url, 'Thời tiết', '')
+    assert len(index) == 1
+    assert index.search('vàng') == []
+    assert index.get(url)['title'] == 'Thời tiết'
+
+    index.remove(url)
+    assert len(index) == 0
+    assert index.search('thời tiết') == []
+
+
+def test_empty_query(index):
+    index.add('https://1thegioi.vn/a-1.html', 'Giá vàng', '')
+    assert index.search('  ,. ') == []
@@ -0,0 +1,191 @@
+import asyncio
+import json
+
+import pytest
+
+from chatbot_1thegioi.metrics import metrics
+from chatbot_1thegioi.server import ChatbotServer
+
+ARTICLE = {
+    'title': 'Xung đột Nga - Ukraine', 'url': 'https://1thegioi.vn/xung-dot-nga-ukraine-1.html',
+    'published': '2024-05-01', 'content': 'Nội dung', 'relevance_score': 9.5, 'content_score': 4,
+}
+
+
+class StubScheduler:
+    def stats(self):
+        return {'active': 0, 'queued': 0, 'rejected': 0, 'completed': 3}
+
+
+class StubCrew:
+    """Thay Chatbot1thegioiCrew: trả bài dựng sẵn, có thể chậm để thử timeout"""
+
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.llm_scheduler = StubScheduler()
+        self.topics = []
+
+    async def find_topic_articles_async(self, topic):
+        self.topics.append(topic)
+        await asyncio.sleep(self.delay)
+        return [ARTICLE]
+
+    def build_search_report(self, topic, articles):
+        return f'Báo cáo: {topic} ({len(articles)} bài)'
+
+    def summarize_with_ollama(self, topic, articles):
+        return f'Phân tích AI: {topic}'
+
+
+async def send(port, raw):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(raw)
+    await writer.drain()
+    head = await reader.readuntil(b'\r\n\r\n')
+    lines = head.decode('latin-1').split('\r\n')
+    headers = dict(line.split(': ', 1) for line in lines[1:] if ': ' in line)
+    body = await reader.readexactly(int(headers['Content-Length']))
+    writer.close()
+    if headers['Content-Type'].startswith('text/plain'):
+        return int(lines[0].split()[1]), headers, body.decode('utf-8')
+    return int(lines[0].split()[1]), headers, json.loads(body) if body else None
+
+
+def request(method, target, body=None):
+    data = b'' if body is None else json.dumps(body).encode('utf-8')
+    head = f'{method} {target} HTTP/1.1\r\nHost: test\r\nConnection: close\r\nContent-Length: {len(data)}\r\n\r\n'
+    return head.encode('latin-1') + data
+
+
+def run(crew, *raws, **kwargs):
+    """Chạy server trên cổng ngẫu nhiên, gửi lần lượt các request thô và trả về các response"""
+    async def main():
+        server = ChatbotServer(crew, host='127.0.0.1', port=0, **kwargs)
+        await server.start()
+        try:
+            return [await send(server.port, raw) for raw in raws]
+        finally:
+            server.close()
+
+    return asyncio.run(main())
+
+
+def test_search_get():
+    crew = StubCrew()
+    [(status, _, body)] = run(crew, request('GET', '/search?topic=Nga%20%20Ukraine'))
+
+    assert status == 200
+    assert body['topic'] == 'Nga Ukraine'
+    assert body['articles'] == [{key: ARTICLE[key] for key in ('title', 'url', 'published', 'content', 'relevance_score')}]
+    assert crew.topics == ['Nga Ukraine']
+
+
+def test_report_post_uses_ai_flag():
+    [(_, _, plain), (_, _, ai)] = run(
+        StubCrew(),
+        request('POST', '/report', {'topic': 'Ukraine'}),
+        request('POST', '/report/', {'topic': 'Ukraine', 'ai': True}),
+    )
+
+    assert plain['ai'] is False and plain['report'] == 'Báo cáo: Ukraine (1 bài)'
+    assert ai['ai'] is True and ai['report'] == 'Phân tích AI: Ukraine'
+
+
+def test_health():
+    [(status, _, body)] = run(StubCrew(), request('GET', '/health'), workers=3)
+
+    assert status == 200
+    assert body['status'] == 'ok'
+    assert body['workers'] == 3
+    assert body['llm'] == {'active': 0, 'queued': 0, 'rejected': 0}
+
+
+def test_metrics_counts_requests_by_known_route():
+    metrics.reset()
+    [_, _, (status, headers, text)] = run(
+        StubCrew(), request('GET', '/search?topic=Ukraine'), request('GET', '/khong-co'), request('GET', '/metrics'),
+    )
+
+    assert status == 200
+    assert headers['Content-Type'].startswith('text/plain; version=0.0.4')
+    assert 'chatbot_server_requests_total{path="/search",status="200"} 1' in text
+    assert 'chatbot_server_requests_total{path="other",status="404"} 1' in text
+
+
+@pytest.mark.parametrize('raw, expected', [
+    (request('GET', '/unknown'), 404),
+    (request('DELETE', '/search'), 405),
+    (request('GET', '/search'), 400),
+    (request('GET', '/search?topic=' + 'a' * 201), 400),
+    (b'POST /search HTTP/1.1\r\nContent-Length: 9\r\n\r\nnot json!', 400),
+    (b'POST /search HTTP/1.1\r\nContent-Length: 2\r\n\r\n[]', 400),
+    (b'POST /search HTTP/1.1\r\nContent-Length: abc\r\n\r\n', 400),
+    (b'POST /search HTTP/1.1\r\nContent-Length: 99999999\r\n\r\n', 413),
+    (b'GARBAGE\r\n\r\n', 400),
+])
+def test_client_errors(raw, expected):
+    [(status, _, body)] = run(StubCrew(), raw)
+
+    assert status == expected
+    assert body['error']
+
+
+def test_request_timeout():
+    [(status, _, body)] = run(StubCrew(delay=5), request('GET', '/search?topic=Ukraine'), request_timeout=0.05)
+
+    assert status == 504
+    assert 'error' in body
+
+
+def test_handler_exception_is_500():
+    crew = StubCrew()
+    crew.build_search_report = lambda topic, articles: 1 / 0
+
+    [(status, _, body)] = run(crew, request('POST', '/report', {'topic': 'Ukraine'}))
+
+    assert status == 500
+    assert body == {'error': 'Lỗi nội bộ'}
+
+
+def test_keep_alive_serves_several_requests():
+    async def main():
+        server = ChatbotServer(StubCrew(), host='127.0.0.1', port=0)
+        await server.start()
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', server.port)
+            statuses = []
+            for _ in range(3):
+                writer.write(b'GET /health HTTP/1.1\r\nHost: test\r\n\r\n')
+                await writer.drain()
+                head = await reader.readuntil(b'\r\n\r\n')
+                length = int(head.split(b'Content-Length: ')[1].split(b'\r\n')[0])
+                await reader.readexactly(length)
+                statuses.append(int(head.split()[1]))
+            writer.close()
+            return statuses
+        finally:
+            server.close()
+
+    assert asyncio.run(main()) == [200, 200, 200]
+
+
+def test_options_preflight_has_no_body():
+    [(status, headers, body)] = run(StubCrew(), request('OPTIONS', '/search'))
+
+    assert status == 204
+    assert body is None
+
+
+def test_no_cors_header_by_default():
+    [(_, headers, _)] = run(StubCrew(), request('GET', '/health'))
+
+    assert 'Access-Control-Allow-Origin' not in headers
+
+
+def test_cors_header_for_configured_origin(monkeypatch):
+    monkeypatch.setattr('chatbot_1thegioi.settings.SERVER_CORS_ORIGIN', 'https://1thegioi.vn')
+    [(status, headers, _)] = run(StubCrew(), request('OPTIONS', '/search'))
+
+    assert status == 204
+    assert headers['Access-Control-Allow-Origin'] == 'https://1thegioi.vn'
+    assert 'POST' in headers['Access-Control-Allow-Methods']
@@ -0,0 +1,93 @@
+import asyncio
+import threading
+
+import pytest
+
+from chatbot_1thegioi.single_flight import SingleFlight, normalize_topic
+
+
+def test_normalize_topic():
+    assert normalize_topic('  Giá   VÀNG ') == 'giá vàng'
+    assert normalize_topic(None) == ''
+
+
+def test_concurrent_calls_share_result():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    def work(topic):
+        calls.append(topic)
+        started.set()
+        release.wait(2)
+        return f'báo cáo {topic}'
+
+    leader = threading.Thread(target=lambda: results.append(flight.do('k', work, 'vàng')))
+    leader.start()
+    started.wait(2)
+    follower = threading.Thread(target=lambda: results.append(flight.do('k', work, 'vàng')))
+    follower.start()
+    # Chờ lượt sau đã nhập vào lượt đang chạy rồi mới cho lượt đầu xong
+    while flight.stats()['shared'] == 0:
+        threading.Event().wait(0.005)
+    release.set()
+    leader.join(2)
+    follower.join(2)
+
+    assert calls == ['vàng']
+    assert sorted(results, key=lambda item: item[1]) == [('báo cáo vàng', False), ('báo cáo vàng', True)]
+    assert flight.stats() == {'in_flight': 0, 'leaders': 1, 'shared': 1}
+
+
+def test_sequential_calls_run_again():
+    flight = SingleFlight()
+    assert flight.do('k', lambda: 1) == (1, False)
+    assert flight.do('k', lambda: 2) == (2, False)
+
+
+def test_exception_propagates_and_clears_key():
+    flight = SingleFlight()
+
+    def fail():
+        raise ValueError('lỗi')
+
+    with pytest.raises(ValueError):
+        flight.do('k', fail)
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_async_calls_share_result():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return 'xong'
+
+    async def main():
+        return await asyncio.gather(*(flight.do_async('k', work) for _ in range(3)))
+
+    results = asyncio.run(main())
+    assert calls == [1]
+    assert sorted(results, key=lambda item: item[1]) == [('xong', False), ('xong', True), ('xong', True)]
+
+
+def test_async_cancelled_waiter_does_not_cancel_shared_work():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.05)
+        return 'xong'
+
+    async def main():
+        first = asyncio.ensure_future(flight.do_async('k', work))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.do_async('k', work))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == ('xong', True)
@@ -0,0 +1,44 @@
+from chatbot_1thegioi.sitemap import parse_sitemap, sitemaps_from_robots
+
+
+def test_urlset_bytes():
+    entries, children = parse_sitemap("""<?xml version="1.0" encoding="UTF-8"?>
+    <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+      <url>
+        <loc>https://1thegioi.vn/a-1.html</loc>
+        <lastmod>2024-05-01T08:00:00+07:00</lastmod>
+      </url>
+      <url><loc> https://1thegioi.vn/b-2.html </loc></url>
+    </urlset>""".encode('utf-8'))
+    assert children == []
+    assert entries == [
+        {'url': 'https://1thegioi.vn/a-1.html', 'lastmod': '2024-05-01T08:00:00+07:00', 'title': ''},
+        {'url': 'https://1thegioi.vn/b-2.html', 'lastmod': '', 'title': ''},
+    ]
+
+
+def test_sitemap_index():
+    entries, children = parse_sitemap("""<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+      <sitemap><loc>https://1thegioi.vn/sitemap-1.xml</loc><lastmod>2024-05-01</lastmod></sitemap>
+    </sitemapindex>""")
+    assert entries == []
+    assert children == [{'url': 'https://1thegioi.vn/sitemap-1.xml', 'lastmod': '2024-05-01'}]
+
+
+def test_rss_and_atom():
+    entries, _ = parse_sitemap("""<rss><channel>
+      <item><title>Tàu ngầm</title><link>https://1thegioi.vn/c-3.html</link>
+            <pubDate>Wed, 01 May 2024 08:00:00 +0700</pubDate></item>
+    </channel></rss>""")
+    assert entries == [{'url': 'https://1thegioi.vn/c-3.html', 'lastmod': 'Wed, 01 May 2024 08:00:00 +0700',
+                        'title': 'Tàu ngầm'}]
+
+    entries, _ = parse_sitemap("""<feed xmlns="http://www.w3.org/2005/Atom">
+      <entry><title>UAV</title><link href="https://1thegioi.vn/d-4.html"/><updated>2024-05-02</updated></entry>
+    </feed>""")
+    assert entries == [{'url': 'https://1thegioi.vn/d-4.html', 'lastmod': '2024-05-02', 'title': 'UAV'}]
+
+
+def test_sitemaps_from_robots():
+    robots = "User-agent: *\nDisallow: /admin\nSitemap: https://1thegioi.vn/sitemap.xml\nsitemap: https://1thegioi.vn/news.xml\nSitemap: https://1thegioi.vn/sitemap.xml\n"
+    assert sitemaps_from_robots(robots) == ['https://1thegioi.vn/sitemap.xml', 'https://1thegioi.vn/news.xml']
@@ -0,0 +1,46 @@
+import time
+
+import pytest
+
+from chatbot_1thegioi.summary_cache import SummaryCache
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = SummaryCache(str(tmp_path / 'summaries.sqlite3'), max_entries=2)
+    yield cache
+    cache.close()
+
+
+def test_get_and_put(cache):
+    assert cache.get('a') is None
+    cache.put('a', 'llama3', 'giá vàng', 'phân tích A')
+    assert cache.get('a') == 'phân tích A'
+    stats = cache.stats()
+    assert (stats['entries'], stats['hits'], stats['misses']) == (1, 1, 1)
+    assert stats['hit_rate'] == 0.5
+
+
+def test_evicts_least_recently_read(cache):
+    cache.put('a', 'llama3', 'a', 'A')
+    time.sleep(0.01)
+    cache.put('b', 'llama3', 'b', 'B')
+    time.sleep(0.01)
+    # Đọc 'a' để 'b' thành bản lâu chưa dùng nhất
+    assert cache.get('a') == 'A'
+    time.sleep(0.01)
+    cache.put('c', 'llama3', 'c', 'C')
+
+    assert cache.stats()['entries'] == 2
+    assert cache.get('b') is None
+    assert cache.get('a') == 'A'
+    assert cache.get('c') == 'C'
+
+
+def test_purge_keeps_counters(cache):
+    cache.put('a', 'llama3', 'a', 'A')
+    cache.get('a')
+    assert cache.purge() == 1
+    stats = cache.stats()
+    assert stats['entries'] == 0
+    assert stats['hits'] == 1
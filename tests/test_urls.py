@@ -0,0 +1,63 @@
+import pytest
+
+from chatbot_1thegioi.urls import canonical_url, is_site_host
+
+CANONICAL = 'https://1thegioi.vn/a-1.html'
+
+
+@pytest.mark.parametrize('url', [
+    'https://1thegioi.vn/a-1.html',
+    'http://1thegioi.vn/a-1.html',
+    'https://www.1thegioi.vn/a-1.html',
+    'https://m.1thegioi.vn/a-1.html',
+    'https://amp.1thegioi.vn/a-1.html',
+    'https://WWW.1THEGIOI.VN/a-1.html',
+    '//www.1thegioi.vn/a-1.html',
+    'https://1thegioi.vn:443/a-1.html',
+    'https://1thegioi.vn//a-1.html',
+    'https://1thegioi.vn/a-1.html#binh-luan',
+    'https://1thegioi.vn/a-1.html?utm_source=fb&utm_medium=social&fbclid=x',
+    'https://1thegioi.vn/a-1.html?ref=home&amp=1',
+    'https://1thegioi.vn/amp/a-1.html',
+    'https://1thegioi.vn/a-1.html/amp',
+    'https://1thegioi.vn/a-1.amp.html',
+    'https://1thegioi-vn.cdn.ampproject.org/c/s/1thegioi.vn/a-1.html',
+    'https://1thegioi-vn.cdn.ampproject.org/v/s/www.1thegioi.vn/amp/a-1.html',
+    '  https://1thegioi.vn/a-1.html  ',
+])
+def test_variants_of_same_article(url):
+    assert canonical_url(url) == CANONICAL
+
+
+@pytest.mark.parametrize('url', ['/a-1.html', 'a-1.html', '?page=2'])
+def test_relative_url_has_no_canonical_form(url):
+    assert canonical_url(url) == ''
+
+
+def test_empty_url():
+    assert canonical_url('') == ''
+    assert canonical_url(None) is None
+
+
+def test_lookalike_host_is_not_site_host():
+    assert not is_site_host('evil1thegioi.vn')
+    assert is_site_host('www.1thegioi.vn')
+    assert canonical_url('http://evil1thegioi.vn/a-1.html?utm_source=x') == 'http://evil1thegioi.vn/a-1.html'
+    assert canonical_url('https://www.evil1thegioi.vn/amp/a-1.html') == 'https://www.evil1thegioi.vn/amp/a-1.html'
+
+
+def test_other_hosts_keep_scheme_and_prefix():
+    assert canonical_url('http://www.Example.com:80/x?b=2&a=1&gclid=z') == 'http://www.example.com/x?a=1&b=2'
+
+
+def test_ref_and_amp_kept_on_other_hosts():
+    assert canonical_url('https://example.com/x?ref=abc&amp=1&utm_source=y') == 'https://example.com/x?amp=1&ref=abc'
+    assert canonical_url('https://evil1thegioi.vn/x?ref=abc') == 'https://evil1thegioi.vn/x?ref=abc'
+
+
+def test_non_default_port_and_query_kept_sorted():
+    assert canonical_url('https://1thegioi.vn:8443/tim-kiem?q=v%C3%A0ng&page=2') == 'https://1thegioi.vn:8443/tim-kiem?page=2&q=v%C3%A0ng'
+
+
+def test_invalid_port_is_dropped():
+    assert canonical_url('https://1thegioi.vn:abc/a-1.html') == CANONICAL